@@ -0,0 +1,132 @@
+import random
+import networkx as nx
+import numpy
+from itertools import product
+from math import isfinite
+from experiment_utils import run_experiment, write_experiment
+
+
+class AdaptiveSweep:
+    """
+    A parameter sweep that starts with a coarse grid and only subdivides
+    the cells where a watched metric changes by more than its threshold
+    between the corners of the cell. Points shared by neighboring cells
+    are evaluated once.
+    """
+    def __init__(self, bounds, evaluate, thresholds, initial_intervals=2, max_depth=3, round_point=None):
+        """
+        Initializes the sweep.
+        :param bounds: dictionary of parameter name to (low, high)
+        :param evaluate: function receiving a dictionary of parameter name
+                         to value and returning a dictionary of metrics
+        :param thresholds: dictionary of metric name to the largest change
+                           allowed inside a cell before it is subdivided
+        :param initial_intervals: number of intervals per parameter of the coarse grid
+        :param max_depth: maximum number of subdivisions of a coarse cell
+        :param round_point: function mapping a point to its rounded version,
+                            rounds every value to 3 decimals by default
+        """
+        self.__names = list(bounds)
+        self.__bounds = bounds
+        self.__evaluate = evaluate
+        self.__thresholds = thresholds
+        self.__initial_intervals = initial_intervals
+        self.__max_depth = max_depth
+        self.__round_point = round_point or (lambda point: tuple(round(value, 3) for value in point))
+        self.__results = {}
+
+    def __point_metrics(self, point):
+        """
+        Returns the metrics of a point, evaluating it the first time.
+        :param point: tuple of parameter values
+        :return: dictionary of metrics
+        """
+        point = self.__round_point(point)
+        if point not in self.__results:
+            self.__results[point] = self.__evaluate(dict(zip(self.__names, point)))
+        return self.__results[point]
+
+    def __needs_refinement(self, cell):
+        """
+        Checks whether any watched metric changes more than its threshold
+        between the corners of the cell. Non-finite values, e.g. attack
+        AUCs without fake edges, always refine the cell.
+        :param cell: list of (low, high) per parameter
+        :return: boolean
+        """
+        corners = [self.__point_metrics(corner) for corner in product(*cell)]
+        for metric, threshold in self.__thresholds.items():
+            values = [corner[metric] for corner in corners]
+            if not all(isfinite(value) for value in values) or max(values) - min(values) > threshold:
+                return True
+        return False
+
+    def __split(self, cell):
+        """
+        Splits a cell in half along every parameter whose interval is
+        still wider than the rounding of the points.
+        :param cell: list of (low, high) per parameter
+        :return: list of cells, empty if the cell can not be split
+        """
+        middle = self.__round_point(tuple((low + high) / 2 for low, high in cell))
+        halves = []
+        for (low, high), mid in zip(cell, middle):
+            halves.append([(low, mid), (mid, high)] if low < mid < high else [(low, high)])
+
+        if all(len(half) == 1 for half in halves):
+            return []
+        return [list(sub_cell) for sub_cell in product(*halves)]
+
+    def run(self):
+        """
+        Runs the sweep.
+        :return: dictionary of evaluated point (tuple of parameter values) to metrics
+        """
+        grids = []
+        for name in self.__names:
+            low, high = self.__bounds[name]
+            step = (high - low) / self.__initial_intervals
+            grids.append([low + i * step for i in range(self.__initial_intervals + 1)])
+
+        cells = [[(grid[i], grid[i + 1]) for grid, i in zip(grids, indices)]
+                 for indices in product(range(self.__initial_intervals), repeat=len(grids))]
+        for _ in range(self.__max_depth + 1):
+            refined_cells = []
+            for cell in cells:
+                if self.__needs_refinement(cell):
+                    refined_cells += self.__split(cell)
+            cells = refined_cells
+
+        return dict(self.__results)
+
+
+def experiment_evaluator(graph_factory, exp_name, ftrp_parameter, data_path, seed, metric_groups=None,
+                         centrality_backend='networkx', raw_data=True):
+    """
+    Builds an `evaluate` function for AdaptiveSweep that runs and records
+    one experiment per point, in the same way the grid sweeps do.
+    :param graph_factory: function receiving the point and returning a networkx graph
+    :param exp_name: function receiving the point and returning the experiment name
+    :param ftrp_parameter: name of the parameter holding the fake-to-real edge proportion
+    :param data_path: csv file where results are appended
+    :param seed: integer
+    :param metric_groups: list of metric groups to compute, all by default
+    :param centrality_backend: 'networkx' or 'igraph'
+    :param raw_data: whether the edges of every noisy graph are written to raw_data/
+    :return: function
+    """
+    def evaluate(point):
+        # setting seeds for reproducibility
+        random.seed(seed)
+        numpy.random.seed(seed)
+
+        name = exp_name(point)
+        print(name)
+        graph = graph_factory(point)
+        graph.remove_nodes_from(list(nx.isolates(graph)))
+        metrics, raw_record = run_experiment(graph, point[ftrp_parameter], metric_groups=metric_groups,
+                                             centrality_backend=centrality_backend, raw_data=raw_data)
+        write_experiment(name, data_path, metrics, raw_record)
+        return metrics
+
+    return evaluate
@@ -0,0 +1,53 @@
+import argparse
+import os
+import random
+import networkx as nx
+import numpy as np
+from benchmarks.scaling import original_graph, write_csv
+from noisy_graphs.collector import collect_graph
+
+
+# Ingestion benchmarks of the neighbor-list collector:
+#     - model: BA, ER or WS
+#     - n: number of participants
+#     - concurrency: submissions in flight
+#     - batch_size: neighbor lists applied together
+# Reports the throughput and latency percentiles of every combination.
+
+
+SIZES = [1000, 3162, 10000]
+DEGREE = 8
+CONCURRENCIES = [10, 100, 1000]
+BATCH_SIZES = [1, 64, 1024]
+FTRP = 0.5
+SEED = 200494
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Throughput and latency of the neighbor-list collector")
+    parser.add_argument("--models", nargs="+", default=['BA'])
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--concurrencies", nargs="+", type=int, default=CONCURRENCIES)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--output", default="benchmarks/results")
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.output, exist_ok=True)
+    rows = []
+    for model in arguments.models:
+        for n in arguments.sizes:
+            for concurrency in arguments.concurrencies:
+                for batch_size in arguments.batch_sizes:
+                    # setting seeds for reproducibility
+                    random.seed(SEED)
+                    np.random.seed(SEED)
+                    graph = original_graph(model, n, DEGREE)
+                    graph.remove_nodes_from(list(nx.isolates(graph)))
+
+                    _, report = collect_graph(graph, FTRP, concurrency=concurrency, batch_size=batch_size)
+                    print(f"{model}_{n} concurrency {concurrency} batch {batch_size}: "
+                          f"{report['throughput']:.1f} lists/s, p99 latency {report['latency_p99']:.4f}s")
+                    rows.append({'model': model, 'n': n, 'concurrency': concurrency, 'batch_size': batch_size,
+                                 **report})
+
+    write_csv(os.path.join(arguments.output, "collector.csv"), rows)
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from legacy.negative_graphs.noisy_graph import NoisyGraph as LegacyNoisyGraph
+from benchmarks.scaling import original_graph
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+# Comparison of the legacy and the current NoisyGraph:
+#     - model: BA, ER or WS
+#     - degree: target average degree of the original graph
+#     - n: size of graph
+# Both implementations run the same workload: the real edges of the
+# original graph, then FAKE_FRACTION of them as random missing fake edges,
+# then FLIP_FRACTION of the fake edges turned into real ones. Overlapping
+# operations must give the same results; their throughput is appended to
+# HISTORY_FILE with the commit and time of the run.
+
+
+SIZES = [100, 300, 1000]
+DEGREES = [4, 16]
+FTRP = 0.5
+FAKE_FRACTION = 0.5
+FLIP_FRACTION = 0.1
+SEED = 200494
+HISTORY_FILE = "legacy_comparison_history.csv"
+
+
+def workload(model, n, degree, seed=SEED):
+    """
+    Builds a deterministic workload of edge additions. Fake edges only
+    join nodes that already have real edges, since the current
+    NoisyGraph needs real edges to compute sigmas.
+    :return: list of (node1, node2, real) triplets
+    """
+    random.seed(seed)
+    graph = original_graph(model, n, degree)
+    real_edges = sorted(tuple(sorted(edge)) for edge in graph.edges)
+    existing_edges = set(real_edges)
+    nodes = sorted(graph.nodes)
+
+    fake_edges = []
+    no_fake_edges = int(FAKE_FRACTION * len(real_edges))
+    while len(fake_edges) < no_fake_edges and len(existing_edges) < len(nodes) * (len(nodes) - 1) // 2:
+        edge = tuple(sorted(random.sample(nodes, 2)))
+        if edge not in existing_edges:
+            existing_edges.add(edge)
+            fake_edges.append(edge)
+
+    flipped_edges = random.sample(fake_edges, int(FLIP_FRACTION * len(fake_edges)))
+    return [(node1, node2, True) for node1, node2 in real_edges] + \
+           [(node1, node2, False) for node1, node2 in fake_edges] + \
+           [(node1, node2, True) for node1, node2 in flipped_edges]
+
+
+def build(noisy_graph, edges):
+    for node1, node2, real in edges:
+        noisy_graph.add_edge(node1, node2, real)
+    return noisy_graph
+
+
+# operation name to a function receiving a noisy graph and returning a
+# comparable result
+OPERATIONS = {
+    'edges_if_real': lambda noisy_graph: noisy_graph.edges_if(real=True),
+    'edges_if_fake': lambda noisy_graph: noisy_graph.edges_if(real=False),
+    'edges': lambda noisy_graph: noisy_graph.edges(),
+    'number_of_edges': lambda noisy_graph: noisy_graph.number_of_edges(),
+    'number_of_edges_for_node':
+        lambda noisy_graph: [noisy_graph.number_of_edges_for_node(node) for node in sorted(noisy_graph.nodes())],
+    'node_uncertainty':
+        lambda noisy_graph: [noisy_graph.node_uncertainty(node) for node in sorted(noisy_graph.nodes())],
+    'uncertainty': lambda noisy_graph: noisy_graph.uncertainty(),
+}
+
+
+def equivalence_errors(legacy_graph, noisy_graph):
+    """
+    Compares the results of every operation in OPERATIONS.
+    :return: list of the names of the operations whose results differ
+    """
+    return [operation for operation, function in OPERATIONS.items()
+            if function(legacy_graph) != function(noisy_graph)]
+
+
+def throughput(function, no_operations, min_seconds=0.2):
+    """
+    Calls `function` until at least `min_seconds` elapse.
+    :return: operations per second, where every call performs `no_operations`
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        seconds = time.perf_counter() - start
+        if seconds >= min_seconds:
+            return calls * no_operations / seconds
+
+
+def run_comparison(models, sizes, degrees):
+    """
+    Runs the workloads through both implementations, checks their
+    equivalence and measures the throughput of edge additions and of
+    every operation in OPERATIONS.
+    :return: 2-tuple (list of row dictionaries, list of equivalence errors)
+    """
+    rows = []
+    errors = []
+    for model in models:
+        for degree in degrees:
+            for n in sizes:
+                edges = workload(model, n, degree)
+                implementations = {
+                    'legacy': lambda: LegacyNoisyGraph(),
+                    'current': lambda: NoisyGraph(ftrp=FTRP),
+                }
+                graphs = {name: build(factory(), edges) for name, factory in implementations.items()}
+                errors += [f"{model}_{degree}_{n} {operation}"
+                           for operation in equivalence_errors(graphs['legacy'], graphs['current'])]
+
+                for name, factory in implementations.items():
+                    measurements = {'add_edge': throughput(lambda: build(factory(), edges), len(edges))}
+                    for operation, function in OPERATIONS.items():
+                        no_operations = n if operation in ('number_of_edges_for_node', 'node_uncertainty') else 1
+                        measurements[operation] = throughput(lambda: function(graphs[name]), no_operations)
+
+                    for operation, operations_per_second in measurements.items():
+                        rows.append({'model': model, 'degree': degree, 'n': n, 'implementation': name,
+                                     'operation': operation, 'operations_per_second': operations_per_second})
+
+    for row in rows:
+        legacy_row = next(legacy_row for legacy_row in rows if legacy_row['implementation'] == 'legacy' and
+                          all(legacy_row[key] == row[key] for key in ('model', 'degree', 'n', 'operation')))
+        row['speedup'] = row['operations_per_second'] / legacy_row['operations_per_second']
+        print(f"{row['model']}_{row['degree']}_{row['n']} {row['implementation']} {row['operation']}: "
+              f"{row['operations_per_second']:.1f} ops/s ({row['speedup']:.2f}x)")
+
+    return rows, errors
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def append_history(path, rows):
+    """
+    Appends the rows to the history csv, tagged with the current commit
+    and time, writing the header if the file is new.
+    """
+    revision = git_revision()
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    rows = [{'revision': revision, 'timestamp': timestamp, **row} for row in rows]
+    if not rows:
+        return
+
+    new_file = not os.path.exists(path)
+    f = open(path, "a", newline="")
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    if new_file:
+        writer.writeheader()
+    writer.writerows(rows)
+    f.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Equivalence and throughput of the legacy and current NoisyGraph")
+    parser.add_argument("--models", nargs="+", default=['BA', 'ER', 'WS'])
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--degrees", nargs="+", type=int, default=DEGREES)
+    parser.add_argument("--output", default="benchmarks/results")
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.output, exist_ok=True)
+    results, equivalence = run_comparison(arguments.models, arguments.sizes, arguments.degrees)
+    append_history(os.path.join(arguments.output, HISTORY_FILE), results)
+
+    if equivalence:
+        raise SystemExit("Implementations differ in:\n    " + "\n    ".join(equivalence))
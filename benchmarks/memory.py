@@ -0,0 +1,225 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import networkx as nx
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.scaling import original_graph, write_csv
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+# Memory profiling of NoisyGraph:
+#     - model: BA, ER or WS
+#     - degree: target average degree of the original graph
+#     - n: size of graph
+# Every size is measured in a fresh process. The peak RSS of a phase is
+# measured first, without tracemalloc, resetting the peak through
+# /proc/self/clear_refs before every phase; it is nan where the peak cannot
+# be reset. tracemalloc peaks and retained bytes are measured on a second
+# construction. Once a phase takes more than the time budget for a
+# (model, degree) pair it is skipped for the larger sizes.
+
+
+SIZES = [1000, 3162, 10000, 31623, 100000]
+DEGREES = [8]
+FTRP = 0.5
+MAX_SECONDS = 60.0
+TOP_ALLOCATORS = 10
+SEED = 200494
+
+
+def _status_bytes(field):
+    """
+    Reads a memory field of /proc/self/status, e.g. VmRSS or VmHWM.
+    :return: integer number of bytes or None if it is not available
+    """
+    try:
+        f = open("/proc/self/status")
+    except OSError:
+        return None
+
+    with f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def reset_peak_rss():
+    """
+    Resets the peak resident set size of the process to the current one.
+    Only Linux supports it.
+    :return: boolean, whether the peak was reset
+    """
+    try:
+        f = open("/proc/self/clear_refs", "w")
+    except OSError:
+        return False
+
+    try:
+        with f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of the process in bytes since the
+    last `reset_peak_rss`, or since the process started if it cannot be
+    reset.
+    """
+    peak = _status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def timed_rss(function, *args):
+    """
+    Calls `function` and measures its time and the peak RSS while it runs.
+    :return: 3-tuple (result, seconds, peak RSS bytes or nan)
+    """
+    gc.collect()
+    resettable = reset_peak_rss()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    return result, seconds, peak_rss() if resettable else float('nan')
+
+
+def construct_noisy_graph(graph):
+    noisy_graph = NoisyGraph(ftrp=FTRP)
+    noisy_graph.construct_graph(graph)
+    return noisy_graph
+
+
+PHASES = {
+    'edges': lambda noisy_graph, graph: noisy_graph.edges(),
+    'node_neighbors': lambda noisy_graph, graph: [noisy_graph.node_neighbors(node) for node in noisy_graph.nodes()],
+    'node_uncertainties': lambda noisy_graph, graph: noisy_graph.node_uncertainties(),
+    'sigmas_profile': lambda noisy_graph, graph: noisy_graph.get_sigmas_profile(),
+    'degree_centrality_profile': lambda noisy_graph, graph: noisy_graph.degree_centrality_profile(graph),
+}
+
+
+def seeded_graph(model, n, degree):
+    # setting seeds for reproducibility
+    random.seed(SEED)
+    np.random.seed(SEED)
+    graph = original_graph(model, n, degree)
+    graph.remove_nodes_from(list(nx.isolates(graph)))
+    return graph
+
+
+def profile_size(model, n, degree, skipped_phases=()):
+    """
+    Measures the construction and the metric phases for one graph. Runs in
+    its own process. The time and peak RSS of every phase are measured
+    first, without tracemalloc, which would inflate the RSS. Then the
+    noisy graph is built again under tracemalloc; peaks are reset before
+    every phase and the retained bytes are the size of the noisy graph for
+    the construction and the size of the result for the other phases.
+    :param skipped_phases: phases of PHASES that are not measured
+    :return: 2-tuple (list of row dictionaries, top allocators text)
+    """
+    phases = {phase: function for phase, function in PHASES.items() if phase not in skipped_phases}
+
+    graph = seeded_graph(model, n, degree)
+    rss_before = _status_bytes("VmRSS") or 0
+    noisy_graph, seconds, rss_peak = timed_rss(construct_noisy_graph, graph)
+    rss_measurements = {'construct_graph': (seconds, rss_peak, rss_peak - rss_before)}
+    for phase, function in phases.items():
+        rss_before = _status_bytes("VmRSS") or 0
+        result, seconds, rss_peak = timed_rss(function, noisy_graph, graph)
+        rss_measurements[phase] = (seconds, rss_peak, rss_peak - rss_before)
+        del result
+
+    del noisy_graph
+    graph = seeded_graph(model, n, degree)
+    gc.collect()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    noisy_graph = construct_noisy_graph(graph)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    top_allocators = tracemalloc.take_snapshot().statistics('lineno')[:TOP_ALLOCATORS]
+
+    no_nodes = noisy_graph.number_of_nodes()
+    _, _, no_edges = noisy_graph.number_of_edges()
+    measurements = [('construct_graph', peak - baseline, retained - baseline)]
+
+    for phase, function in phases.items():
+        gc.collect()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = function(noisy_graph, graph)
+        after, peak = tracemalloc.get_traced_memory()
+        measurements.append((phase, peak - before, after - before))
+        del result
+
+    tracemalloc.stop()
+
+    rows = []
+    for phase, peak_bytes, retained_bytes in measurements:
+        seconds, rss_peak, rss_increase = rss_measurements[phase]
+        rows.append({'model': model, 'degree': degree, 'n': no_nodes, 'noisy_edges': no_edges, 'phase': phase,
+                     'seconds': seconds, 'tracemalloc_peak_bytes': peak_bytes, 'retained_bytes': retained_bytes,
+                     'peak_rss_bytes': rss_peak, 'peak_rss_increase_bytes': rss_increase,
+                     'peak_bytes_per_edge': peak_bytes / no_edges, 'peak_bytes_per_node': peak_bytes / no_nodes,
+                     'retained_bytes_per_edge': retained_bytes / no_edges,
+                     'retained_bytes_per_node': retained_bytes / no_nodes})
+
+    report = f"{model}_{degree}_{n} construct_graph top allocators\n"
+    report += "".join(f"    {statistic}\n" for statistic in top_allocators)
+    return rows, report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Memory profiling of NoisyGraph construction and metrics")
+    parser.add_argument("--models", nargs="+", default=['BA', 'ER', 'WS'])
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--degrees", nargs="+", type=int, default=DEGREES)
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS)
+    parser.add_argument("--output", default="benchmarks/results")
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.output, exist_ok=True)
+    all_rows = []
+    reports = []
+    context = multiprocessing.get_context('spawn')
+    for model in arguments.models:
+        for degree in arguments.degrees:
+            # phases over the time budget are skipped for larger sizes,
+            # construction is required by the other phases
+            too_slow = set()
+            for n in arguments.sizes:
+                if 'construct_graph' in too_slow:
+                    break
+
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    rows, report = executor.submit(profile_size, model, n, degree, too_slow).result()
+
+                for row in rows:
+                    print(f"{model}_{degree}_{n} {row['phase']}: {row['seconds']:.2f}s, "
+                          f"peak {row['tracemalloc_peak_bytes']} B, "
+                          f"retained {row['retained_bytes_per_edge']:.1f} B/edge, rss {row['peak_rss_bytes']} B")
+                    if row['seconds'] > arguments.max_seconds:
+                        too_slow.add(row['phase'])
+                all_rows += rows
+                reports.append(report)
+
+    write_csv(os.path.join(arguments.output, "memory.csv"), all_rows)
+    f = open(os.path.join(arguments.output, "memory_top_allocators.txt"), "w")
+    f.write("\n".join(reports))
+    f.close()
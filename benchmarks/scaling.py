@@ -0,0 +1,147 @@
+import argparse
+import csv
+import os
+import random
+import time
+import networkx as nx
+import numpy as np
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+# Scaling benchmarks:
+#     - model: BA, ER or WS
+#     - degree: target average degree of the original graph
+#     - n: size of graph
+# Every operation is timed for every graph, and the exponent b of
+# t = a * n ^ b is fitted per (model, degree, operation).
+
+
+SIZES = [100, 316, 1000, 3162, 10000, 31623, 100000]
+DEGREES = [4, 16]
+FTRP = 0.5
+MAX_SECONDS = 60.0
+SAMPLED_NODES = 20
+SEED = 200494
+
+
+def original_graph(model, n, degree):
+    if model == 'BA':
+        return nx.barabasi_albert_graph(n=n, m=max(1, degree // 2))
+    if model == 'ER':
+        return nx.fast_gnp_random_graph(n=n, p=degree / (n - 1))
+    if model == 'WS':
+        return nx.watts_strogatz_graph(n=n, k=degree, p=0.1)
+    raise ValueError(f"Unknown model {model}")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def missing_neighbors_time(noisy_graph):
+    nodes = noisy_graph.nodes()
+    sample = random.sample(nodes, min(SAMPLED_NODES, len(nodes)))
+    return sum(timed(noisy_graph.missing_neighbors_for_node, node) for node in sample) / len(sample)
+
+
+OPERATIONS = {
+    'node_uncertainties': lambda noisy_graph, graph: timed(noisy_graph.node_uncertainties),
+    'edges': lambda noisy_graph, graph: timed(noisy_graph.edges),
+    'missing_neighbors_for_node': lambda noisy_graph, graph: missing_neighbors_time(noisy_graph),
+    'degree_centrality_profile': lambda noisy_graph, graph: timed(noisy_graph.degree_centrality_profile, graph),
+    'betweenness_profile': lambda noisy_graph, graph: timed(noisy_graph.betweenness_profile, graph),
+    'closeness_profile': lambda noisy_graph, graph: timed(noisy_graph.closeness_profile, graph),
+    'eigenvector_centrality_profile':
+        lambda noisy_graph, graph: timed(noisy_graph.eigenvector_centrality_profile, graph),
+}
+
+
+def run_benchmarks(models, sizes, degrees, max_seconds):
+    """
+    Times graph construction and every operation in OPERATIONS. Once an
+    operation takes more than `max_seconds` for a (model, degree) pair,
+    it is skipped for the larger sizes; construction is required by the
+    other operations, so a slow construction ends the pair.
+    :return: list of dictionaries with keys model, degree, n, edges, operation and seconds
+    """
+    rows = []
+    for model in models:
+        for degree in degrees:
+            too_slow = set()
+            for n in sizes:
+                if 'construct_graph' in too_slow:
+                    break
+
+                # setting seeds for reproducibility
+                random.seed(SEED)
+                np.random.seed(SEED)
+                graph = original_graph(model, n, degree)
+                graph.remove_nodes_from(list(nx.isolates(graph)))
+
+                noisy_graph = NoisyGraph(ftrp=FTRP)
+                seconds = timed(noisy_graph.construct_graph, graph)
+                measurements = [('construct_graph', seconds)]
+                for operation, benchmark in OPERATIONS.items():
+                    if operation not in too_slow:
+                        measurements.append((operation, benchmark(noisy_graph, graph)))
+
+                for operation, seconds in measurements:
+                    print(f"{model}_{degree}_{n} {operation}: {seconds:.4f}s")
+                    rows.append({'model': model, 'degree': degree, 'n': graph.number_of_nodes(),
+                                 'edges': graph.number_of_edges(), 'operation': operation, 'seconds': seconds})
+                    if seconds > max_seconds:
+                        too_slow.add(operation)
+
+    return rows
+
+
+def complexity_fit(rows):
+    """
+    Fits log(seconds) = log(a) + b * log(n) per (model, degree, operation).
+    :return: list of dictionaries with keys model, degree, operation, points, exponent and coefficient
+    """
+    series = {}
+    for row in rows:
+        key = (row['model'], row['degree'], row['operation'])
+        series.setdefault(key, []).append((row['n'], row['seconds']))
+
+    fits = []
+    for (model, degree, operation), points in series.items():
+        points = [(n, seconds) for n, seconds in points if seconds > 0]
+        if len(points) < 2:
+            continue
+
+        sizes, seconds = zip(*points)
+        exponent, intercept = np.polyfit(np.log(sizes), np.log(seconds), 1)
+        fits.append({'model': model, 'degree': degree, 'operation': operation, 'points': len(points),
+                     'exponent': exponent, 'coefficient': np.exp(intercept)})
+
+    return fits
+
+
+def write_csv(path, rows):
+    if not rows:
+        return
+
+    f = open(path, "w", newline="")
+    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    f.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scaling benchmarks of NoisyGraph construction and metrics")
+    parser.add_argument("--models", nargs="+", default=['BA', 'ER', 'WS'])
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--degrees", nargs="+", type=int, default=DEGREES)
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS)
+    parser.add_argument("--output", default="benchmarks/results")
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.output, exist_ok=True)
+    timings = run_benchmarks(arguments.models, arguments.sizes, arguments.degrees, arguments.max_seconds)
+    write_csv(os.path.join(arguments.output, "scaling.csv"), timings)
+    write_csv(os.path.join(arguments.output, "scaling_fit.csv"), complexity_fit(timings))
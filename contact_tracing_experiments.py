@@ -0,0 +1,55 @@
+import networkx as nx
+from noisy_graphs.epidemics import quarantine_cost_curve
+
+
+# Contact tracing experiments:
+#     - n: size of the Barabási-Albert graph
+#     - m: new connections per node
+#     - k: tracing hops
+#     - r: fake-to-real edge proportion
+
+
+# Experimental conditions
+INTERVAL_NO = 10
+MAX_F = 1.00
+GRAPH_SIZE = 100000
+M = 5
+HOPS = [1, 2, 3]
+TRIALS = 200
+INFECTED_FRACTION = 0.001
+BETA = 0.05
+GAMMA = 0.2
+
+
+# Deltas
+F_DELTA = MAX_F / INTERVAL_NO
+
+
+# Intervals
+fractions = [round(i * F_DELTA, 3) for i in range(1, INTERVAL_NO + 1)]
+
+
+if __name__ == '__main__':
+    # seeds
+    seed = 200494
+
+    # creating path
+    data_path = "results/CT.csv"
+    f = open(data_path, "w")
+    f.write("exp_name,ftrp,hops,real_mean,fake_mean,fake_std,overhead\n")
+    f.close()
+
+    graph = nx.barabasi_albert_graph(n=GRAPH_SIZE, m=M, seed=seed)
+    no_infected = max(1, round(INFECTED_FRACTION * GRAPH_SIZE))
+
+    # every noisy graph is built once and traced for all hop counts
+    curve = quarantine_cost_curve(graph, fractions, no_trials=TRIALS, no_infected=no_infected, hops=HOPS,
+                                  beta=BETA, gamma=GAMMA, seed=seed)
+
+    f = open(data_path, "a")
+    for point in curve:
+        experiment_name = f"CT_{GRAPH_SIZE}_{M}_{point['hops']}_{point['ftrp']}"
+        print(experiment_name)
+        f.write(f"{experiment_name},{point['ftrp']},{point['hops']},{point['real_mean']},{point['fake_mean']},"
+                f"{point['fake_std']},{point['overhead']}\n")
+    f.close()
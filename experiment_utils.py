@@ -1,54 +1,302 @@
+import random
 import networkx as nx
+import numpy
+from concurrent.futures import ProcessPoolExecutor
+from networkx.algorithms import centrality
+from noisy_graphs.attacks import link_inference_attack
+from noisy_graphs.igraph_centrality import IGraphCentrality
+from statistics import NormalDist
 from noisy_graphs.noisy_graph import NoisyGraph
+from noisy_graphs.shared_graph import SharedGraph
+from noisy_graphs.streaming import QuantileSketch, RunningStats
 
 
-def create_data_path_file(data_path: str):
-    header = "exp_name,sigma_mean,sigma_variance,uncertainty_mean,uncertainty_variance,dc_distance," \
-             "dc_correlation,dc_mean_change,bc_distance,bc_correlation,bc_mean_change,cc_distance," \
-             "cc_correlation,cc_mean_change,ec_distance,ec_correlation,ec_mean_change\n"
+CENTRALITY_ALGORITHMS = {
+    'dc': centrality.degree_centrality,
+    'bc': centrality.betweenness_centrality,
+    'cc': centrality.closeness_centrality,
+    'ec': centrality.eigenvector_centrality,
+}
+
+# metric groups that can be selected per run and their csv columns
+METRIC_GROUPS = {
+    'sigma': ["sigma_mean", "sigma_variance"],
+    'uncertainty': ["uncertainty_mean", "uncertainty_variance"],
+    'distribution': ["sigma_p1", "sigma_p5", "sigma_p50", "uncertainty_p1", "uncertainty_p5", "uncertainty_p50"],
+    'dc': ["dc_distance", "dc_correlation", "dc_mean_change"],
+    'bc': ["bc_distance", "bc_correlation", "bc_mean_change"],
+    'cc': ["cc_distance", "cc_correlation", "cc_mean_change"],
+    'ec': ["ec_distance", "ec_correlation", "ec_mean_change", "ec_iterations", "ec_residual"],
+    'attack': ["attack_cn_auc", "attack_cn_precision_at_k", "attack_aa_auc", "attack_aa_precision_at_k",
+               "attack_jaccard_auc", "attack_jaccard_precision_at_k"],
+}
+
+# metric groups computed without a selection, the original csv columns;
+# distribution and attack are opt-in
+DEFAULT_METRIC_GROUPS = ['sigma', 'uncertainty', 'dc', 'bc', 'cc', 'ec']
+
+# quantiles reported by replicated experiments
+REPLICATE_QUANTILES = [0.05, 0.5, 0.95]
+
+# shared original graph of a worker process
+_worker_graph = {}
+
+
+def selected_metric_groups(metric_groups: list = None):
+    """
+    Validates a selection of metric groups and returns it in csv order.
+    No selection means DEFAULT_METRIC_GROUPS.
+    """
+    if metric_groups is None:
+        metric_groups = DEFAULT_METRIC_GROUPS
+
+    unknown_groups = set(metric_groups) - set(METRIC_GROUPS)
+    if unknown_groups:
+        raise ValueError(f"Unknown metric groups {sorted(unknown_groups)}, expected some of {list(METRIC_GROUPS)}")
+
+    return [group for group in METRIC_GROUPS if group in metric_groups]
+
+
+def metric_columns(metric_groups: list = None):
+    return [column for group in selected_metric_groups(metric_groups) for column in METRIC_GROUPS[group]]
+
+
+def create_data_path_file(data_path: str, metric_groups: list = None):
+    header = "exp_name," + ",".join(metric_columns(metric_groups)) + "\n"
     f = open(data_path, "w")
     f.write(header)
     f.close()
 
 
-def perform_experiment(original_graph: nx.Graph, ftrp: float, exp_name: str, data_path: str):
-    print(exp_name)
+def create_aggregated_data_path_file(data_path: str, metric_groups: list = None):
+    columns = ["exp_name", "replicates"]
+    for metric in metric_columns(metric_groups):
+        columns += [f"{metric}_mean", f"{metric}_variance"]
+        columns += [f"{metric}_p{round(q * 100):02d}" for q in REPLICATE_QUANTILES]
+        columns += [f"{metric}_nonfinite"]
 
-    # removing graph isolates
-    # NoisyGraph is not intended to deal with isolated nodes
-    original_graph.remove_nodes_from(list(nx.isolates(original_graph)))
+    f = open(data_path, "w")
+    f.write(",".join(columns) + "\n")
+    f.close()
+
+
+def original_centralities(original_graph: nx.Graph, metric_groups: list = None, centrality_backend: str = 'networkx'):
+    """
+    Calculates the selected centrality metrics of the original graph once,
+    so they can be reused by every noisy graph built from it. The igraph
+    backend translates the original graph once for all of them.
+    """
+    metric_groups = selected_metric_groups(metric_groups)
+    graph = original_graph
+    if centrality_backend == 'igraph' and any(name in metric_groups for name in CENTRALITY_ALGORITHMS):
+        graph = IGraphCentrality.from_networkx(original_graph)
 
+    return {name: NoisyGraph.centrality_metrics(graph, algorithm, centrality_backend)
+            for name, algorithm in CENTRALITY_ALGORITHMS.items() if name in metric_groups}
+
+
+def run_experiment(original_graph, ftrp: float, original_metrics=None, metric_groups: list = None,
+                   centrality_backend: str = 'networkx', raw_data: bool = True):
+    """
+    Constructs the noisy graph of `original_graph` and measures the
+    selected metric groups, DEFAULT_METRIC_GROUPS by default. Unselected
+    metrics are neither computed on the original nor on the noisy graph.
+    Centralities are computed with networkx or igraph, see `NoisyGraph.centrality_metrics`.
+    Returns the metrics and the raw data record of the experiment instead
+    of writing them, so it can run in worker processes. The raw data
+    record lists every edge; without `raw_data` it is not built and None
+    is returned in its place.
+    """
     # constructing noisy graph
     noisy_graph = NoisyGraph(ftrp=ftrp)
     noisy_graph.construct_graph(original_graph)
 
+    return measure_noisy_graph(noisy_graph, original_graph, original_metrics, metric_groups, centrality_backend,
+                               raw_data)
+
+
+def measure_noisy_graph(noisy_graph, original_graph, original_metrics=None, metric_groups: list = None,
+                        centrality_backend: str = 'networkx', raw_data: bool = True):
+    """
+    Measures the selected metric groups of an already constructed noisy
+    graph, see `run_experiment`.
+    """
+    metric_groups = selected_metric_groups(metric_groups)
+    original_metrics = original_metrics or {}
+    metrics = {}
+
     # algorithm compliance
-    sigma_mean, sigma_variance = noisy_graph.get_sigmas_profile()
+    if 'sigma' in metric_groups:
+        metrics['sigma_mean'], metrics['sigma_variance'] = noisy_graph.get_sigmas_profile()
 
     # uncertainty
-    uncertainty_mean, uncertainty_variance = noisy_graph.get_uncertainty_profile()
+    if 'uncertainty' in metric_groups:
+        metrics['uncertainty_mean'], metrics['uncertainty_variance'] = noisy_graph.get_uncertainty_profile()
+
+    # lower quantiles of sigma and uncertainty, the least protected nodes
+    if 'distribution' in metric_groups:
+        for name, distribution in (('sigma', noisy_graph.get_sigmas_distribution()),
+                                   ('uncertainty', noisy_graph.get_uncertainty_distribution())):
+            metrics.update((f"{name}_{key}", distribution[key]) for key in ("p1", "p5", "p50"))
 
     # centrality_metrics
-    dc_distance, dc_correlation, dc_mean_change = noisy_graph.degree_centrality_profile(original_graph)
-    bc_distance, bc_correlation, bc_mean_change = noisy_graph.betweenness_profile(original_graph)
-    cc_distance, cc_correlation, cc_mean_change = noisy_graph.closeness_profile(original_graph)
-    ec_distance, ec_correlation, ec_mean_change = noisy_graph.eigenvector_centrality_profile(original_graph)
+    centrality_profiles = {
+        'dc': noisy_graph.degree_centrality_profile,
+        'bc': noisy_graph.betweenness_profile,
+        'cc': noisy_graph.closeness_profile,
+        'ec': noisy_graph.eigenvector_centrality_profile,
+    }
+    for group, centrality_profile in centrality_profiles.items():
+        if group in metric_groups:
+            profile = centrality_profile(original_graph, original_metrics.get(group), backend=centrality_backend)
+            metrics.update(zip(METRIC_GROUPS[group], profile))
+
+    # convergence of the eigenvector centrality of the noisy graph
+    if 'ec' in metric_groups:
+        telemetry = noisy_graph.get_eigenvector_telemetry()
+        metrics['ec_iterations'], metrics['ec_residual'] = telemetry['iterations'], telemetry['residual']
+
+    # link inference attack telling the real edges from the fake ones
+    if 'attack' in metric_groups:
+        metrics.update(zip(METRIC_GROUPS['attack'], link_inference_attack(noisy_graph).values()))
+
+    # raw record with original edges and noisy edges
+    if not raw_data:
+        return metrics, None
+
+    raw_record = f"Real edges: {noisy_graph.edges_if(real=True)}\n"
+    raw_record += f"Fake edges: {noisy_graph.edges_if(real=False)}\n\n"
+
+    return metrics, raw_record
+
 
+def format_result(exp_name: str, metrics: dict):
+    return f"{exp_name}," + ",".join(f"{value}" for value in metrics.values()) + "\n"
+
+
+def write_experiment(exp_name: str, data_path: str, metrics: dict, raw_data: str = None):
     # create raw file with original edges and noisy edges
-    f = open(f"raw_data/{exp_name[:2]}.txt", "a")
-    f.write(f"Experimental conditions: {exp_name}\n")
-    f.write(f"Real edges: {noisy_graph.edges_if(real=True)}\n")
-    f.write(f"Fake edges: {noisy_graph.edges_if(real=False)}\n\n")
-    f.close()
+    if raw_data is not None:
+        f = open(f"raw_data/{exp_name[:2]}.txt", "a")
+        f.write(f"Experimental conditions: {exp_name}\n")
+        f.write(raw_data)
+        f.close()
 
     # add result to csv
-    result = f"{exp_name},{sigma_mean},{sigma_variance},{uncertainty_mean},{uncertainty_variance},"
-    result += f"{dc_distance},{dc_correlation},{dc_mean_change},"
-    result += f"{bc_distance},{bc_correlation},{bc_mean_change},"
-    result += f"{cc_distance},{cc_correlation},{cc_mean_change},"
-    result += f"{ec_distance},{ec_correlation},{ec_mean_change}"
-    result += "\n"
+    f = open(data_path, "a")
+    f.write(format_result(exp_name, metrics))
+    f.close()
+
+
+def perform_experiment(original_graph: nx.Graph, ftrp: float, exp_name: str, data_path: str,
+                       metric_groups: list = None):
+    print(exp_name)
+
+    # removing graph isolates
+    # NoisyGraph is not intended to deal with isolated nodes
+    original_graph.remove_nodes_from(list(nx.isolates(original_graph)))
+
+    metrics, raw_data = run_experiment(original_graph, ftrp, metric_groups=metric_groups)
+    write_experiment(exp_name, data_path, metrics, raw_data)
+
+
+def _attach_worker(handle):
+    """
+    Attaches a worker process to the shared original graph and builds,
+    once for all its jobs, the graph view and the original metrics.
+    """
+    shared = SharedGraph.attach(handle)
+    _worker_graph['shared'] = shared
+    _worker_graph['view'] = shared.graph_view()
+    _worker_graph['metrics'] = {name: shared.node_metrics(name) for name in shared.metric_names()}
+
+
+def _run_shared_experiment(job):
+    """
+    Runs one experiment in a worker process over the shared original graph.
+    NoisyGraph only draws from numpy.random, so re-seeding it here gives
+    the same noisy graph as a serial run.
+    """
+    ftrp, seed, metric_groups, centrality_backend, raw_data = job
+    random.seed(seed)
+    numpy.random.seed(seed)
+
+    return run_experiment(_worker_graph['view'], ftrp, _worker_graph['metrics'], metric_groups, centrality_backend,
+                          raw_data)
+
+
+def run_experiments_in_parallel(original_graph: nx.Graph, ftrps: list, seed: int, workers: int = None,
+                                metric_groups: list = None, centrality_backend: str = 'networkx',
+                                raw_data: bool = True):
+    """
+    Runs the experiments of every ftrp over the same original graph on a
+    pool of `workers` processes. The original graph and its centralities
+    are computed once and placed in shared memory, where all the workers
+    read them without keeping a copy each. Yields the metrics and raw
+    data of every experiment in the order of `ftrps`.
+    """
+    # removing graph isolates
+    # NoisyGraph is not intended to deal with isolated nodes
+    original_graph.remove_nodes_from(list(nx.isolates(original_graph)))
+
+    jobs = [(ftrp, seed, metric_groups, centrality_backend, raw_data) for ftrp in ftrps]
+    original_metrics = original_centralities(original_graph, metric_groups, centrality_backend)
+    with SharedGraph.publish(original_graph, original_metrics) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker,
+                                 initargs=(shared.handle,)) as executor:
+            yield from executor.map(_run_shared_experiment, jobs)
+
+
+def perform_replicated_experiment(graph_factory, ftrp: float, exp_name: str, data_path: str, seed: int,
+                                  replicates: int, tolerance: float = None, min_replicates: int = 3,
+                                  confidence: float = 0.95, metric_groups: list = None,
+                                  centrality_backend: str = 'networkx'):
+    """
+    Runs the experiment on `replicates` graph realizations, seeding the
+    i-th one with `seed + i`, and writes a single row with the mean,
+    variance and quantiles of every metric. Metrics are aggregated online,
+    so memory does not grow with the number of replicates. Non-finite
+    values, e.g. attack AUCs without fake edges, are left out of the
+    aggregates and counted in the `_nonfinite` column of the metric. If
+    `tolerance` is given, replicates stop once the confidence interval of
+    every metric mean is narrower than `tolerance` times the mean
+    (absolute width for zero means), after at least `min_replicates` runs.
+    Metrics without finite values do not hold the stop back.
+    """
+    print(exp_name)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    columns = metric_columns(metric_groups)
+    summaries = {metric: (RunningStats(), QuantileSketch()) for metric in columns}
+
+    no_replicates = 0
+    for replicate in range(replicates):
+        # setting seeds for reproducibility
+        random.seed(seed + replicate)
+        numpy.random.seed(seed + replicate)
+
+        original_graph = graph_factory()
+        original_graph.remove_nodes_from(list(nx.isolates(original_graph)))
+        metrics, _ = run_experiment(original_graph, ftrp, metric_groups=metric_groups,
+                                    centrality_backend=centrality_backend, raw_data=False)
+
+        no_replicates += 1
+        for metric, (stats, sketch) in summaries.items():
+            stats.add(metrics[metric])
+            sketch.add(metrics[metric])
+
+        if tolerance is not None and no_replicates >= min_replicates and all(
+                stats.count == 0 or stats.confidence_half_width(z) <= tolerance * (abs(stats.mean) or 1.0)
+                for stats, _ in summaries.values()):
+            break
+
+    result = f"{exp_name},{no_replicates}"
+    for metric in columns:
+        stats, sketch = summaries[metric]
+        mean = stats.mean if stats.count > 0 else float('nan')
+        result += f",{mean},{stats.variance(ddof=1)}"
+        result += "".join(f",{sketch.quantile(q)}" for q in REPLICATE_QUANTILES)
+        result += f",{stats.skipped}"
 
     f = open(data_path, "a")
-    f.write(result)
+    f.write(result + "\n")
     f.close()
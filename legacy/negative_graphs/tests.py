@@ -1,8 +1,12 @@
 import statistics
 import unittest
 from math import log
+import networkx as nx
+import numpy as np
 # noinspection PyUnresolvedReferences
 from noisy_graph import NoisyGraph
+# noinspection PyUnresolvedReferences
+from utilities import NegativeGraphView
 
 
 class NoisyGraphTest(unittest.TestCase):
@@ -186,5 +190,48 @@ class NoisyGraphTest(unittest.TestCase):
         self.assertTrue(len(missing_edges.intersection(fake_edges)) == 3)
 
 
+class NegativeGraphViewTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.gnp_random_graph(40, 0.3, seed=7)
+        self.graph = nx.relabel_nodes(self.graph, {node: f"n{node}" for node in self.graph})
+        self.graph.add_edge("n0", "n0")
+        self.graph.add_node("isolated")
+        self.complement = nx.complement(self.graph)
+        self.view = NegativeGraphView(self.graph)
+
+    def complement_matrix(self, nodes):
+        return nx.to_numpy_array(self.complement, nodelist=nodes, dtype=np.int8)
+
+    def test_edges(self):
+        edges = [frozenset(edge) for edge in self.view.edges()]
+        self.assertEqual(len(edges), len(set(edges)))
+        self.assertEqual(set(edges), {frozenset(edge) for edge in self.complement.edges})
+        self.assertEqual(self.view.number_of_edges(), self.complement.number_of_edges())
+
+    def test_degree_and_neighbors(self):
+        for node in self.graph:
+            self.assertEqual(self.view.degree(node), self.complement.degree(node))
+            self.assertEqual(set(self.view.neighbors(node)), set(self.complement.adj[node]))
+
+    def test_to_bitset(self):
+        nodes, bitset = self.view.to_bitset()
+        matrix = np.unpackbits(bitset, axis=1, count=len(nodes))
+        np.testing.assert_array_equal(matrix, self.complement_matrix(nodes))
+
+    def test_to_scipy_sparse_array(self):
+        nodes, array = self.view.to_scipy_sparse_array()
+        np.testing.assert_array_equal(array.toarray(), self.complement_matrix(nodes))
+        self.assertTrue(array.has_sorted_indices)
+
+    def test_exports_over_several_blocks(self):
+        graph = nx.gnp_random_graph(1100, 0.01, seed=3)
+        view = NegativeGraphView(graph)
+        nodes, bitset = view.to_bitset()
+        expected = 1 - nx.to_numpy_array(graph, nodelist=nodes, dtype=np.int8) - np.eye(len(nodes), dtype=np.int8)
+
+        np.testing.assert_array_equal(np.unpackbits(bitset, axis=1, count=len(nodes)), expected)
+        np.testing.assert_array_equal(view.to_scipy_sparse_array()[1].toarray(), expected)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,16 +1,165 @@
 import networkx as nx
+import numpy as np
 import statistics
+from scipy import sparse
 from tqdm import tqdm
 
 
+class NegativeGraphView:
+    """
+    A read-only view of the complement of an undirected graph.
+    Neighbor and degree queries are answered from the original
+    adjacency, so the complement edges are never stored.
+    """
+    def __init__(self, graph):
+        """
+        Initializes the view over a networkx graph. The graph is
+        not copied, later changes to it are reflected by the view.
+        :param graph: networkx graph
+        """
+        self.__graph = graph
+
+    @property
+    def nodes(self):
+        return self.__graph.nodes
+
+    def number_of_nodes(self):
+        """
+        Returns the number of nodes in the graph
+        :return: integer
+        """
+        return self.__graph.number_of_nodes()
+
+    def has_edge(self, node1, node2):
+        """
+        Checks whether the edge exists in the complement graph.
+        :param node1: hashable
+        :param node2: hashable
+        :return: boolean
+        """
+        return node1 != node2 and node1 in self.__graph and node2 in self.__graph \
+            and not self.__graph.has_edge(node1, node2)
+
+    def neighbors(self, node):
+        """
+        Yields the nodes that are not connected to `node` in
+        the original graph.
+        :param node: hashable
+        :return: generator of nodes
+        """
+        original_neighbors = self.__graph.adj[node]
+        for node2 in self.__graph.nodes:
+            if node2 != node and node2 not in original_neighbors:
+                yield node2
+
+    def degree(self, node):
+        """
+        Returns the degree of `node` in the complement graph.
+        :param node: hashable
+        :return: integer
+        """
+        original_neighbors = self.__graph.adj[node]
+        self_loop = 1 if node in original_neighbors else 0
+        return self.number_of_nodes() - 1 - (len(original_neighbors) - self_loop)
+
+    def number_of_edges(self):
+        """
+        Returns the number of edges in the complement graph.
+        :return: integer
+        """
+        no_nodes = self.number_of_nodes()
+        no_original_edges = self.__graph.number_of_edges() - nx.number_of_selfloops(self.__graph)
+        return no_nodes * (no_nodes - 1) // 2 - no_original_edges
+
+    def edges(self):
+        """
+        Yields every edge of the complement graph once.
+        :return: generator of two-tuples
+        """
+        nodes = list(self.__graph.nodes)
+        indptr, indices = self.__original_csr(nodes)
+        for start, block in self.__complement_blocks(indptr, indices, len(nodes)):
+            for offset, node_bits in enumerate(block):
+                row = start + offset
+                for column in np.flatnonzero(node_bits[row + 1:]) + row + 1:
+                    yield nodes[row], nodes[column]
+
+    def __original_csr(self, nodes):
+        """
+        Returns the CSR arrays (indptr, indices) of the original graph
+        following the order of `nodes`.
+        :param nodes: list of nodes
+        :return: 2-tuple of numpy arrays
+        """
+        index = {node: i for i, node in enumerate(nodes)}
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indices = []
+        for i, node in enumerate(nodes):
+            neighbors = [index[neighbor] for neighbor in self.__graph.adj[node]]
+            indices.extend(neighbors)
+            indptr[i + 1] = indptr[i] + len(neighbors)
+
+        return indptr, np.asarray(indices, dtype=np.int64)
+
+    @staticmethod
+    def __complement_blocks(indptr, indices, no_nodes, block_size=1024):
+        """
+        Yields the rows of the complement adjacency matrix in boolean
+        blocks of at most `block_size` rows, so only one block is dense
+        at a time.
+        :return: generator of 2-tuples (first row, boolean numpy array)
+        """
+        for start in range(0, no_nodes, block_size):
+            stop = min(start + block_size, no_nodes)
+            block = np.ones((stop - start, no_nodes), dtype=bool)
+            rows = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+            block[rows, indices[indptr[start]:indptr[stop]]] = False
+            block[np.arange(stop - start), np.arange(start, stop)] = False
+            yield start, block
+
+    def to_bitset(self):
+        """
+        Exports the complement adjacency matrix as a bitset, where row `i`
+        holds the packed bits of the neighbors of `nodes[i]`. The matrix
+        needs n * ceil(n / 8) bytes.
+        :return: 2-tuple (nodes, numpy uint8 array of shape (n, ceil(n / 8)))
+        """
+        nodes = list(self.__graph.nodes)
+        indptr, indices = self.__original_csr(nodes)
+        bitset = np.zeros((len(nodes), (len(nodes) + 7) // 8), dtype=np.uint8)
+        for start, block in self.__complement_blocks(indptr, indices, len(nodes)):
+            bitset[start:start + len(block)] = np.packbits(block, axis=1)
+
+        return nodes, bitset
+
+    def to_scipy_sparse_array(self):
+        """
+        Exports the complement adjacency matrix as a scipy CSR array
+        following the order of the returned nodes. The rows are built
+        block by block, without the full bitset.
+        :return: 2-tuple (nodes, scipy.sparse.csr_array)
+        """
+        nodes = list(self.__graph.nodes)
+        no_nodes = len(nodes)
+        indptr, indices = self.__original_csr(nodes)
+        index_dtype = np.int32 if no_nodes < 2 ** 31 else np.int64
+
+        degrees = np.zeros(no_nodes, dtype=np.int64)
+        block_indices = []
+        for start, block in self.__complement_blocks(indptr, indices, no_nodes):
+            degrees[start:start + len(block)] = np.count_nonzero(block, axis=1)
+            block_indices.append(np.nonzero(block)[1].astype(index_dtype))
+
+        complement_indptr = np.concatenate(([0], np.cumsum(degrees)))
+        complement_indices = np.concatenate(block_indices) if block_indices else np.empty(0, dtype=index_dtype)
+        data = np.ones(len(complement_indices), dtype=np.int8)
+        return nodes, sparse.csr_array((data, complement_indices, complement_indptr), shape=(no_nodes, no_nodes))
+
+
 def negative_graph(graph):
     neg_graph = nx.Graph()
     neg_graph.add_nodes_from(graph.nodes)
-
-    for node1 in tqdm(neg_graph.nodes):
-        for node2 in neg_graph.nodes:
-            if node1 != node2 and not graph.has_edge(node1, node2):
-                neg_graph.add_edge(node1, node2)
+    neg_graph.add_edges_from(NegativeGraphView(graph).edges())
 
     return neg_graph
 
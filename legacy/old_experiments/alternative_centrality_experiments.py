@@ -6,6 +6,7 @@ import numpy
 from legacy.negative_graphs.noisy_graph import NoisyGraph
 from networkx.algorithms import centrality
 from legacy.negative_graphs.utilities import dict_squared_error_profile
+from noisy_graphs.dynamic_centrality import DynamicCentrality
 
 
 if __name__ == '__main__':
@@ -43,6 +44,9 @@ if __name__ == '__main__':
         noisy_graph = NoisyGraph()
         noisy_graph.add_edges_from(graph.edges, real=True)
 
+        # centralities of the noisy graph, updated with the new fake edges of every observation
+        dynamic_centrality = DynamicCentrality(graph)
+
         # generating 20 observations
         for i in range(0, 101, 5):
             # obtaining fraction
@@ -55,15 +59,16 @@ if __name__ == '__main__':
             graph_uncertainty = noisy_graph.uncertainty()
             mean_uncertainty, std_dev_uncertainty, min_uncertainty, max_uncertainty = noisy_graph.uncertainty_profile()
 
-            # disturbing graph
-            graph = nx.Graph(noisy_graph.edges())
+            # disturbing graph, already present edges are ignored
+            dynamic_centrality.add_edges_from(noisy_graph.edges_if(real=False))
+            _, _, no_edges = noisy_graph.number_of_edges()
 
             # iterating over centrality algorithms
             for alg in centrality_algorithms:
-                modified_metrics = alg(graph)
+                modified_metrics = getattr(dynamic_centrality, alg.__name__)()
                 mean_se, min_se, max_se = dict_squared_error_profile(modified_metrics, original_metrics[alg.__name__])
 
-                print(graph_size, fraction, graph.number_of_edges(),
+                print(graph_size, fraction, no_edges,
                       graph_uncertainty, mean_uncertainty, std_dev_uncertainty, min_uncertainty, max_uncertainty,
                       alg.__name__, mean_se, min_se, max_se,
                       sep=',')
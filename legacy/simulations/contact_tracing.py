@@ -4,6 +4,7 @@ import numpy
 
 
 from legacy.negative_graphs.noisy_graph import NoisyGraph
+from noisy_graphs.contact_tracing import contact_tracing_trials
 
 if __name__ == '__main__':
 
@@ -24,7 +25,7 @@ if __name__ == '__main__':
 
     # printing headers
     print('fraction,graph_uncertainty,mean_uncertainty,std_dev_uncertainty,min_uncertainty,max_uncertainty,'
-          'number_contacts')
+          'number_contacts,real_contacts,fake_contacts')
 
     # generating 20 observations
     for i in range(0, 101, 5):
@@ -38,14 +39,13 @@ if __name__ == '__main__':
         graph_uncertainty = noisy_graph.uncertainty()
         mean_uncertainty, std_dev_uncertainty, min_uncertainty, max_uncertainty = noisy_graph.uncertainty_profile()
 
-        for j in range(10):
-            infected_nodes = random.sample(noisy_graph.nodes(), no_infected_nodes)
-            contacted_nodes = set()
-
-            for node in infected_nodes:
-                contacted_nodes = contacted_nodes.union(noisy_graph.node_neighbors(node))
-
+        # number_contacts is the union of the neighbors of the infected nodes,
+        # so it includes the infected nodes that neighbor other infected ones
+        trials = contact_tracing_trials(noisy_graph, no_infected_nodes, no_trials=10, seed=seed)
+        number_contacts = trials['contacts'] + trials['infected_contacts']
+        for contacts, real_contacts, fake_contacts in zip(number_contacts, trials['real_contacts'],
+                                                          trials['fake_contacts']):
             print(fraction,
                   graph_uncertainty, mean_uncertainty, std_dev_uncertainty, min_uncertainty, max_uncertainty,
-                  len(contacted_nodes),
+                  contacts, real_contacts, fake_contacts,
                   sep=',')
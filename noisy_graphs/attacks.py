@@ -0,0 +1,104 @@
+import numpy as np
+from scipy.stats import rankdata
+from noisy_graphs.csr import adjacency_matrices
+
+
+# structural scores an attacker can compute on the noisy graph
+ATTACK_SCORES = ['cn', 'aa', 'jaccard']
+
+
+def noisy_edge_scores(noisy_graph):
+    """
+    Scores every edge of the noisy graph, real or fake, with the common
+    neighbors, Adamic-Adar and Jaccard indexes of the noisy graph, the one
+    an attacker observes. The neighborhoods of the endpoints of all edges
+    are intersected at once with a row-wise product of the sparse
+    adjacency matrix.
+    :param noisy_graph: NoisyGraph
+    :return: 2-tuple (dictionary of score name to float array, boolean
+             array flagging the real edges), one entry per edge
+    """
+    _, real_adjacency, fake_adjacency = adjacency_matrices(noisy_graph)
+    adjacency = (real_adjacency + fake_adjacency).tocsr()
+
+    edges = adjacency.tocoo()
+    upper = edges.row < edges.col
+    rows, columns = edges.row[upper], edges.col[upper]
+    real = np.asarray(real_adjacency[rows, columns]).ravel() > 0
+
+    degrees = np.diff(adjacency.indptr).astype(np.float64)
+    common_neighbors = adjacency[rows].multiply(adjacency[columns]).tocsr()
+
+    # common neighbors have degree 2 or more, so their logarithm is positive
+    inverse_log_degrees = np.zeros_like(degrees)
+    inverse_log_degrees[degrees > 1] = 1 / np.log(degrees[degrees > 1])
+
+    no_common_neighbors = np.asarray(common_neighbors.sum(axis=1)).ravel()
+    union_size = degrees[rows] + degrees[columns] - no_common_neighbors
+    scores = {
+        'cn': no_common_neighbors,
+        'aa': common_neighbors @ inverse_log_degrees,
+        'jaccard': np.divide(no_common_neighbors, union_size, out=np.zeros_like(union_size), where=union_size > 0),
+    }
+
+    return scores, real
+
+
+def auc(scores, positive):
+    """
+    Area under the ROC curve of `scores` separating the positive entries
+    from the negative ones, from the average ranks of the scores, so ties
+    count as half.
+    :param scores: float array
+    :param positive: boolean array
+    :return: float, nan if there are no positive or no negative entries
+    """
+    no_positive = np.count_nonzero(positive)
+    no_negative = len(positive) - no_positive
+    if no_positive == 0 or no_negative == 0:
+        return float('nan')
+
+    ranks = rankdata(scores)
+    return float((ranks[positive].sum() - no_positive * (no_positive + 1) / 2) / (no_positive * no_negative))
+
+
+def precision_at_k(scores, positive, k):
+    """
+    Fraction of positive entries among the `k` highest scores. Entries
+    tied with the k-th score are counted by their expected share, so the
+    order of the entries does not matter.
+    :param scores: float array
+    :param positive: boolean array
+    :param k: integer
+    :return: float, nan if `k` is 0
+    """
+    k = min(k, len(scores))
+    if k == 0:
+        return float('nan')
+
+    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = scores > threshold
+    tied = scores == threshold
+    no_positive = np.count_nonzero(positive[above]) + (k - np.count_nonzero(above)) * positive[tied].mean()
+    return float(no_positive / k)
+
+
+def link_inference_attack(noisy_graph, k=None):
+    """
+    Measures how well an attacker ranking the edges of the noisy graph by
+    structural scores separates the real edges from the fake ones.
+    :param noisy_graph: NoisyGraph
+    :param k: number of top ranked edges for the precision, the number of
+              real edges by default
+    :return: dictionary with the '<score>_auc' and '<score>_precision_at_k'
+             of every score in ATTACK_SCORES
+    """
+    scores, real = noisy_edge_scores(noisy_graph)
+    k = np.count_nonzero(real) if k is None else k
+
+    results = {}
+    for name in ATTACK_SCORES:
+        results[f"{name}_auc"] = auc(scores[name], real)
+        results[f"{name}_precision_at_k"] = precision_at_k(scores[name], real, k)
+
+    return results
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from noisy_graphs.noisy_graph import NoisyGraph
+from noisy_graphs.streaming import QuantileSketch, RunningStats
+
+
+# latency percentiles reported by the collector
+LATENCY_QUANTILES = [0.5, 0.95, 0.99]
+
+
+class NeighborListCollector:
+    """
+    An asyncio service that receives the neighbor list of every vertex
+    and builds a noisy graph with them, as `NoisyGraph.construct_graph`
+    does in-process. Submissions are queued and a single consumer applies
+    them in batches with `add_node_with_neighbors`, in a worker thread and
+    holding `lock`, so the event loop keeps accepting submissions while a
+    batch is applied and readers never see a half-applied batch.
+    """
+    def __init__(self, ftrp, batch_size=256, max_queue_size=10000, seed=None):
+        """
+        Initializes a collector. Call `start` from a running event loop,
+        or use it as an async context manager, before submitting.
+        :param ftrp: fake-to-real edge proportion of the noisy graph
+        :param batch_size: maximum number of neighbor lists applied together
+        :param max_queue_size: submissions wait once this many are queued
+        :param seed: seed of the counter-based budgets, see `NoisyGraph`
+        """
+        self.noisy_graph = NoisyGraph(ftrp=ftrp, seed=seed)
+        self.lock = asyncio.Lock()
+        self.__batch_size = batch_size
+        self.__queue = asyncio.Queue(maxsize=max_queue_size)
+        self.__consumer = None
+        self.__latency = RunningStats()
+        self.__latency_sketch = QuantileSketch()
+        self.__no_batches = 0
+        self.__start_time = None
+        self.__end_time = None
+
+    async def start(self):
+        self.__start_time = time.perf_counter()
+        self.__consumer = asyncio.create_task(self.__consume())
+
+    async def stop(self):
+        """
+        Waits until every queued submission is applied and stops the consumer.
+        """
+        await self.__queue.join()
+        self.__consumer.cancel()
+        try:
+            await self.__consumer
+        except asyncio.CancelledError:
+            pass
+        self.__end_time = time.perf_counter()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    async def submit(self, node, neighbors):
+        """
+        Submits the neighbor list of a node and waits until it is part of
+        the noisy graph.
+        :param node: hashable
+        :param neighbors: list of nodes
+        :return: sigma of the node once its fake edges are added
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((node, list(neighbors), future, time.perf_counter()))
+        return await future
+
+    def __apply(self, batch):
+        """
+        Applies a batch of submissions in order.
+        :return: list of node sigmas, or the exception raised by the submission
+        """
+        results = []
+        for node, neighbors, _, _ in batch:
+            try:
+                self.noisy_graph.add_node_with_neighbors(node, neighbors)
+                results.append(self.noisy_graph.get_node_sigma(node))
+            except Exception as exception:
+                results.append(exception)
+        return results
+
+    async def __consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.__queue.get()]
+            while len(batch) < self.__batch_size and not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+
+            try:
+                async with self.lock:
+                    results = await loop.run_in_executor(None, self.__apply, batch)
+                self.__no_batches += 1
+
+                now = time.perf_counter()
+                for (_, _, future, submitted_at), result in zip(batch, results):
+                    self.__latency.add(now - submitted_at)
+                    self.__latency_sketch.add(now - submitted_at)
+                    # the client stopped waiting, its neighbors are applied anyway
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+            finally:
+                for _ in batch:
+                    self.__queue.task_done()
+
+    async def read(self, function):
+        """
+        Calls `function` with the noisy graph while no batch is being applied.
+        :param function: function receiving a NoisyGraph
+        :return: the result of `function`
+        """
+        async with self.lock:
+            return function(self.noisy_graph)
+
+    def report(self):
+        """
+        Ingestion statistics of the submissions applied so far.
+        :return: dictionary with the number of submissions and batches, the
+                 elapsed seconds, the throughput in submissions per second
+                 and the mean and percentiles of the latency in seconds
+        """
+        end_time = self.__end_time or time.perf_counter()
+        seconds = end_time - self.__start_time if self.__start_time is not None else 0.0
+        report = {
+            'submissions': self.__latency.count,
+            'batches': self.__no_batches,
+            'seconds': seconds,
+            'throughput': self.__latency.count / seconds if seconds > 0 else 0.0,
+            'latency_mean': self.__latency.mean,
+        }
+        for q in LATENCY_QUANTILES:
+            report[f"latency_p{round(q * 100)}"] = self.__latency_sketch.quantile(q)
+
+        return report
+
+
+async def simulate_clients(collector, graph, concurrency=1000):
+    """
+    Simulates one client per node of `graph` submitting its neighbor
+    list, with at most `concurrency` submissions in flight. Nodes without
+    neighbors do not submit, as in `construct_graph`.
+    :param collector: started NeighborListCollector
+    :param graph: networkx graph
+    :param concurrency: integer
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def client(node, neighbors):
+        async with semaphore:
+            await collector.submit(node, neighbors)
+
+    await asyncio.gather(*(client(node, list(graph.neighbors(node)))
+                           for node in graph.nodes if graph.degree(node) > 0))
+
+
+def collect_graph(graph, ftrp, concurrency=1000, batch_size=256, seed=None):
+    """
+    Builds the noisy graph of `graph` through a collector fed by simulated
+    clients. With `concurrency` 1 submissions arrive in node order and
+    the result is the one of `construct_graph`.
+    :param graph: networkx graph
+    :param ftrp: fake-to-real edge proportion
+    :param concurrency: maximum number of submissions in flight
+    :param batch_size: maximum number of neighbor lists applied together
+    :param seed: seed of the counter-based budgets, see `NoisyGraph`
+    :return: 2-tuple (NoisyGraph, report dictionary)
+    """
+    async def main():
+        async with NeighborListCollector(ftrp, batch_size=batch_size, seed=seed) as collector:
+            await simulate_clients(collector, graph, concurrency)
+        return collector.noisy_graph, collector.report()
+
+    return asyncio.run(main())
@@ -0,0 +1,85 @@
+import numpy as np
+from noisy_graphs.csr import adjacency_matrices
+
+
+def _reach(adjacency, reached, hops):
+    """
+    Expands every column of `reached` by `hops` breadth-first steps over
+    `adjacency` at once, using one sparse matrix product per hop.
+    :param adjacency: scipy sparse array of shape (n, n)
+    :param reached: boolean array of shape (n, trials)
+    :param hops: integer
+    :return: boolean array of shape (n, trials)
+    """
+    reached = reached.copy()
+    frontier = reached
+    for _ in range(hops):
+        frontier = (adjacency @ frontier.astype(np.float32) > 0) & ~reached
+        if not frontier.any():
+            break
+        reached |= frontier
+
+    return reached
+
+
+def split_contacts(real_graph, noisy_graph, infected, hops, reach=_reach):
+    """
+    Traces the nodes within `hops` of the infected ones over the noisy
+    graph and splits them between the ones that would have been traced
+    using the real edges only and the ones traced because of fake edges.
+    :param real_graph: adjacency of the real edges, as `reach` takes it
+    :param noisy_graph: adjacency of the real and fake edges, as `reach` takes it
+    :param infected: boolean array of shape (n,) or (n, trials)
+    :param hops: maximum distance to infected nodes
+    :param reach: function (graph, infected, hops) returning the reached
+                  nodes, batched sparse products by default
+    :return: 2-tuple (real_contacts, fake_contacts), one count per trial
+    """
+    real_contacts = (reach(real_graph, infected, hops) & ~infected).sum(axis=0)
+    contacts = (reach(noisy_graph, infected, hops) & ~infected).sum(axis=0)
+    return real_contacts, contacts - real_contacts
+
+
+def contact_tracing_trials(noisy_graph, no_infected, no_trials, hops=1, seed=None, batch_size=64):
+    """
+    Simulates `no_trials` independent contact tracing rounds. In every trial
+    `no_infected` nodes are sampled and all nodes within `hops` of them in
+    the noisy graph are traced. Traced nodes are split between the ones that
+    would have been traced using the real edges only and the ones that are
+    traced because of fake edges. Trials are processed in batches of
+    `batch_size` columns of sparse matrix products.
+    :param noisy_graph: NoisyGraph
+    :param no_infected: number of infected nodes per trial
+    :param no_trials: integer
+    :param hops: maximum distance to infected nodes
+    :param seed: seed or numpy.random.Generator
+    :param batch_size: number of trials simulated together
+    :return: dictionary of integer arrays of length `no_trials` with keys
+             'contacts', 'real_contacts' and 'fake_contacts', plus
+             'infected_contacts', the infected nodes with an infected
+             neighbor in the noisy graph, which tracing does not count
+    """
+    rng = np.random.default_rng(seed)
+    _, real_adjacency, fake_adjacency = adjacency_matrices(noisy_graph)
+    noisy_adjacency = real_adjacency + fake_adjacency
+    no_nodes = real_adjacency.shape[0]
+
+    results = {key: np.empty(no_trials, dtype=np.int64)
+               for key in ('contacts', 'real_contacts', 'fake_contacts', 'infected_contacts')}
+    for start in range(0, no_trials, batch_size):
+        stop = min(start + batch_size, no_trials)
+
+        # sampling infected nodes without replacement for every trial
+        keys = rng.random((stop - start, no_nodes))
+        infected_nodes = np.argpartition(keys, no_infected - 1, axis=1)[:, :no_infected]
+        infected = np.zeros((no_nodes, stop - start), dtype=bool)
+        infected[infected_nodes, np.arange(stop - start)[:, None]] = True
+
+        real_contacts, fake_contacts = split_contacts(real_adjacency, noisy_adjacency, infected, hops)
+        results['real_contacts'][start:stop] = real_contacts
+        results['fake_contacts'][start:stop] = fake_contacts
+        infected_neighbors = noisy_adjacency @ infected.astype(np.float32) > 0
+        results['infected_contacts'][start:stop] = (infected_neighbors & infected).sum(axis=0)
+
+    results['contacts'] = results['real_contacts'] + results['fake_contacts']
+    return results
@@ -0,0 +1,73 @@
+import hashlib
+import numpy as np
+from scipy.stats import binom
+
+
+# SplitMix64 constants
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_MULTIPLIER_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_MULTIPLIER_2 = np.uint64(0x94D049BB133111EB)
+
+
+def rng_key(seed):
+    """
+    Draws the 64-bit key of a counter-based stream.
+    :param seed: integer, numpy.random.SeedSequence or numpy.random.Generator
+    :return: integer
+    """
+    generator = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    return int(generator.integers(0, 2 ** 64, dtype=np.uint64))
+
+
+def _splitmix64(values):
+    """
+    SplitMix64 finalizer of every value of a uint64 array.
+    """
+    values = values + GOLDEN_GAMMA
+    values = (values ^ (values >> np.uint64(30))) * MIX_MULTIPLIER_1
+    values = (values ^ (values >> np.uint64(27))) * MIX_MULTIPLIER_2
+    return values ^ (values >> np.uint64(31))
+
+
+def _node_ids(nodes):
+    """
+    Maps node labels to 64-bit counters. Integer labels are used as they
+    are; other labels are hashed with a 64-bit blake2b of their repr,
+    which, unlike `hash`, does not change between processes.
+    """
+    nodes = list(nodes)
+    if all(isinstance(node, (int, np.integer)) for node in nodes):
+        return np.array(nodes, dtype=np.int64).astype(np.uint64)
+    return np.array([int.from_bytes(hashlib.blake2b(repr(node).encode(), digest_size=8).digest(), 'little')
+                     for node in nodes], dtype=np.uint64)
+
+
+def node_uniforms(key, nodes):
+    """
+    Returns one uniform number in (0, 1) per node. Every number is a pure
+    function of the key and the node label, so it does not depend on the
+    order the nodes are visited or on the process computing it.
+    :param key: integer, see `rng_key`
+    :param nodes: iterable of hashable
+    :return: float array
+    """
+    with np.errstate(over='ignore'):
+        hashed = _splitmix64(_splitmix64(_node_ids(nodes)) ^ np.uint64(key))
+    return ((hashed >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0 ** -53
+
+
+def fake_edge_budgets(key, nodes, degrees, ftrp):
+    """
+    Draws the number of fake edges of every node at once. A node with
+    `d` real edges gets a Binomial(d, ftrp) budget, the distribution of
+    `NoisyGraph.number_of_fake_edges_to_add`, obtained by inverting the
+    cdf at the node's uniform number.
+    :param key: integer, see `rng_key`
+    :param nodes: iterable of hashable
+    :param degrees: iterable of integers, the real degree of every node
+    :param ftrp: fake-to-real edge proportion
+    :return: integer array
+    """
+    uniforms = node_uniforms(key, nodes)
+    budgets = binom.ppf(uniforms, np.asarray(degrees, dtype=np.int64), min(ftrp, 1.0))
+    return budgets.astype(np.int64)
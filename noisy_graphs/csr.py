@@ -0,0 +1,56 @@
+import numpy as np
+from scipy import sparse
+
+
+def noisy_graph_to_csr(noisy_graph):
+    """
+    Exports a noisy graph to CSR arrays. Row `i` of the adjacency holds
+    the neighbors of `nodes[i]`, real and fake ones, and `real` flags which
+    of the stored neighbors are connected through a real edge. Only the
+    public `nodes` and `node_neighbors_if` methods are used, so legacy
+    noisy graphs can be exported as well. Snapshots already stored as
+    CSR arrays are returned without copying.
+    :param noisy_graph: NoisyGraph
+    :return: 4-tuple (nodes, indptr, indices, real)
+    """
+    if hasattr(noisy_graph, 'csr_arrays'):
+        return noisy_graph.csr_arrays()
+
+    nodes = noisy_graph.nodes()
+    index = {node: i for i, node in enumerate(nodes)}
+
+    degrees = np.zeros(len(nodes), dtype=np.int64)
+    indices = []
+    real = []
+    for i, node in enumerate(nodes):
+        real_neighbors = noisy_graph.node_neighbors_if(node, real=True)
+        fake_neighbors = noisy_graph.node_neighbors_if(node, real=False)
+        indices.extend(index[neighbor] for neighbor in real_neighbors)
+        indices.extend(index[neighbor] for neighbor in fake_neighbors)
+        real.extend([True] * len(real_neighbors))
+        real.extend([False] * len(fake_neighbors))
+        degrees[i] = len(real_neighbors) + len(fake_neighbors)
+
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    return nodes, indptr, np.asarray(indices, dtype=np.int64), np.asarray(real, dtype=bool)
+
+
+def adjacency_matrices(noisy_graph):
+    """
+    Returns the real and the fake adjacency matrices of a noisy graph as
+    scipy CSR arrays, both following the order of the returned nodes.
+    :param noisy_graph: NoisyGraph
+    :return: 3-tuple (nodes, real_adjacency, fake_adjacency)
+    """
+    nodes, indptr, indices, real = noisy_graph_to_csr(noisy_graph)
+    no_nodes = len(nodes)
+    rows = np.repeat(np.arange(no_nodes), np.diff(indptr))
+
+    matrices = []
+    for mask in (real, ~real):
+        data = np.ones(np.count_nonzero(mask), dtype=np.float32)
+        matrix = sparse.csr_array((data, (rows[mask], indices[mask])), shape=(no_nodes, no_nodes))
+        matrices.append(matrix)
+
+    return nodes, matrices[0], matrices[1]
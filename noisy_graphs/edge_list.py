@@ -0,0 +1,178 @@
+import os
+import networkx as nx
+import numpy as np
+from itertools import islice
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+COMMENT_PREFIXES = ('#', '%')
+
+
+def _sidecar_paths(path):
+    """
+    Returns the paths of the binary files used to cache a parsed edge list.
+    :param path: path of the text edge list
+    :return: 2-tuple (edges_path, labels_path)
+    """
+    return f"{path}.edges.npy", f"{path}.labels.npy"
+
+
+def _parse_chunk(lines):
+    """
+    Parses a chunk of edge list lines into a (k, 2) array of labels.
+    Only the first two columns of each line are kept, so weighted
+    edge lists are accepted as well.
+    :param lines: list of strings
+    :return: numpy array of shape (k, 2)
+    """
+    lines = [line for line in lines if line.strip() and not line.lstrip().startswith(COMMENT_PREFIXES)]
+    if not lines:
+        return np.empty((0, 2), dtype=str)
+
+    no_columns = len(lines[0].split())
+    tokens = " ".join(lines).split()
+    if len(tokens) == no_columns * len(lines):
+        return np.array(tokens).reshape(-1, no_columns)[:, :2]
+
+    # rows with a different number of columns
+    return np.array([line.split()[:2] for line in lines])
+
+
+def _read_labels(path, chunk_size):
+    """
+    Reads a whitespace separated edge list in chunks of `chunk_size`
+    lines. Labels are converted to integers when all of them are
+    integers, otherwise they are kept as strings.
+    :param path: path of the text edge list
+    :param chunk_size: integer
+    :return: numpy array of shape (m, 2)
+    """
+    chunks = []
+    with open(path, "r") as file:
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                break
+            chunks.append(_parse_chunk(lines))
+
+    raw_edges = np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=str)
+    try:
+        return raw_edges.astype(np.int64)
+    except ValueError:
+        return raw_edges
+
+
+def _relabel(raw_edges):
+    """
+    Maps the labels in `raw_edges` to contiguous integers following the
+    order in which they first appear, the same order networkx would
+    assign when adding the edges one by one. Self loops and duplicated
+    edges (in either direction) are removed.
+    :param raw_edges: numpy array of shape (m, 2)
+    :return: 2-tuple (edges, labels) where labels[i] is the label of node i
+    """
+    unique_labels, first_index, inverse = np.unique(raw_edges.ravel(), return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    edges = rank[inverse.reshape(-1, 2)]
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges.sort(axis=1)
+
+    no_nodes = len(unique_labels)
+    keys = edges[:, 0] * no_nodes + edges[:, 1]
+    _, first_edge = np.unique(keys, return_index=True)
+    edges = edges[np.sort(first_edge)]
+
+    return edges, unique_labels[order]
+
+
+def load_edge_list(path, cache=True, chunk_size=1_000_000):
+    """
+    Loads an undirected edge list from a whitespace separated text file.
+    Node labels are mapped to contiguous integers and duplicated edges
+    and self loops are dropped. If `cache` is True the parsed arrays are
+    stored next to the text file as `.npy` sidecars, and later loads
+    memory-map them instead of parsing the text again.
+    :param path: path of the text edge list
+    :param cache: boolean
+    :param chunk_size: number of lines parsed at a time
+    :return: 2-tuple (edges, labels) where edges is an (m, 2) integer array
+             and labels[i] is the original label of node i
+    """
+    edges_path, labels_path = _sidecar_paths(path)
+    if cache and os.path.exists(edges_path) and os.path.exists(labels_path) \
+            and os.path.getmtime(edges_path) >= os.path.getmtime(path):
+        return np.load(edges_path, mmap_mode='r'), np.load(labels_path, mmap_mode='r')
+
+    edges, labels = _relabel(_read_labels(path, chunk_size))
+    if cache:
+        np.save(edges_path, edges)
+        np.save(labels_path, labels)
+
+    return edges, labels
+
+
+def edges_to_csr(edges, no_nodes=None):
+    """
+    Builds the symmetric CSR adjacency arrays of an undirected graph
+    given as an (m, 2) integer edge array.
+    :param edges: numpy array of shape (m, 2)
+    :param no_nodes: integer, inferred from the edges if not given
+    :return: 2-tuple (indptr, indices)
+    """
+    edges = np.asarray(edges, dtype=np.int64)
+    if no_nodes is None:
+        no_nodes = int(edges.max()) + 1 if len(edges) else 0
+
+    sources = np.concatenate((edges[:, 0], edges[:, 1]))
+    targets = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.lexsort((targets, sources))
+
+    indptr = np.zeros(no_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=no_nodes), out=indptr[1:])
+    return indptr, targets[order]
+
+
+def edges_to_networkx(edges, labels=None):
+    """
+    Builds a networkx graph from an (m, 2) integer edge array. If `labels`
+    is given nodes are named after them instead of their integer index.
+    :param edges: numpy array of shape (m, 2)
+    :param labels: numpy array or None
+    :return: networkx graph
+    """
+    edges = np.asarray(edges).tolist()
+    graph = nx.Graph()
+    if labels is None:
+        graph.add_edges_from(edges)
+    else:
+        labels = np.asarray(labels).tolist()
+        graph.add_nodes_from(labels)
+        graph.add_edges_from((labels[node1], labels[node2]) for node1, node2 in edges)
+
+    return graph
+
+
+def edges_to_noisy_graph(edges, ftrp, labels=None):
+    """
+    Builds a noisy graph from an (m, 2) integer edge array, collecting
+    the neighbor list of every node in index order like
+    `NoisyGraph.construct_graph` does for a networkx graph.
+    :param edges: numpy array of shape (m, 2)
+    :param ftrp: fake-to-real edge proportion
+    :param labels: numpy array or None
+    :return: NoisyGraph
+    """
+    indptr, indices = edges_to_csr(edges, None if labels is None else len(labels))
+    names = np.arange(len(indptr) - 1).tolist() if labels is None else np.asarray(labels).tolist()
+    indices = indices.tolist()
+
+    noisy_graph = NoisyGraph(ftrp=ftrp)
+    for node in range(len(indptr) - 1):
+        neighbors = [names[neighbor] for neighbor in indices[indptr[node]:indptr[node + 1]]]
+        if neighbors:
+            noisy_graph.add_node_with_neighbors(names[node], neighbors)
+
+    return noisy_graph
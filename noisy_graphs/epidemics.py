@@ -0,0 +1,199 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from noisy_graphs.contact_tracing import split_contacts
+from noisy_graphs.csr import adjacency_matrices
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+# CSR arrays shared by the trials of a worker process
+_worker_graph = {}
+
+
+def _gather_neighbors(indptr, indices, frontier):
+    """
+    Returns the concatenated neighbor slices of all nodes in `frontier`
+    without a Python loop over the frontier.
+    :param indptr: CSR row pointer array
+    :param indices: CSR column array
+    :param frontier: integer array of nodes
+    :return: integer array of nodes (with repetitions)
+    """
+    starts = indptr[frontier]
+    lengths = indptr[frontier + 1] - starts
+    total = lengths.sum()
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype)
+
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
+
+
+def frontier_bfs(indptr, indices, sources, hops):
+    """
+    Marks every node within `hops` of any of the `sources` with a
+    frontier-based breadth-first search over CSR arrays.
+    :param indptr: CSR row pointer array
+    :param indices: CSR column array
+    :param sources: integer array of nodes
+    :param hops: integer
+    :return: boolean array of length n
+    """
+    reached = np.zeros(len(indptr) - 1, dtype=bool)
+    reached[sources] = True
+    frontier = np.unique(sources)
+    for _ in range(hops):
+        neighbors = _gather_neighbors(indptr, indices, frontier)
+        frontier = np.unique(neighbors[~reached[neighbors]])
+        if len(frontier) == 0:
+            break
+        reached[frontier] = True
+
+    return reached
+
+
+def sir_spread(indptr, indices, sources, beta, gamma, rng, max_steps=1000):
+    """
+    Runs a discrete time SIR epidemic. At every step each infected node
+    infects each susceptible neighbor with probability `beta` and then
+    recovers with probability `gamma`.
+    :param indptr: CSR row pointer array
+    :param indices: CSR column array
+    :param sources: integer array of initially infected nodes
+    :param beta: transmission probability per edge and step
+    :param gamma: recovery probability per step
+    :param rng: numpy.random.Generator
+    :param max_steps: integer
+    :return: boolean array of length n marking every node ever infected
+    """
+    ever_infected = np.zeros(len(indptr) - 1, dtype=bool)
+    ever_infected[sources] = True
+    infected = np.unique(sources)
+    for _ in range(max_steps):
+        if len(infected) == 0:
+            break
+
+        neighbors = _gather_neighbors(indptr, indices, infected)
+        neighbors = neighbors[~ever_infected[neighbors]]
+        new_infected = np.unique(neighbors[rng.random(len(neighbors)) < beta])
+        ever_infected[new_infected] = True
+
+        infected = infected[rng.random(len(infected)) >= gamma]
+        infected = np.union1d(infected, new_infected)
+
+    return ever_infected
+
+
+def _frontier_reach(graph, infected, hops):
+    """
+    Reach function of `split_contacts` over a 2-tuple (indptr, indices).
+    """
+    indptr, indices = graph
+    return frontier_bfs(indptr, indices, np.flatnonzero(infected), hops)
+
+
+def _init_worker(real_graph, noisy_graph):
+    _worker_graph['real'] = real_graph
+    _worker_graph['noisy'] = noisy_graph
+
+
+def _run_trial(trial):
+    """
+    Runs a single trial on the graph of the worker process. Infected
+    nodes are either sampled (`no_infected`) or the result of a SIR
+    epidemic over the real edges started from them. The infected nodes
+    are then traced `hops` away over the real and over the noisy graph.
+    :param trial: 2-tuple (seed_sequence, parameters dictionary)
+    :return: 3-tuple (no_infected, real_quarantines, fake_quarantines)
+    """
+    seed_sequence, parameters = trial
+    rng = np.random.default_rng(seed_sequence)
+    real_indptr, real_indices = _worker_graph['real']
+    no_nodes = len(real_indptr) - 1
+
+    sources = rng.choice(no_nodes, size=parameters['no_infected'], replace=False)
+    if parameters['beta'] is None:
+        infected = np.zeros(no_nodes, dtype=bool)
+        infected[sources] = True
+    else:
+        infected = sir_spread(real_indptr, real_indices, sources, parameters['beta'], parameters['gamma'], rng)
+
+    real_contacts, fake_contacts = split_contacts(_worker_graph['real'], _worker_graph['noisy'], infected,
+                                                  parameters['hops'], reach=_frontier_reach)
+    return int(infected.sum()), int(real_contacts), int(fake_contacts)
+
+
+def quarantine_trials(noisy_graph, no_trials, no_infected, hops=1, beta=None, gamma=1.0, seed=None,
+                      workers=None):
+    """
+    Measures how many quarantines the fake edges of a noisy graph cause.
+    Every trial picks `no_infected` nodes at random; if `beta` is given
+    they seed a SIR epidemic over the real edges. All infected nodes are
+    traced up to `hops` away and the traced nodes are split between the
+    ones reachable through real edges only and the extra ones reached
+    because of fake edges, see `split_contacts`. Trials are independent and run on a pool of
+    `workers` processes; each one has its own seed derived from `seed`
+    so the results do not depend on the number of workers.
+    :param noisy_graph: NoisyGraph
+    :param no_trials: integer
+    :param no_infected: number of initially infected nodes
+    :param hops: maximum tracing distance
+    :param beta: SIR transmission probability or None to skip the epidemic
+    :param gamma: SIR recovery probability
+    :param seed: integer or None
+    :param workers: number of processes, None uses all cores and 1 runs in process
+    :return: dictionary of integer arrays of length `no_trials` with keys
+             'infected', 'real_quarantines' and 'fake_quarantines'
+    """
+    _, real_adjacency, fake_adjacency = adjacency_matrices(noisy_graph)
+    noisy_adjacency = (real_adjacency + fake_adjacency).tocsr()
+    real_graph = (real_adjacency.indptr, real_adjacency.indices)
+    noisy_graph = (noisy_adjacency.indptr, noisy_adjacency.indices)
+    parameters = {'no_infected': no_infected, 'hops': hops, 'beta': beta, 'gamma': gamma}
+    trials = [(seed_sequence, parameters) for seed_sequence in np.random.SeedSequence(seed).spawn(no_trials)]
+
+    if workers == 1:
+        _init_worker(real_graph, noisy_graph)
+        results = [_run_trial(trial) for trial in trials]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(real_graph, noisy_graph)) as executor:
+            results = list(executor.map(_run_trial, trials, chunksize=max(1, no_trials // 64)))
+
+    results = np.array(results, dtype=np.int64).reshape(-1, 3)
+    return {'infected': results[:, 0], 'real_quarantines': results[:, 1], 'fake_quarantines': results[:, 2]}
+
+
+def quarantine_cost_curve(original_graph, ftrps, no_trials, no_infected, hops=(1,), beta=None, gamma=1.0, seed=None,
+                          workers=None):
+    """
+    Builds a noisy graph of `original_graph` for every fake-to-real edge
+    proportion in `ftrps` and measures the quarantines caused by the
+    fake edges with `quarantine_trials`, once per tracing distance in
+    `hops` on the same noisy graph. All noisy graphs use the same trial
+    seeds, so differences between rows come from the fake edges.
+    :param original_graph: networkx graph without isolated nodes
+    :param ftrps: list of fake-to-real edge proportions
+    :param hops: list of maximum tracing distances
+    :param seed: seed of the noisy graphs and of the trials
+    :return: list of dictionaries with keys 'ftrp', 'hops', 'real_mean',
+             'fake_mean', 'fake_std' and 'overhead' (fake over real quarantines)
+    """
+    curve = []
+    for ftrp in ftrps:
+        noisy_graph = NoisyGraph(ftrp=ftrp, seed=seed)
+        noisy_graph.construct_graph(original_graph)
+
+        for hop_count in hops:
+            trials = quarantine_trials(noisy_graph, no_trials, no_infected, hop_count, beta, gamma, seed, workers)
+            real_mean = trials['real_quarantines'].mean()
+            fake_mean = trials['fake_quarantines'].mean()
+            curve.append({
+                'ftrp': ftrp,
+                'hops': hop_count,
+                'real_mean': real_mean,
+                'fake_mean': fake_mean,
+                'fake_std': trials['fake_quarantines'].std(),
+                'overhead': fake_mean / real_mean if real_mean > 0 else float('nan'),
+            })
+
+    return curve
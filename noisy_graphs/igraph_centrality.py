@@ -0,0 +1,123 @@
+import numpy as np
+from scipy import sparse
+from noisy_graphs.csr import noisy_graph_to_csr
+
+try:
+    import igraph
+except ImportError:
+    igraph = None
+
+
+# centrality backends of the NoisyGraph profiles
+CENTRALITY_BACKENDS = ['networkx', 'igraph']
+
+
+class IGraphCentrality:
+    """
+    An igraph copy of a graph, translated once through integer indexes,
+    that computes the centralities of the NoisyGraph profiles with
+    python-igraph and rescales them to the networkx defaults:
+        - degree: degree / (n - 1)
+        - closeness: igraph only counts the reachable nodes, the
+          Wasserman and Faust factor (r / (n - 1)) is applied on top
+        - betweenness: igraph counts every undirected pair once, networkx
+          normalizes by (n - 1)(n - 2) / 2, so it is scaled by 2 / ((n - 1)(n - 2))
+        - eigenvector: igraph scales the maximum to 1, networkx the L2 norm
+    Results are dictionaries keyed by the original node labels. On
+    disconnected graphs the eigenvector centralities are not comparable,
+    networkx's power iteration mixes the components and igraph does not.
+    """
+    def __init__(self, nodes, sources, targets):
+        """
+        Translates a graph given by its edges between node indexes.
+        :param nodes: list of node labels
+        :param sources: integer array, index of the first node of every edge
+        :param targets: integer array, index of the second node of every edge
+        """
+        if igraph is None:
+            raise ImportError("The igraph centrality backend needs python-igraph, install it with pip install igraph")
+
+        self.nodes = list(nodes)
+        self.__sources = np.asarray(sources, dtype=np.int64)
+        self.__targets = np.asarray(targets, dtype=np.int64)
+        self.graph = igraph.Graph(n=len(self.nodes), edges=np.column_stack([self.__sources, self.__targets]).tolist())
+
+    @classmethod
+    def from_networkx(cls, graph):
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = np.array([(index[node1], index[node2]) for node1, node2 in graph.edges], dtype=np.int64).reshape(-1, 2)
+        return cls(nodes, edges[:, 0], edges[:, 1])
+
+    @classmethod
+    def from_noisy_graph(cls, noisy_graph):
+        """
+        Translates the real and fake edges of a noisy graph from its CSR
+        export. Nodes without edges are left out, as in `nx.Graph(edges)`.
+        :param noisy_graph: NoisyGraph
+        :return: IGraphCentrality
+        """
+        nodes, indptr, indices, _ = noisy_graph_to_csr(noisy_graph)
+        degrees = np.diff(indptr)
+        connected = np.flatnonzero(degrees > 0)
+        new_index = np.full(len(nodes), -1, dtype=np.int64)
+        new_index[connected] = np.arange(len(connected))
+
+        rows = np.repeat(np.arange(len(nodes)), degrees)
+        upper = rows < indices
+        return cls([nodes[i] for i in connected], new_index[rows[upper]], new_index[indices[upper]])
+
+    def __as_dict(self, values):
+        return dict(zip(self.nodes, np.asarray(values, dtype=np.float64).tolist()))
+
+    def degree_centrality(self):
+        n = len(self.nodes)
+        if n <= 1:
+            return self.__as_dict(np.ones(n))
+        return self.__as_dict(np.array(self.graph.degree(), dtype=np.float64) / (n - 1))
+
+    def closeness_centrality(self):
+        n = len(self.nodes)
+        closeness = np.nan_to_num(np.array(self.graph.closeness(normalized=True), dtype=np.float64))
+        if n > 1:
+            membership = np.array(self.graph.connected_components().membership)
+            no_reachable = np.bincount(membership)[membership] - 1
+            closeness *= no_reachable / (n - 1)
+        return self.__as_dict(closeness)
+
+    def betweenness_centrality(self):
+        n = len(self.nodes)
+        betweenness = np.array(self.graph.betweenness(directed=False), dtype=np.float64)
+        if n > 2:
+            betweenness *= 2 / ((n - 1) * (n - 2))
+        return self.__as_dict(betweenness)
+
+    def eigenvector_centrality(self):
+        """
+        :return: 2-tuple (dictionary of node to centrality, dictionary with
+                 the 'residual' ||Ax - lambda x|| of the result; ARPACK does
+                 not report its 'iterations', they are nan)
+        """
+        n = len(self.nodes)
+        x = np.abs(np.array(self.graph.eigenvector_centrality(), dtype=np.float64))
+        x /= np.linalg.norm(x) or 1
+
+        adjacency = sparse.csr_array((np.ones(2 * len(self.__sources)),
+                                      (np.concatenate([self.__sources, self.__targets]),
+                                       np.concatenate([self.__targets, self.__sources]))), shape=(n, n))
+        eigenvalue = x @ (adjacency @ x)
+        residual = np.linalg.norm(adjacency @ x - eigenvalue * x)
+        return self.__as_dict(x), {'iterations': float('nan'), 'residual': float(residual)}
+
+    def centrality_metrics(self, centrality_algorithm):
+        """
+        Calculates the igraph counterpart of a networkx centrality function.
+        :param centrality_algorithm: networkx centrality function
+        :return: dictionary of node to metric value
+        """
+        name = centrality_algorithm.__name__
+        if name == 'eigenvector_centrality':
+            return self.eigenvector_centrality()[0]
+        if name not in ('degree_centrality', 'closeness_centrality', 'betweenness_centrality'):
+            raise ValueError(f"The igraph backend does not implement {name}")
+        return getattr(self, name)()
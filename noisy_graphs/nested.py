@@ -0,0 +1,316 @@
+import numpy as np
+from scipy.stats import binom
+from noisy_graphs.counter_rng import node_uniforms, rng_key
+from noisy_graphs.noisy_graph import NoisyGraph, SigmaIndex
+from noisy_graphs.streaming import StreamSummary
+
+
+class NoisyGraphFamily:
+    """
+    Noisy graphs of the same original graph for several fake-to-real edge
+    proportions, built in a single construction and nested: the fake
+    edges of a smaller ftrp are a subset of the ones of a larger ftrp.
+    Every fake edge is stored once with its level, the index of the
+    smallest ftrp whose member contains it, and members are read-only
+    views over the shared storage, see `member`.
+
+    Construction builds the members one after the other, from the
+    smallest ftrp up:
+        - a node draws one uniform number and its budget at every level is
+          the Binomial(d, ftrp) quantile of it, so budgets grow with ftrp
+        - the smallest member is built as `NoisyGraph.construct_graph`
+          does, so it is the noisy graph `NoisyGraph(ftrp, seed)` builds
+        - every larger member starts from the previous one and goes again
+          through the nodes, which add fake edges as in
+          `NoisyGraph.add_node_with_neighbors`, with its sigma and the
+          remaining budget of the level, what is left after the fake
+          edges the node added in the smaller members
+    While a level is built the larger members have the same edges and a
+    larger ftrp, so a fake edge is only added if both endpoints have
+    sigma below 1 in every member it enters, and no node goes over its
+    budget in any member. Larger members are not the ones an independent
+    construction builds, their ranking starts from the fake edges of the
+    smaller members and the whole original graph, but they have the same
+    number of fake edges within a few percent. Candidates come from a
+    sigma index of the level, see `SigmaIndex`, and every fake edge is
+    added once, so the family costs a fraction of the independent
+    constructions.
+    """
+    def __init__(self, ftrps, seed=None):
+        """
+        Initializes an empty family.
+        :param ftrps: list of fake-to-real edge proportions
+        :param seed: seed of the counter-based budgets, see `NoisyGraph`;
+                     without it uniform numbers come from numpy.random
+        """
+        self.ftrps = sorted(set(ftrps))
+        self.__real_edges = {}
+        self.__fake_edges = {}
+        self.__fake_counts = {}
+        self.__no_real_edges = 0
+        self.__no_fake_edges = [0] * len(self.ftrps)
+        self.__sigma_index = None
+        self.__level = None
+        self.__rng_key = None if seed is None else rng_key(seed)
+
+    # MARK: Shared storage
+    def nodes(self):
+        return list(self.__real_edges)
+
+    def has_node(self, node):
+        return node in self.__real_edges
+
+    def real_neighbors(self, node):
+        return self.__real_edges[node]
+
+    def fake_neighbors(self, node, level):
+        """
+        Returns the fake neighbors of a node in the member of `level`.
+        :param node: hashable
+        :param level: index of the ftrp in `ftrps`
+        :return: set of nodes
+        """
+        return {neighbor for neighbor, edge_level in self.__fake_edges[node].items() if edge_level <= level}
+
+    def iter_fake_edges(self, level):
+        for node1, neighbors in self.__fake_edges.items():
+            for node2, edge_level in neighbors.items():
+                if node1 <= node2 and edge_level <= level:
+                    yield node1, node2
+
+    def number_of_edges(self, level):
+        """
+        :return: 3-tuple (no_real_edges, no_fake_edges, total_edges) of the member of `level`
+        """
+        return self.__no_real_edges, self.__no_fake_edges[level], self.__no_real_edges + self.__no_fake_edges[level]
+
+    def node_sigma(self, node, level):
+        return self.__fake_counts[node][level] / len(self.__real_edges[node]) / self.ftrps[level]
+
+    def is_saturated(self, node, level):
+        """
+        Checks whether a node has sigma 1 or more in the member of `level`.
+        :param node: hashable
+        :param level: index of the ftrp in `ftrps`
+        :return: boolean
+        """
+        return self.node_sigma(node, level) >= 1.0
+
+    def __add_node(self, node):
+        if node not in self.__real_edges:
+            self.__real_edges[node] = set()
+            self.__fake_edges[node] = {}
+            self.__fake_counts[node] = [0] * len(self.ftrps)
+
+    def __update_fake_counts(self, node1, node2, start, end, change):
+        for i in range(start, end):
+            self.__fake_counts[node1][i] += change
+            self.__fake_counts[node2][i] += change
+            self.__no_fake_edges[i] += change
+
+    def __push_sigma(self, node):
+        # only the level under construction is indexed
+        if self.__sigma_index is not None:
+            self.__sigma_index.push(node, self.node_sigma(node, self.__level))
+
+    def add_real_edges(self, node, neighbors):
+        """
+        Adds real edges from a node, replacing fake ones if they exist.
+        """
+        self.__add_node(node)
+        touched_nodes = {node}
+        for neighbor in neighbors:
+            self.__add_node(neighbor)
+            if neighbor in self.__real_edges[node]:
+                continue
+
+            level = self.__fake_edges[node].pop(neighbor, None)
+            if level is not None:
+                del self.__fake_edges[neighbor][node]
+                self.__update_fake_counts(node, neighbor, level, len(self.ftrps), -1)
+
+            self.__real_edges[node].add(neighbor)
+            self.__real_edges[neighbor].add(node)
+            self.__no_real_edges += 1
+            touched_nodes.add(neighbor)
+
+        for node2 in touched_nodes:
+            self.__push_sigma(node2)
+
+    def add_fake_edge(self, node1, node2, level):
+        """
+        Adds a fake edge to the members of `level` and above, or moves an
+        existing one down to `level`.
+        :return: index of the first level that did not have the edge before
+        """
+        previous_level = self.__fake_edges[node1].get(node2, len(self.ftrps))
+        self.__fake_edges[node1][node2] = level
+        self.__fake_edges[node2][node1] = level
+        self.__update_fake_counts(node1, node2, level, previous_level, 1)
+        self.__push_sigma(node1)
+        self.__push_sigma(node2)
+        return previous_level
+
+    # MARK: Construction
+    def fake_edge_budgets(self, nodes, degrees):
+        """
+        Draws the budgets of every node at every level.
+        :param nodes: list of hashable
+        :param degrees: list of integers, the real degree of every node
+        :return: integer array of shape (len(nodes), len(ftrps)), non
+                 decreasing along the levels
+        """
+        if self.__rng_key is not None:
+            uniforms = node_uniforms(self.__rng_key, nodes)
+        else:
+            uniforms = np.random.random(len(nodes))
+
+        probabilities = np.minimum(np.array(self.ftrps), 1.0)
+        budgets = binom.ppf(uniforms[:, np.newaxis], np.asarray(degrees, dtype=np.int64)[:, np.newaxis],
+                            probabilities[np.newaxis, :])
+        return budgets.astype(np.int64).reshape(len(nodes), len(self.ftrps))
+
+    def missing_neighbors_for_node(self, node, level, limit=None):
+        """
+        Returns the nodes the given node is not connected to in the
+        member of `level`, with their sigma in it, in increasing order.
+        With a `limit` only the first `limit` nodes with sigma below 1
+        are returned, read from the sigma index of the level, which only
+        exists while the level is built.
+        :param node: hashable
+        :param level: index of the ftrp in `ftrps`
+        :param limit: integer or None
+        :return: list of 2-tuples
+        """
+        existing_neighbors = self.__real_edges[node] | self.fake_neighbors(node, level)
+        if limit is not None:
+            if level != self.__level:
+                raise ValueError(f"Level {level} is not under construction")
+            return self.__sigma_index.lowest(node, existing_neighbors, limit)
+
+        missing_neighbors = [(self.node_sigma(node2, level), node2) for node2 in self.__real_edges
+                             if node2 != node and node2 not in existing_neighbors]
+        missing_neighbors.sort()
+        return missing_neighbors
+
+    def __add_fake_edges(self, node, level, no_fake_edges):
+        """
+        Adds fake edges from a node to the member of `level` as
+        `NoisyGraph.add_node_with_neighbors` does.
+        :return: number of fake edges added
+        """
+        added_edges = 0
+        if no_fake_edges <= 0 or self.is_saturated(node, level):
+            return added_edges
+
+        for _, missing_neighbor in self.missing_neighbors_for_node(node, level, limit=no_fake_edges):
+            if added_edges >= no_fake_edges or self.is_saturated(node, level):
+                break
+
+            self.add_fake_edge(node, missing_neighbor, level)
+            added_edges += 1
+
+        return added_edges
+
+    def construct_graph(self, nx_graph):
+        # we do not want to deal with the case where
+        # a node is not connected in the graph
+        nx_graph.remove_nodes_from([node for node in nx_graph.nodes if nx_graph.degree(node) == 0])
+
+        nodes = list(nx_graph.nodes)
+        budgets = self.fake_edge_budgets(nodes, [nx_graph.degree(node) for node in nodes]).tolist()
+
+        # number of fake edges every node added itself in the smaller members
+        added_edges = [0] * len(nodes)
+        try:
+            for level in range(len(self.ftrps)):
+                self.__level = level
+                self.__sigma_index = SigmaIndex(lambda node, level=level: self.node_sigma(node, level))
+                for node in self.__real_edges:
+                    self.__push_sigma(node)
+
+                for i, node in enumerate(nodes):
+                    # real edges are added with the smallest member, node by node
+                    if level == 0:
+                        self.add_real_edges(node, list(nx_graph.neighbors(node)))
+                    added_edges[i] += self.__add_fake_edges(node, level, budgets[i][level] - added_edges[i])
+        finally:
+            self.__sigma_index = None
+            self.__level = None
+
+    # MARK: Members
+    def member(self, ftrp):
+        """
+        Returns the noisy graph of one of the ftrps of the family.
+        :param ftrp: one of `ftrps`
+        :return: NoisyGraphView
+        """
+        return NoisyGraphView(self, self.ftrps.index(ftrp))
+
+    def members(self):
+        return [NoisyGraphView(self, level) for level in range(len(self.ftrps))]
+
+
+class NoisyGraphView(NoisyGraph):
+    """
+    A read-only NoisyGraph over the shared storage of a NoisyGraphFamily,
+    with the real edges and the fake edges of one level and below.
+    """
+    def __init__(self, family, level):
+        super().__init__(ftrp=family.ftrps[level])
+        self.__family = family
+        self.__level = level
+
+    def nodes(self):
+        return self.__family.nodes()
+
+    def number_of_nodes(self):
+        return len(self.__family.nodes())
+
+    def has_node(self, node):
+        return self.__family.has_node(node)
+
+    def iter_edges_if(self, real):
+        if real:
+            for node1, neighbors in ((node, self.__family.real_neighbors(node)) for node in self.__family.nodes()):
+                for node2 in neighbors:
+                    if node1 <= node2:
+                        yield node1, node2
+        else:
+            yield from self.__family.iter_fake_edges(self.__level)
+
+    def node_neighbors_if(self, node, real):
+        if real:
+            return self.__family.real_neighbors(node)
+        return self.__family.fake_neighbors(node, self.__level)
+
+    def number_of_edges(self):
+        return self.__family.number_of_edges(self.__level)
+
+    def get_node_sigma(self, node):
+        return self.__family.node_sigma(node, self.__level)
+
+    def get_graph_sigmas(self):
+        return [self.__family.node_sigma(node, self.__level) for node in self.__family.nodes()]
+
+    def sigma_summary(self):
+        summary = StreamSummary()
+        for sigma in self.get_graph_sigmas():
+            summary.add(sigma)
+        return summary
+
+    def uncertainty_summary(self):
+        summary = StreamSummary()
+        for node_uncertainty in self.node_uncertainties():
+            summary.add(node_uncertainty)
+        return summary
+
+    def __read_only(self, *args, **kwargs):
+        raise TypeError("NoisyGraphView is read-only, construct the graph through its NoisyGraphFamily")
+
+    add_node = __read_only
+    add_edge = __read_only
+    add_edges_from = __read_only
+    set_node_sigma = __read_only
+    add_node_with_neighbors = __read_only
+    construct_graph = __read_only
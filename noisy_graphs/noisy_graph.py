@@ -1,25 +1,168 @@
+import heapq
 import networkx as nx
 import numpy as np
 import statistics
-from math import log
+from math import lgamma, log
 from networkx.algorithms import centrality
+from scipy import sparse
+from scipy.sparse.linalg import eigsh
 from scipy.special import comb
 from scipy.stats import wasserstein_distance
+from noisy_graphs.counter_rng import fake_edge_budgets, rng_key
+from noisy_graphs.igraph_centrality import CENTRALITY_BACKENDS, IGraphCentrality
+from noisy_graphs.streaming import StreamSummary
 
 
-class NoisyGraph:
+# quantiles reported by the sigma and uncertainty summaries
+SUMMARY_QUANTILES = [0.01, 0.05, 0.5]
+
+
+class SigmaIndex:
+    """
+    The nodes of a graph under construction ranked by sigma, so the
+    fake-edge candidates of a node are read from the top of a heap
+    instead of sorting all the nodes. An entry is pushed whenever the
+    sigma of a node changes and outdated entries are dropped when they
+    reach the top, so a lookup costs a heap operation per candidate,
+    skipped neighbor or outdated entry.
+    """
+    def __init__(self, get_sigma):
+        """
+        :param get_sigma: function returning the current sigma of a node
+        """
+        self.__get_sigma = get_sigma
+        self.__heap = []
+        self.__compacted_size = 0
+
+    def push(self, node, sigma):
+        """
+        Records the new sigma of a node.
+        :param node: hashable
+        :param sigma: float
+        """
+        heapq.heappush(self.__heap, (sigma, node))
+        if len(self.__heap) > 2 * self.__compacted_size + 1024:
+            self.__heap = [entry for entry in set(self.__heap) if self.__get_sigma(entry[1]) == entry[0]]
+            heapq.heapify(self.__heap)
+            self.__compacted_size = len(self.__heap)
+
+    def lowest(self, node, excluded, limit):
+        """
+        Returns the first `limit` nodes with sigma below 1 other than
+        `node` and the `excluded` ones, with their sigma, in the order of
+        `NoisyGraph.missing_neighbors_for_node`.
+        :param node: hashable
+        :param excluded: set of nodes
+        :param limit: integer
+        :return: list of 2-tuples
+        """
+        candidates = []
+        popped = []
+        seen = set()
+        while self.__heap and len(candidates) < limit:
+            sigma, node2 = self.__heap[0]
+            if sigma >= 1.0:
+                break
+
+            heapq.heappop(self.__heap)
+            # outdated or duplicated entries are dropped
+            if node2 in seen or self.__get_sigma(node2) != sigma:
+                continue
+
+            seen.add(node2)
+            popped.append((sigma, node2))
+            if node2 != node and node2 not in excluded:
+                candidates.append((sigma, node2))
+
+        for entry in popped:
+            heapq.heappush(self.__heap, entry)
+        return candidates
+
+
+class SequentialConstruction:
+    """
+    The node by node construction of `NoisyGraph`, shared with the graphs
+    that store their edges elsewhere, e.g. `DiskNoisyGraph`. Subclasses
+    provide `get_ftrp`, `is_seeded`, `fake_edge_budgets`, `add_edges_from`,
+    `add_edge`, `get_node_sigma` and `missing_neighbors_for_node`, which
+    with a `limit` only returns the first `limit` nodes with sigma below 1.
+    """
+    def number_of_fake_edges_to_add(self, no_real_edges, node=None):
+        if self.is_seeded() and node is not None:
+            return int(self.fake_edge_budgets([node], [no_real_edges])[0])
+
+        sample = np.random.random(no_real_edges)
+        result = np.where(sample <= self.get_ftrp())
+        return len(result[0])
+
+    def fake_edge_candidates(self, node, no_fake_edges):
+        """
+        Returns the missing neighbors `add_node_with_neighbors` goes
+        through, see `missing_neighbors_for_node`. The construction stops
+        at the first neighbor with sigma 1 or after `no_fake_edges`
+        neighbors, so only those are looked up.
+        :param node: hashable
+        :param no_fake_edges: number of fake edges to add to the node
+        :return: list of 2-tuples (sigma, node) in increasing order
+        """
+        return self.missing_neighbors_for_node(node, limit=no_fake_edges)
+
+    def add_node_with_neighbors(self, node, neighbors, no_fake_edges=None):
+        self.add_edges_from(((node, neighbor) for neighbor in neighbors), real=True)
+
+        node_sigma = self.get_node_sigma(node)
+        if node_sigma < 1.0:
+            if no_fake_edges is None:
+                no_fake_edges = self.number_of_fake_edges_to_add(len(neighbors), node)
+            missing_neighbors = self.fake_edge_candidates(node, no_fake_edges)
+
+            added_edges = 0
+            for neighbor_sigma, missing_neighbor in missing_neighbors:
+                # checks if missing edges have been added or if remaining
+                # neighbors or node already have a sigma greater or equal to 1.0
+                if added_edges >= no_fake_edges or neighbor_sigma >= 1.0 or node_sigma >= 1.0:
+                    return
+
+                self.add_edge(node1=node, node2=missing_neighbor, real=False)
+                node_sigma = self.get_node_sigma(node)
+                added_edges += 1
+
+
+class NoisyGraph(SequentialConstruction):
     """
     An undirected graph where some of the edges
     contained are fake.
     """
-    def __init__(self, ftrp):
+    def __init__(self, ftrp, seed=None):
         """
-        Initializes a noisy graph object.
+        Initializes a noisy graph object. Without a `seed` fake edge
+        budgets are drawn from the global numpy.random state, as they
+        always were. With a `seed` every node's budget is a function of
+        the seed and the node alone, see `fake_edge_budgets`, so it is the
+        same whatever the order or process the node is added in.
+        :param ftrp: fake-to-real edge proportion
+        :param seed: None, integer, numpy.random.SeedSequence or numpy.random.Generator
         """
         self.__real_edges = {}
         self.__fake_edges = {}
         self.__sigmas = {}
+        self.__sigma_index = SigmaIndex(self.__sigmas.get)
         self.__ftrp = ftrp
+        self.__no_real_edges = 0
+        self.__no_fake_edges = 0
+        self.__rng_key = None if seed is None else rng_key(seed)
+        self.__eigenvector_telemetry = None
+        self.__igraph_centrality = None
+        self.__igraph_key = None
+        self.__sigma_summary = StreamSummary()
+        self.__uncertainty_summary = StreamSummary()
+
+    def get_ftrp(self):
+        """
+        Returns the fake-to-real edge proportion the graph is built with.
+        :return: float
+        """
+        return self.__ftrp
 
     # MARK: Node methods
     def nodes(self):
@@ -34,7 +177,15 @@ class NoisyGraph:
         Returns the number of nodes in the graph
         :return: integer
         """
-        return len(self.nodes())
+        return len(self.__real_edges)
+
+    def has_node(self, node):
+        """
+        Checks whether a node is in the graph
+        :param node: hashable
+        :return: boolean
+        """
+        return node in self.__real_edges
 
     def add_node(self, node):
         """
@@ -42,9 +193,10 @@ class NoisyGraph:
         If the node already exists, nothing is performed.
         :param node: hashable
         """
-        if node not in self.nodes():
+        if node not in self.__real_edges:
             self.__real_edges[node] = set()
             self.__fake_edges[node] = set()
+            self.__uncertainty_summary.add(NoisyGraph.__summary_uncertainty(0, 0))
 
     # MARK: Edges methods
     @staticmethod
@@ -57,22 +209,35 @@ class NoisyGraph:
         """
         return (node1, node2) if node1 < node2 else (node2, node1)
 
-    def edges_if(self, real):
+    def iter_edges_if(self, real):
         """
-        Returns a set of all edges that satisfy the `real`
-        condition.
+        Yields every edge that satisfies the `real` condition once,
+        with its elements in increasing order, without building a set.
         :param real: boolean
-        :return: a set of two-tuples
+        :return: generator of two-tuples
         """
         graph_dictionary = self.__real_edges if real else self.__fake_edges
-        edge_set = set()
-
         for node1, nodes in graph_dictionary.items():
             for node2 in nodes:
-                edge = NoisyGraph.__get_edge(node1, node2)
-                edge_set.add(edge)
+                if node1 <= node2:
+                    yield node1, node2
 
-        return edge_set
+    def iter_edges(self):
+        """
+        Yields every edge in the graph once, real edges first.
+        :return: generator of two-tuples
+        """
+        yield from self.iter_edges_if(real=True)
+        yield from self.iter_edges_if(real=False)
+
+    def edges_if(self, real):
+        """
+        Returns a set of all edges that satisfy the `real`
+        condition.
+        :param real: boolean
+        :return: a set of two-tuples
+        """
+        return set(self.iter_edges_if(real))
 
     def edges(self):
         """
@@ -83,6 +248,37 @@ class NoisyGraph:
         fake_edges = self.edges_if(real=False)
         return real_edges.union(fake_edges)
 
+    def __count_edge(self, node1, node2, real):
+        """
+        Updates the edge counters before `(node1, node2)` is stored as
+        real or fake, taking into account whether it already exists as
+        either of them.
+        :param node1: hashable
+        :param node2: hashable
+        :param real: boolean
+        """
+        if node2 in self.__real_edges[node1]:
+            if real:
+                return
+            real_change, fake_change = -1, 1
+        elif node2 in self.__fake_edges[node1]:
+            if not real:
+                return
+            real_change, fake_change = 1, -1
+        elif real:
+            real_change, fake_change = 1, 0
+        else:
+            real_change, fake_change = 0, 1
+
+        self.__no_real_edges += real_change
+        self.__no_fake_edges += fake_change
+        for node in {node1, node2}:
+            no_real_edges = len(self.__real_edges[node])
+            no_fake_edges = len(self.__fake_edges[node])
+            self.__uncertainty_summary.remove(NoisyGraph.__summary_uncertainty(no_real_edges, no_fake_edges))
+            self.__uncertainty_summary.add(NoisyGraph.__summary_uncertainty(no_real_edges + real_change,
+                                                                            no_fake_edges + fake_change))
+
     def add_edge(self, node1, node2, real):
         """
         Adds a single edge to the graph. If the nodes in the edge
@@ -93,11 +289,12 @@ class NoisyGraph:
         :param node2: hashable object
         :param real: boolean
         """
-        if node1 not in self.nodes():
+        if node1 not in self.__real_edges:
             self.add_node(node1)
-        if node2 not in self.nodes():
+        if node2 not in self.__real_edges:
             self.add_node(node2)
 
+        self.__count_edge(node1, node2, real)
         if real:
             self.__real_edges[node1].add(node2)
             self.__fake_edges[node1].discard(node2)
@@ -112,6 +309,40 @@ class NoisyGraph:
         self.set_node_sigma(node1)
         self.set_node_sigma(node2)
 
+    def add_edges_from(self, edges, real):
+        """
+        Adds multiple edges to the graph. If the nodes in the edges
+        do not exist, they are added first to the graph. The `real`
+        parameter indicates whether the edges are real or fake. If an
+        edge already exists as the opposite (real or fake) it is updated.
+        The sigma of every touched node is recomputed once at the end.
+        :param edges: iterable of two-tuples or numpy array of shape (m, 2)
+        :param real: boolean
+        """
+        if isinstance(edges, np.ndarray):
+            edges = edges.tolist()
+
+        added_dictionary = self.__real_edges if real else self.__fake_edges
+        removed_dictionary = self.__fake_edges if real else self.__real_edges
+
+        touched_nodes = set()
+        for node1, node2 in edges:
+            if node1 not in self.__real_edges:
+                self.add_node(node1)
+            if node2 not in self.__real_edges:
+                self.add_node(node2)
+
+            self.__count_edge(node1, node2, real)
+            added_dictionary[node1].add(node2)
+            removed_dictionary[node1].discard(node2)
+            added_dictionary[node2].add(node1)
+            removed_dictionary[node2].discard(node1)
+            touched_nodes.add(node1)
+            touched_nodes.add(node2)
+
+        for node in touched_nodes:
+            self.set_node_sigma(node)
+
     def node_neighbors_if(self, node, real):
         """
         Returns a set of all nodes that are neighbors of the passed one.
@@ -143,9 +374,8 @@ class NoisyGraph:
         :return: a set of tuples
         """
         adjacency_set = set()
-        if node in self.nodes():
-            graph_dictionary = self.__real_edges if real else self.__fake_edges
-            neighbors = graph_dictionary[node]
+        if self.has_node(node):
+            neighbors = self.node_neighbors_if(node, real)
             for neighbor in neighbors:
                 edge = NoisyGraph.__get_edge(node, neighbor)
                 adjacency_set.add(edge)
@@ -165,14 +395,10 @@ class NoisyGraph:
     def number_of_edges(self):
         """
         Obtain the number of real, fake and total edges in the graph.
+        The counts are kept up to date by the edge addition methods.
         :return: 3-tuple (no_real_edges, no_fake_edges, total_edges)
         """
-
-        # TODO: Can be improved by using node neighbors instead
-        total = len(self.edges())
-        no_real_edges = len(self.edges_if(True))
-        no_fake_edges = total - no_real_edges
-        return no_real_edges, no_fake_edges, total
+        return self.__no_real_edges, self.__no_fake_edges, self.__no_real_edges + self.__no_fake_edges
 
     def number_of_edges_for_node(self, node):
         """
@@ -181,7 +407,7 @@ class NoisyGraph:
         :param node: hashable
         :return: 3-tuple (no_real_edges, no_fake_edges, total_edges)
         """
-        if node not in self.nodes():
+        if not self.has_node(node):
             return None
 
         total = len(self.node_neighbors(node))
@@ -212,6 +438,22 @@ class NoisyGraph:
 
         return no_hypotheses
 
+    @staticmethod
+    def __log_comb(n, k):
+        """
+        Natural logarithm of the binomial coefficient C(n, k), through
+        lgamma so it takes constant time whatever the size of C(n, k).
+        """
+        return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+    @staticmethod
+    def __summary_uncertainty(no_real_edges, no_fake_edges):
+        """
+        Uncertainty of a node in the uncertainty summary: in bits and for
+        an attacker knowing the exact number of fake edges.
+        """
+        return NoisyGraph.__log_comb(no_real_edges + no_fake_edges, no_fake_edges) / log(2)
+
     def uncertainty(self, base=2, exact=True):
         """
         Calculates the graph uncertainty. The parameter `base` is used
@@ -238,7 +480,7 @@ class NoisyGraph:
         :param exact: boolean
         :return: integer or None if node does not exist in graph
         """
-        if node not in self.nodes():
+        if not self.has_node(node):
             return None
 
         _, no_fake_edges, total_edges = self.number_of_edges_for_node(node)
@@ -284,7 +526,13 @@ class NoisyGraph:
         no_real_edges, no_fake_edges, _ = self.number_of_edges_for_node(node)
         node_ftrp = no_fake_edges / no_real_edges
         node_sigma = node_ftrp / self.__ftrp
+        if node in self.__sigmas:
+            if self.__sigmas[node] == node_sigma:
+                return
+            self.__sigma_summary.remove(self.__sigmas[node])
+        self.__sigma_summary.add(node_sigma)
         self.__sigmas[node] = node_sigma
+        self.__sigma_index.push(node, node_sigma)
 
     def get_node_sigma(self, node):
         return self.__sigmas[node]
@@ -292,21 +540,41 @@ class NoisyGraph:
     def get_graph_sigmas(self):
         return list(self.__sigmas.values())
 
-    def number_of_fake_edges_to_add(self, no_real_edges):
-        sample = np.random.random(no_real_edges)
-        result = np.where(sample <= self.__ftrp)
-        return len(result[0])
+    def is_seeded(self):
+        """
+        Checks whether fake edge budgets come from a seed, see `__init__`.
+        :return: boolean
+        """
+        return self.__rng_key is not None
+
+    def fake_edge_budgets(self, nodes, degrees):
+        """
+        Draws the number of fake edges of many nodes in one vectorized
+        call. Only available for graphs initialized with a seed.
+        :param nodes: list of hashable
+        :param degrees: list of integers, the real degree of every node
+        :return: integer array
+        """
+        if self.__rng_key is None:
+            raise ValueError("Fake edge budgets can only be drawn at once for graphs initialized with a seed")
+
+        return fake_edge_budgets(self.__rng_key, nodes, degrees, self.__ftrp)
 
-    def missing_neighbors_for_node(self, node):
+    def missing_neighbors_for_node(self, node, limit=None):
         """
         Returns the nodes the given node is missing to be
         connected to all other ones along with their respective
-        sigma
+        sigma. With a `limit` only the first `limit` nodes with
+        sigma below 1 are returned, read from the sigma index.
         :param node: hashable
+        :param limit: integer or None
         :return: list of 2-tuples
         """
-        missing_neighbors = []
         existing_neighbors = self.node_neighbors(node)
+        if limit is not None:
+            return self.__sigma_index.lowest(node, existing_neighbors, limit)
+
+        missing_neighbors = []
         for node2 in self.nodes():
             if node != node2 and node2 not in existing_neighbors:
                 sigma2 = self.get_node_sigma(node2)
@@ -315,28 +583,13 @@ class NoisyGraph:
         missing_neighbors.sort()
         return missing_neighbors
 
-    def add_node_with_neighbors(self, node, neighbors):
-        for neighbor in neighbors:
-            self.add_edge(node1=node, node2=neighbor, real=True)
-
-        node_sigma = self.get_node_sigma(node)
-        if node_sigma < 1.0:
-            no_real_edges = len(neighbors)
-            no_fake_edges = self.number_of_fake_edges_to_add(no_real_edges)
-            missing_neighbors = self.missing_neighbors_for_node(node)
-
-            added_edges = 0
-            for neighbor_sigma, missing_neighbor in missing_neighbors:
-                # checks if missing edges have been added or if remaining
-                # neighbors or node already have a sigma greater or equal to 1.0
-                if added_edges >= no_fake_edges or neighbor_sigma >= 1.0 or node_sigma >= 1.0:
-                    return
-
-                self.add_edge(node1=node, node2=missing_neighbor, real=False)
-                node_sigma = self.get_node_sigma(node)
-                added_edges += 1
-
     def construct_graph(self, nx_graph):
+        # budgets of seeded graphs are drawn for all nodes at once
+        budgets = {}
+        if self.__rng_key is not None:
+            nodes = list(nx_graph.nodes)
+            budgets = dict(zip(nodes, self.fake_edge_budgets(nodes, [nx_graph.degree(node) for node in nodes])))
+
         for node in nx_graph.nodes:
             neighbors = list(nx_graph.neighbors(node))
 
@@ -346,7 +599,7 @@ class NoisyGraph:
                 nx_graph.remove_node(node)
                 continue
 
-            self.add_node_with_neighbors(node, neighbors)
+            self.add_node_with_neighbors(node, neighbors, budgets.get(node))
 
     # MARK: metrics
     def get_sigmas_profile(self):
@@ -363,14 +616,138 @@ class NoisyGraph:
 
         return mean, variance
 
-    def __get_centrality_metrics(self, centrality_algorithm):
-        n_graph = nx.Graph(self.edges())
+    def sigma_summary(self):
+        """
+        Returns the online summary of the node sigmas, which follows the
+        edges added to the graph. Summaries of several noisy graphs can be
+        merged, see `StreamSummary.merge`.
+        :return: StreamSummary
+        """
+        return self.__sigma_summary
+
+    def uncertainty_summary(self):
+        """
+        Returns the online summary of the node uncertainties, in bits and
+        for an attacker knowing the exact number of fake edges, which
+        follows the edges added to the graph.
+        :return: StreamSummary
+        """
+        return self.__uncertainty_summary
+
+    def get_sigmas_distribution(self, quantiles=None):
+        """
+        Reports the distribution of the node sigmas from its summary,
+        without visiting the nodes.
+        :param quantiles: list of floats in [0, 1], SUMMARY_QUANTILES by default
+        :return: dictionary, see `StreamSummary.report`
+        """
+        return self.sigma_summary().report(SUMMARY_QUANTILES if quantiles is None else quantiles)
+
+    def get_uncertainty_distribution(self, quantiles=None):
+        """
+        Reports the distribution of the node uncertainties from its
+        summary, without visiting the nodes.
+        :param quantiles: list of floats in [0, 1], SUMMARY_QUANTILES by default
+        :return: dictionary, see `StreamSummary.report`
+        """
+        return self.uncertainty_summary().report(SUMMARY_QUANTILES if quantiles is None else quantiles)
+
+    @staticmethod
+    def __check_backend(backend):
+        if backend not in CENTRALITY_BACKENDS:
+            raise ValueError(f"Unknown centrality backend {backend}, expected one of {CENTRALITY_BACKENDS}")
+
+    @staticmethod
+    def centrality_metrics(graph, centrality_algorithm, backend='networkx'):
+        """
+        Calculates a centrality metric of every node in a networkx graph.
+        :param graph: networkx graph or, with the igraph backend, an
+                      already translated IGraphCentrality
+        :param centrality_algorithm: networkx centrality function
+        :param backend: 'networkx' or 'igraph', see IGraphCentrality
+        :return: dictionary of node to metric value
+        """
+        NoisyGraph.__check_backend(backend)
+        if backend == 'igraph':
+            if not isinstance(graph, IGraphCentrality):
+                graph = IGraphCentrality.from_networkx(graph)
+            return graph.centrality_metrics(centrality_algorithm)
+
         if centrality_algorithm.__name__ == 'eigenvector_centrality':
-            centrality_metric = centrality_algorithm(n_graph, max_iter=10000)
-        else:
-            centrality_metric = centrality_algorithm(n_graph)
+            return NoisyGraph.eigenvector_centrality(graph)[0]
 
-        return centrality_metric
+        return centrality_algorithm(graph)
+
+    @staticmethod
+    def eigenvector_centrality(graph, nstart=None, max_iter=1000, tol=1.0e-6):
+        """
+        Calculates the eigenvector centrality of a networkx graph as
+        networkx does: power iteration on A + I, normalized by the L2 norm,
+        until the L1 change is below n * tol. The iteration starts from
+        `nstart`, e.g. the centralities of a similar graph, and falls back
+        to ARPACK (scipy.sparse.linalg.eigsh) if it does not converge in
+        `max_iter` iterations.
+        :param graph: networkx graph
+        :param nstart: dictionary of node to starting value, uniform by default
+        :param max_iter: maximum number of power iterations
+        :param tol: tolerance
+        :return: 2-tuple (dictionary of node to centrality, dictionary with the
+                 number of power 'iterations', `max_iter` if it fell back, and
+                 the 'residual' ||Ax - lambda x|| of the result)
+        """
+        nodes = list(graph)
+        n = len(nodes)
+        adjacency = sparse.csr_array(nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=None, dtype=np.float64))
+
+        x = np.array([nstart.get(node, 1.0) for node in nodes]) if nstart else np.ones(n)
+        x = x / x.sum() if x.sum() > 0 else np.full(n, 1.0 / n)
+        converged = False
+        iterations = 0
+        while iterations < max_iter and not converged:
+            x_last = x
+            x = x_last + adjacency @ x_last
+            x /= np.linalg.norm(x) or 1
+            iterations += 1
+            converged = np.abs(x - x_last).sum() < n * tol
+
+        if not converged:
+            if n > 2:
+                _, vectors = eigsh(adjacency, k=1, which='LA')
+            else:
+                _, vectors = np.linalg.eigh(adjacency.toarray())
+                vectors = vectors[:, -1:]
+            x = np.abs(vectors[:, 0])
+            x /= np.linalg.norm(x) or 1
+
+        eigenvalue = x @ (adjacency @ x)
+        residual = np.linalg.norm(adjacency @ x - eigenvalue * x)
+        return dict(zip(nodes, x.tolist())), {'iterations': iterations, 'residual': float(residual)}
+
+    def get_eigenvector_telemetry(self):
+        """
+        Returns the telemetry of the last eigenvector centrality profile of
+        the noisy graph, see `eigenvector_centrality`.
+        :return: dictionary with 'iterations' and 'residual', None before any profile
+        """
+        return self.__eigenvector_telemetry
+
+    def __get_igraph_centrality(self):
+        """
+        Returns the igraph translation of the noisy graph, translated again
+        only if nodes or edges were added since the last one.
+        """
+        key = (self.number_of_nodes(), self.number_of_edges()[2])
+        if self.__igraph_key != key:
+            self.__igraph_centrality = IGraphCentrality.from_noisy_graph(self)
+            self.__igraph_key = key
+        return self.__igraph_centrality
+
+    def __get_centrality_metrics(self, centrality_algorithm, backend='networkx'):
+        if backend == 'igraph':
+            return NoisyGraph.centrality_metrics(self.__get_igraph_centrality(), centrality_algorithm, backend)
+
+        n_graph = nx.Graph(self.edges())
+        return NoisyGraph.centrality_metrics(n_graph, centrality_algorithm)
 
     @staticmethod
     def __get_spearman_ordering_correlation(a, b):
@@ -388,15 +765,15 @@ class NoisyGraph:
 
         return 1 - ((6 * sum_d_squared) / (n * (n ** 2 - 1)))
 
-    def __get_centrality_profile(self, original_graph, centrality_algorithm):
+    def __get_centrality_profile(self, original_graph, centrality_algorithm, original_metrics=None,
+                                 noisy_metrics=None, backend='networkx'):
 
-        # obtaining metrics
-        if centrality_algorithm.__name__ == 'eigenvector_centrality':
-            original_metrics = centrality_algorithm(original_graph, max_iter=10000)
-        else:
-            original_metrics = centrality_algorithm(original_graph)
+        # obtaining metrics, the original ones may be cached by the caller
+        if original_metrics is None:
+            original_metrics = NoisyGraph.centrality_metrics(original_graph, centrality_algorithm, backend)
 
-        noisy_metrics = self.__get_centrality_metrics(centrality_algorithm)
+        if noisy_metrics is None:
+            noisy_metrics = self.__get_centrality_metrics(centrality_algorithm, backend)
 
         # obtaining values
         original_values = list(original_metrics.values())
@@ -416,14 +793,32 @@ class NoisyGraph:
 
         return distance, correlation, mean_change
 
-    def degree_centrality_profile(self, original_graph):
-        return self.__get_centrality_profile(original_graph, centrality.degree_centrality)
-
-    def betweenness_profile(self, original_graph):
-        return self.__get_centrality_profile(original_graph, centrality.betweenness_centrality)
-
-    def closeness_profile(self, original_graph):
-        return self.__get_centrality_profile(original_graph, centrality.closeness_centrality)
-
-    def eigenvector_centrality_profile(self, original_graph):
-        return self.__get_centrality_profile(original_graph, centrality.eigenvector_centrality)
+    # the profiles compute centralities with networkx or, with backend
+    # 'igraph', on igraph translations of both graphs, see IGraphCentrality
+    def degree_centrality_profile(self, original_graph, original_metrics=None, backend='networkx'):
+        return self.__get_centrality_profile(original_graph, centrality.degree_centrality, original_metrics,
+                                             backend=backend)
+
+    def betweenness_profile(self, original_graph, original_metrics=None, backend='networkx'):
+        return self.__get_centrality_profile(original_graph, centrality.betweenness_centrality, original_metrics,
+                                             backend=backend)
+
+    def closeness_profile(self, original_graph, original_metrics=None, backend='networkx'):
+        return self.__get_centrality_profile(original_graph, centrality.closeness_centrality, original_metrics,
+                                             backend=backend)
+
+    def eigenvector_centrality_profile(self, original_graph, original_metrics=None, backend='networkx'):
+        # the noisy graph iteration starts from the original centralities,
+        # its telemetry is kept, see `get_eigenvector_telemetry`
+        NoisyGraph.__check_backend(backend)
+        if original_metrics is None:
+            original_metrics = NoisyGraph.centrality_metrics(original_graph, centrality.eigenvector_centrality,
+                                                             backend)
+
+        if backend == 'igraph':
+            noisy_metrics, self.__eigenvector_telemetry = self.__get_igraph_centrality().eigenvector_centrality()
+        else:
+            noisy_metrics, self.__eigenvector_telemetry = NoisyGraph.eigenvector_centrality(nx.Graph(self.edges()),
+                                                                                            nstart=original_metrics)
+        return self.__get_centrality_profile(original_graph, centrality.eigenvector_centrality, original_metrics,
+                                             noisy_metrics, backend)
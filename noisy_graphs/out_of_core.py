@@ -0,0 +1,463 @@
+import sqlite3
+import numpy as np
+from collections import OrderedDict
+from math import lgamma, log
+from scipy.special import gammaln, logsumexp
+from scipy.stats import wasserstein_distance
+from noisy_graphs.counter_rng import fake_edge_budgets, rng_key
+from noisy_graphs.edge_list import edges_to_csr
+from noisy_graphs.noisy_graph import SequentialConstruction
+
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS nodes (node UNIQUE NOT NULL, no_real INTEGER NOT NULL, no_fake INTEGER NOT NULL, "
+    "sigma REAL)",
+    "CREATE INDEX IF NOT EXISTS nodes_by_sigma ON nodes (sigma, node)",
+    "CREATE TABLE IF NOT EXISTS edges (node1 NOT NULL, node2 NOT NULL, real INTEGER NOT NULL, "
+    "PRIMARY KEY (node1, node2)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)",
+]
+
+# number of rows read from sqlite at a time when scanning the nodes
+SCAN_CHUNK_SIZE = 100_000
+
+
+class DiskNoisyGraph(SequentialConstruction):
+    """
+    A noisy graph stored in a sqlite database instead of Python dicts, for
+    graphs whose edges do not fit in memory. Every edge is stored in both
+    directions with its real/fake flag, and every node with its real and
+    fake edge counts and its sigma, indexed by (sigma, node) so the least
+    protected candidates of a node are read from the index instead of
+    sorting all the nodes. Neighbor sets of the most recently used nodes
+    are kept in an LRU cache of `cache_size` nodes.
+
+    Construction is the one of `NoisyGraph`, see `SequentialConstruction`,
+    and draws the same budgets, so with the same numpy.random state,
+    or the same seed, it builds the same noisy graph. Sources can be
+    networkx graphs or, for large graphs, memory-mapped CSR or edge arrays
+    (see `noisy_graphs.edge_list.load_edge_list`). Uncertainty, sigma and
+    degree metrics scan the nodes table and only keep per-node arrays in
+    memory, never the edges. Node labels must be integers or strings.
+    """
+    def __init__(self, path, ftrp=None, seed=None, cache_size=100_000, page_cache_mb=256):
+        """
+        Opens a disk noisy graph, creating it if `path` does not hold one.
+        :param path: sqlite database file
+        :param ftrp: fake-to-real edge proportion, required for new graphs
+        :param seed: seed of the counter-based budgets, see `NoisyGraph`
+        :param cache_size: number of nodes whose neighbor sets are cached
+        :param page_cache_mb: size of the sqlite page cache in megabytes
+        """
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.execute(f"PRAGMA cache_size = {-1024 * page_cache_mb}")
+        for statement in SCHEMA:
+            self.__connection.execute(statement)
+
+        meta = dict(self.__connection.execute("SELECT key, value FROM meta"))
+        if meta:
+            self.__ftrp = meta['ftrp']
+            self.__rng_key = None if meta['rng_key'] is None else int(meta['rng_key'])
+            self.__no_real_edges = meta['no_real_edges']
+            self.__no_fake_edges = meta['no_fake_edges']
+            self.__no_nodes = meta['no_nodes']
+        else:
+            if ftrp is None:
+                raise ValueError("The ftrp is required to create a new disk noisy graph")
+            self.__ftrp = ftrp
+            self.__rng_key = None if seed is None else rng_key(seed)
+            self.__no_real_edges = 0
+            self.__no_fake_edges = 0
+            self.__no_nodes = 0
+
+        self.__cache_size = cache_size
+        self.__neighbor_cache = OrderedDict()
+        self.commit()
+
+    def get_ftrp(self):
+        return self.__ftrp
+
+    def commit(self):
+        """
+        Stores the counters and makes every change durable.
+        """
+        meta = {'ftrp': self.__ftrp, 'rng_key': None if self.__rng_key is None else str(self.__rng_key),
+                'no_real_edges': self.__no_real_edges, 'no_fake_edges': self.__no_fake_edges,
+                'no_nodes': self.__no_nodes}
+        self.__connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+        self.__connection.commit()
+
+    def close(self):
+        self.commit()
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # MARK: Node methods
+    def nodes(self):
+        return [node for node, in self.__connection.execute("SELECT node FROM nodes ORDER BY rowid")]
+
+    def number_of_nodes(self):
+        return self.__no_nodes
+
+    def has_node(self, node):
+        return self.__connection.execute("SELECT 1 FROM nodes WHERE node = ?", (node,)).fetchone() is not None
+
+    def add_node(self, node):
+        """
+        Adds a single node. If the node already exists, nothing is performed.
+        :param node: integer or string
+        """
+        cursor = self.__connection.execute("INSERT OR IGNORE INTO nodes VALUES (?, 0, 0, NULL)", (node,))
+        self.__no_nodes += cursor.rowcount
+
+    # MARK: Edges methods
+    def __neighbors(self, node):
+        """
+        Returns the real and the fake neighbor sets of a node, from the
+        LRU cache or from the edges table.
+        :param node: integer or string
+        :return: 2-tuple of sets (real_neighbors, fake_neighbors)
+        """
+        neighbors = self.__neighbor_cache.get(node)
+        if neighbors is not None:
+            self.__neighbor_cache.move_to_end(node)
+            return neighbors
+
+        neighbors = (set(), set())
+        for neighbor, real in self.__connection.execute("SELECT node2, real FROM edges WHERE node1 = ?", (node,)):
+            neighbors[0 if real else 1].add(neighbor)
+
+        self.__neighbor_cache[node] = neighbors
+        if len(self.__neighbor_cache) > self.__cache_size:
+            self.__neighbor_cache.popitem(last=False)
+        return neighbors
+
+    def __cache_edge(self, node1, node2, real):
+        """
+        Updates the cached neighbor sets of `node1`, if any, with an edge
+        stored as real or fake.
+        """
+        neighbors = self.__neighbor_cache.get(node1)
+        if neighbors is not None:
+            neighbors[0 if real else 1].add(node2)
+            neighbors[1 if real else 0].discard(node2)
+
+    def iter_edges_if(self, real):
+        return iter(self.__connection.execute("SELECT node1, node2 FROM edges WHERE real = ? AND node1 <= node2",
+                                              (int(real),)))
+
+    def iter_edges(self):
+        return iter(self.__connection.execute("SELECT node1, node2 FROM edges WHERE node1 <= node2"))
+
+    def edges_if(self, real):
+        return set(self.iter_edges_if(real))
+
+    def edges(self):
+        return set(self.iter_edges())
+
+    def add_edge(self, node1, node2, real):
+        self.add_edges_from([(node1, node2)], real)
+
+    def add_edges_from(self, edges, real):
+        """
+        Adds multiple edges to the graph, adding their nodes first if they
+        do not exist. If an edge already exists as the opposite (real or
+        fake) it is updated. Counters and sigmas of the touched nodes are
+        updated once at the end.
+        :param edges: iterable of two-tuples or numpy array of shape (m, 2)
+        :param real: boolean
+        """
+        if isinstance(edges, np.ndarray):
+            edges = edges.tolist()
+
+        changes = {}
+        for node1, node2 in edges:
+            changes.setdefault(node1, [0, 0])
+            changes.setdefault(node2, [0, 0])
+
+            real_neighbors, fake_neighbors = self.__neighbors(node1)
+            if node2 in (real_neighbors if real else fake_neighbors):
+                continue
+
+            # a real edge replacing a fake one or the other way around
+            replaced = node2 in (fake_neighbors if real else real_neighbors)
+            for node in (node1, node2):
+                changes[node][0 if real else 1] += 1
+                if replaced:
+                    changes[node][1 if real else 0] -= 1
+
+            if real:
+                self.__no_real_edges += 1
+                self.__no_fake_edges -= replaced
+            else:
+                self.__no_fake_edges += 1
+                self.__no_real_edges -= replaced
+
+            self.__connection.executemany("INSERT OR REPLACE INTO edges VALUES (?, ?, ?)",
+                                          ((node1, node2, int(real)), (node2, node1, int(real))))
+            self.__cache_edge(node1, node2, real)
+            self.__cache_edge(node2, node1, real)
+
+        cursor = self.__connection.executemany("INSERT OR IGNORE INTO nodes VALUES (?, 0, 0, NULL)",
+                                               ((node,) for node in changes))
+        self.__no_nodes += cursor.rowcount
+
+        # sigma is recomputed from the new counters, as `NoisyGraph.set_node_sigma` does
+        self.__connection.executemany(
+            "UPDATE nodes SET no_real = no_real + ?1, no_fake = no_fake + ?2, "
+            "sigma = CASE WHEN no_real + ?1 > 0 THEN (1.0 * (no_fake + ?2)) / (no_real + ?1) / ?3 END "
+            "WHERE node = ?4",
+            ((real_change, fake_change, self.__ftrp, node) for node, (real_change, fake_change) in changes.items()))
+
+    def node_neighbors_if(self, node, real):
+        return set(self.__neighbors(node)[0 if real else 1])
+
+    def node_neighbors(self, node):
+        real_neighbors, fake_neighbors = self.__neighbors(node)
+        return real_neighbors | fake_neighbors
+
+    def number_of_edges(self):
+        """
+        :return: 3-tuple (no_real_edges, no_fake_edges, total_edges)
+        """
+        return self.__no_real_edges, self.__no_fake_edges, self.__no_real_edges + self.__no_fake_edges
+
+    def number_of_edges_for_node(self, node):
+        """
+        :return: 3-tuple (no_real_edges, no_fake_edges, total_edges), None if the node does not exist
+        """
+        row = self.__connection.execute("SELECT no_real, no_fake FROM nodes WHERE node = ?", (node,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[0] + row[1]
+
+    def __scan_nodes(self, columns, condition=""):
+        """
+        Reads some columns of every node in chunks.
+        :return: generator of lists of row tuples
+        """
+        cursor = self.__connection.execute(f"SELECT {columns} FROM nodes {condition} ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(SCAN_CHUNK_SIZE)
+            if not rows:
+                return
+            yield rows
+
+    # MARK: Uncertainty methods
+    @staticmethod
+    def __log_number_of_hypotheses(total_edges, fake_edges, exact=True):
+        """
+        Natural logarithm of `NoisyGraph`'s number of hypotheses, through
+        lgamma so it does not build integers with millions of digits.
+        """
+        if exact:
+            return lgamma(total_edges + 1) - lgamma(fake_edges + 1) - lgamma(total_edges - fake_edges + 1)
+
+        log_total = -np.inf
+        for start in range(0, fake_edges + 1, SCAN_CHUNK_SIZE):
+            i = np.arange(start, min(start + SCAN_CHUNK_SIZE, fake_edges + 1))
+            log_total = np.logaddexp(log_total, logsumexp(gammaln(total_edges + 1) - gammaln(i + 1)
+                                                          - gammaln(total_edges - i + 1)))
+        return float(log_total)
+
+    def uncertainty(self, base=2, exact=True):
+        """
+        Calculates the graph uncertainty, see `NoisyGraph.uncertainty`.
+        :param base: positive integer
+        :param exact: boolean
+        :return: float
+        """
+        _, no_fake_edges, total_edges = self.number_of_edges()
+        return DiskNoisyGraph.__log_number_of_hypotheses(total_edges, no_fake_edges, exact) / log(base)
+
+    def node_uncertainty(self, node, base=2, exact=True):
+        """
+        Calculates a given `node` uncertainty, see `NoisyGraph.node_uncertainty`.
+        :return: float or None if node does not exist in graph
+        """
+        counts = self.number_of_edges_for_node(node)
+        if counts is None:
+            return None
+
+        _, no_fake_edges, total_edges = counts
+        return DiskNoisyGraph.__log_number_of_hypotheses(total_edges, no_fake_edges, exact) / log(base)
+
+    def node_uncertainties(self, base=2, exact=True):
+        """
+        Calculates the uncertainty of all the nodes, vectorized per chunk
+        of nodes when the attacker knows the exact number of fake edges.
+        :return: float array
+        """
+        chunks = []
+        for rows in self.__scan_nodes("no_real, no_fake"):
+            counts = np.array(rows, dtype=np.float64).reshape(-1, 2)
+            no_fake_edges = counts[:, 1]
+            total_edges = counts[:, 0] + no_fake_edges
+            if exact:
+                chunks.append(gammaln(total_edges + 1) - gammaln(no_fake_edges + 1)
+                              - gammaln(total_edges - no_fake_edges + 1))
+            else:
+                chunks.append(np.array([DiskNoisyGraph.__log_number_of_hypotheses(int(total), int(fake), False)
+                                        for total, fake in zip(total_edges, no_fake_edges)]))
+
+        return np.concatenate(chunks) / log(base) if chunks else np.zeros(0)
+
+    def uncertainty_profile(self, base=2, exact=True):
+        """
+        :return: tuple of floats corresponding to (mean, std_dev, minimum, maximum)
+        """
+        uncertainties = self.node_uncertainties(base, exact)
+        return float(np.mean(uncertainties)), float(np.std(uncertainties)), float(np.min(uncertainties)), \
+            float(np.max(uncertainties))
+
+    # MARK: Graph construction method
+    def get_node_sigma(self, node):
+        row = self.__connection.execute("SELECT sigma FROM nodes WHERE node = ?", (node,)).fetchone()
+        if row is None:
+            raise KeyError(node)
+        return row[0]
+
+    def get_graph_sigmas(self):
+        return [sigma for rows in self.__scan_nodes("sigma", "WHERE sigma IS NOT NULL") for sigma, in rows]
+
+    def is_seeded(self):
+        return self.__rng_key is not None
+
+    def fake_edge_budgets(self, nodes, degrees):
+        """
+        Draws the number of fake edges of many nodes at once, see
+        `NoisyGraph.fake_edge_budgets`.
+        """
+        if self.__rng_key is None:
+            raise ValueError("Fake edge budgets can only be drawn at once for graphs initialized with a seed")
+
+        return fake_edge_budgets(self.__rng_key, nodes, degrees, self.__ftrp)
+
+    def missing_neighbors_for_node(self, node, limit=None):
+        """
+        Returns the nodes the given node is not connected to, with their
+        sigma, in increasing order. With a `limit` only the first `limit`
+        nodes with sigma below 1 are returned, read from the sigma index.
+        :param node: integer or string
+        :param limit: integer or None
+        :return: list of 2-tuples
+        """
+        existing_neighbors = self.node_neighbors(node)
+        if limit is None:
+            query = self.__connection.execute("SELECT sigma, node FROM nodes ORDER BY sigma, node")
+        else:
+            query = self.__connection.execute("SELECT sigma, node FROM nodes WHERE sigma < 1.0 ORDER BY sigma, node "
+                                              "LIMIT ?", (int(limit) + len(existing_neighbors) + 1,))
+
+        missing_neighbors = [(sigma, node2) for sigma, node2 in query
+                             if node2 != node and node2 not in existing_neighbors]
+        return missing_neighbors if limit is None else missing_neighbors[:limit]
+
+    def construct_graph(self, nx_graph):
+        # budgets of seeded graphs are drawn for all nodes at once
+        budgets = {}
+        if self.__rng_key is not None:
+            nodes = list(nx_graph.nodes)
+            budgets = dict(zip(nodes, self.fake_edge_budgets(nodes, [nx_graph.degree(node) for node in nodes])))
+
+        for node in list(nx_graph.nodes):
+            neighbors = list(nx_graph.neighbors(node))
+
+            # we do not want to deal with the case where
+            # a node is not connected in the graph
+            if len(neighbors) == 0:
+                nx_graph.remove_node(node)
+                continue
+
+            self.add_node_with_neighbors(node, neighbors, budgets.get(node))
+
+        self.commit()
+
+    def construct_graph_from_csr(self, indptr, indices, labels=None, chunk_size=10_000):
+        """
+        Constructs the noisy graph of an original graph given by its
+        symmetric CSR arrays, node by node in index order like
+        `noisy_graphs.edge_list.edges_to_noisy_graph`. The arrays can be
+        memory-mapped, only `chunk_size` rows are read at a time and
+        changes are committed after every chunk. Nodes without neighbors
+        are skipped.
+        :param indptr: integer array of length n + 1
+        :param indices: integer array with the neighbors of every node
+        :param labels: array with the label of every node, its index by default
+        :param chunk_size: integer
+        """
+        no_nodes = len(indptr) - 1
+        for start in range(0, no_nodes, chunk_size):
+            stop = min(start + chunk_size, no_nodes)
+            offsets = np.asarray(indptr[start:stop + 1])
+            names = list(range(start, stop)) if labels is None else np.asarray(labels[start:stop]).tolist()
+
+            budgets = [None] * len(names)
+            if self.__rng_key is not None:
+                budgets = self.fake_edge_budgets(names, np.diff(offsets)).tolist()
+
+            for i, node in enumerate(names):
+                row = np.asarray(indices[offsets[i]:offsets[i + 1]])
+                if len(row) == 0:
+                    continue
+
+                neighbors = row.tolist() if labels is None else np.asarray(labels)[row].tolist()
+                self.add_node_with_neighbors(node, neighbors, budgets[i])
+
+            self.commit()
+
+    def construct_graph_from_edges(self, edges, labels=None, chunk_size=10_000):
+        """
+        Constructs the noisy graph of an original graph given as an (m, 2)
+        integer edge array, see `construct_graph_from_csr`. The CSR arrays
+        are built in memory, 16 bytes per edge.
+        """
+        indptr, indices = edges_to_csr(edges, None if labels is None else len(labels))
+        self.construct_graph_from_csr(indptr, indices, labels, chunk_size)
+
+    # MARK: metrics
+    def get_sigmas_profile(self):
+        sigmas = self.get_graph_sigmas()
+        return np.mean(sigmas), np.var(sigmas)
+
+    def get_uncertainty_profile(self):
+        uncertainties = self.node_uncertainties()
+        return np.mean(uncertainties), np.var(uncertainties)
+
+    def degree_centrality_profile(self, original_graph=None, original_metrics=None):
+        """
+        Degree centrality profile of `NoisyGraph.degree_centrality_profile`,
+        computed from the edge counts of the nodes: the real edges are the
+        edges of the original graph, so neither graph is read.
+        :param original_graph: ignored, kept for compatibility
+        :param original_metrics: ignored, kept for compatibility
+        :return: 3-tuple (distance, correlation, mean_change)
+        """
+        rows = [row for chunk in self.__scan_nodes("node, no_real, no_fake") for row in chunk]
+        nodes = np.array([row[0] for row in rows])
+        counts = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 2)
+
+        n = len(nodes)
+        scale = 1 / (n - 1) if n > 1 else 1.0
+        original_values = counts[:, 0] * scale
+        noisy_values = (counts[:, 0] + counts[:, 1]) * scale
+
+        # positions of the nodes when sorted by (value, node)
+        positions = []
+        for values in (original_values, noisy_values):
+            position = np.empty(n, dtype=np.float64)
+            position[np.lexsort((nodes, values))] = np.arange(n)
+            positions.append(position)
+
+        distance = wasserstein_distance(original_values, noisy_values)
+        correlation = 1 - 6 * np.sum((positions[0] - positions[1]) ** 2) / (n * (n ** 2 - 1))
+        mean_change = abs(noisy_values.mean() - original_values.mean()) / original_values.mean()
+
+        return distance, correlation, mean_change
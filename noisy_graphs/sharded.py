@@ -0,0 +1,250 @@
+import heapq
+import os
+import numpy as np
+from multiprocessing import Pipe, Process
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+class ShardIndex:
+    """
+    The sigma index of a partition of the nodes of a noisy graph under
+    construction. A shard knows the real and fake degree of its own nodes
+    and which of them every node of the graph is connected to, so it can
+    rank its nodes as fake-edge candidates for any node.
+    """
+    def __init__(self, ftrp):
+        self.__ftrp = ftrp
+        self.__labels = []
+        self.__index = {}
+        self.__neighbors = []
+        self.__no_real_edges = []
+        self.__no_fake_edges = []
+        self.__local_neighbors = {}
+        self.__sigmas = np.zeros(0)
+        self.__label_array = np.zeros(0)
+
+    def add_nodes(self, nodes):
+        for node in nodes:
+            self.__index[node] = len(self.__labels)
+            self.__labels.append(node)
+            self.__neighbors.append({})
+            self.__no_real_edges.append(0)
+            self.__no_fake_edges.append(0)
+
+    def add_edges(self, edges):
+        """
+        Applies edge additions to the nodes of the shard. An edge already
+        present as the opposite kind is updated, as in NoisyGraph.
+        :param edges: list of (node1, node2, real) triplets
+        """
+        for node1, node2, real in edges:
+            for node, neighbor in ((node1, node2), (node2, node1)):
+                if node not in self.__index:
+                    continue
+
+                i = self.__index[node]
+                previous = self.__neighbors[i].get(neighbor)
+                if previous is not None:
+                    self.__no_real_edges[i] -= previous
+                    self.__no_fake_edges[i] -= not previous
+                self.__neighbors[i][neighbor] = real
+                self.__no_real_edges[i] += real
+                self.__no_fake_edges[i] += not real
+                self.__local_neighbors.setdefault(neighbor, set()).add(i)
+
+    def candidates(self, node, k):
+        """
+        Returns the `k` nodes of the shard with the lowest sigma below 1
+        that are not connected to `node`, ranked as in
+        `NoisyGraph.missing_neighbors_for_node`.
+        :param node: hashable
+        :param k: integer
+        :return: sorted list of (sigma, node) tuples
+        """
+        sigmas = self.__sigmas.copy()
+        excluded = list(self.__local_neighbors.get(node, ()))
+        if node in self.__index:
+            excluded.append(self.__index[node])
+        sigmas[excluded] = np.inf
+
+        indices = np.flatnonzero(sigmas < 1.0)
+        if len(indices) > k:
+            kth_sigma = np.partition(sigmas[indices], k - 1)[k - 1]
+            indices = indices[sigmas[indices] <= kth_sigma]
+
+        if self.__label_array.dtype == object:
+            return sorted((sigmas[i], self.__labels[i]) for i in indices.tolist())[:k]
+
+        # numeric labels break sigma ties without building tuples
+        indices = indices[np.lexsort((self.__label_array[indices], sigmas[indices]))[:k]]
+        return list(zip(sigmas[indices].tolist(), self.__label_array[indices].tolist()))
+
+    def process_round(self, nodes, edges, queries):
+        """
+        Applies the nodes and edges added since the previous round and
+        answers the candidate queries of this one.
+        :param nodes: list of new nodes of the shard
+        :param edges: list of (node1, node2, real) triplets
+        :param queries: list of (node, k) tuples
+        :return: list of candidate lists, one per query
+        """
+        self.add_nodes(nodes)
+        self.add_edges(edges)
+        self.__sigmas = np.array(self.__no_fake_edges, dtype=np.float64) / \
+            np.array(self.__no_real_edges, dtype=np.float64) / self.__ftrp
+        self.__label_array = np.asarray(self.__labels)
+
+        return [self.candidates(node, k) for node, k in queries]
+
+
+def _run_shard(connection, ftrp):
+    shard = ShardIndex(ftrp)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        connection.send(shard.process_round(*message))
+    connection.close()
+
+
+class _ProcessShard:
+    """
+    A ShardIndex running in its own process, with the same `process_round`
+    split in a request and a response so all shards work at once.
+    """
+    def __init__(self, ftrp):
+        self.__connection, worker_connection = Pipe()
+        self.__process = Process(target=_run_shard, args=(worker_connection, ftrp), daemon=True)
+        self.__process.start()
+        worker_connection.close()
+
+    def send_round(self, nodes, edges, queries):
+        self.__connection.send((nodes, edges, queries))
+
+    def receive_round(self):
+        return self.__connection.recv()
+
+    def close(self):
+        self.__connection.send(None)
+        self.__process.join()
+        self.__connection.close()
+
+
+def construct_graph_sharded(nx_graph, ftrp, shards=None, batch_size=64, seed=None):
+    """
+    Constructs the noisy graph of `nx_graph` like `NoisyGraph.construct_graph`,
+    with the search for fake-edge candidates partitioned across `shards`
+    processes. Nodes are assigned to shards round-robin as they appear.
+    Nodes are processed in rounds of `batch_size`: the real edges of the
+    round are added, the fake-edge budgets drawn, and every shard returns
+    its best candidates for all the nodes of the round at once. The
+    coordinator then adds the fake edges node by node, re-checking the
+    candidates against the current graph, and sends the changes to the
+    shards with the next round.
+
+    Deviation from the sequential construction: with `batch_size` 1 the
+    result is the one of `construct_graph` for the same seed. Otherwise a
+    node ranks its candidates by sigmas that miss the edges added by at
+    most `batch_size - 1` other nodes of its round, so the real and fake
+    degree of every candidate it sees are off by at most `batch_size - 1`
+    each. The invariants hold regardless: a fake edge is only added while
+    both endpoints have sigma below 1, and no node adds more fake edges
+    than its drawn budget. With a `seed` budgets do not depend on the
+    rounds, so they are the ones of a sequential construction with the
+    same seed.
+    :param nx_graph: networkx graph, isolated nodes are removed from it
+    :param ftrp: fake-to-real edge proportion
+    :param shards: number of processes, None uses all cores and 1 runs in process
+    :param batch_size: number of nodes per round
+    :param seed: seed of the counter-based budgets, see `NoisyGraph`
+    :return: NoisyGraph
+    """
+    # we do not want to deal with the case where
+    # a node is not connected in the graph
+    nx_graph.remove_nodes_from([node for node in nx_graph.nodes if nx_graph.degree(node) == 0])
+
+    no_shards = shards or os.cpu_count()
+    shard_indexes = [ShardIndex(ftrp)] if no_shards == 1 else [_ProcessShard(ftrp) for _ in range(no_shards)]
+    noisy_graph = NoisyGraph(ftrp=ftrp, seed=seed)
+    shard_of = {}
+    new_nodes = [[] for _ in shard_indexes]
+    new_edges = [[] for _ in shard_indexes]
+
+    def record_edge(node1, node2, real):
+        for shard in {shard_of[node1], shard_of[node2]}:
+            new_edges[shard].append((node1, node2, real))
+
+    try:
+        nodes = list(nx_graph.nodes)
+        for start in range(0, len(nodes), batch_size):
+            round_nodes = nodes[start:start + batch_size]
+            neighbors = {node: list(nx_graph.neighbors(node)) for node in round_nodes}
+
+            # real edges of the round
+            for node in round_nodes:
+                for new_node in [node] + neighbors[node]:
+                    if new_node not in shard_of:
+                        shard_of[new_node] = len(shard_of) % len(shard_indexes)
+                        new_nodes[shard_of[new_node]].append(new_node)
+
+                noisy_graph.add_edges_from(((node, neighbor) for neighbor in neighbors[node]), real=True)
+                for neighbor in neighbors[node]:
+                    record_edge(node, neighbor, True)
+
+            # fake edge budgets
+            budgets = {}
+            for node in round_nodes:
+                if noisy_graph.get_node_sigma(node) < 1.0:
+                    budgets[node] = noisy_graph.number_of_fake_edges_to_add(len(neighbors[node]), node)
+            queries = [(node, budget + len(round_nodes) - 1) for node, budget in budgets.items() if budget > 0]
+
+            # candidates of every shard
+            if no_shards == 1:
+                shard_candidates = [shard_indexes[0].process_round(new_nodes[0], new_edges[0], queries)]
+            else:
+                for shard, shard_index in enumerate(shard_indexes):
+                    shard_index.send_round(new_nodes[shard], new_edges[shard], queries)
+                shard_candidates = [shard_index.receive_round() for shard_index in shard_indexes]
+            new_nodes = [[] for _ in shard_indexes]
+            new_edges = [[] for _ in shard_indexes]
+
+            # fake edges, checked against the current graph
+            for i, (node, k) in enumerate(queries):
+                budget = budgets[node]
+                candidate_lists = [candidates[i] for candidates in shard_candidates]
+                added_edges = _add_fake_edges(noisy_graph, node, budget, heapq.merge(*candidate_lists),
+                                               record_edge)
+
+                # skipped candidates may leave a truncated list short, the
+                # full ranking of the current graph completes the budget
+                if added_edges < budget and any(len(candidates) == k for candidates in candidate_lists):
+                    _add_fake_edges(noisy_graph, node, budget - added_edges,
+                                     noisy_graph.missing_neighbors_for_node(node), record_edge)
+    finally:
+        if no_shards != 1:
+            for shard_index in shard_indexes:
+                shard_index.close()
+
+    return noisy_graph
+
+
+def _add_fake_edges(noisy_graph, node, budget, candidates, record_edge):
+    """
+    Adds up to `budget` fake edges from `node` to the ranked candidates,
+    skipping the ones that are no longer valid in the current graph.
+    :return: number of fake edges added
+    """
+    added_edges = 0
+    for _, candidate in candidates:
+        if added_edges >= budget or noisy_graph.get_node_sigma(node) >= 1.0:
+            break
+        if candidate in noisy_graph.node_neighbors_if(node, True) or \
+                candidate in noisy_graph.node_neighbors_if(node, False) or \
+                noisy_graph.get_node_sigma(candidate) >= 1.0:
+            continue
+
+        noisy_graph.add_edge(node1=node, node2=candidate, real=False)
+        record_edge(node, candidate, False)
+        added_edges += 1
+
+    return added_edges
@@ -0,0 +1,166 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SharedGraph:
+    """
+    The CSR arrays of an undirected graph, and optionally per-node metrics
+    such as cached centralities, stored in `multiprocessing.shared_memory`
+    blocks. The process that publishes the graph owns the blocks; worker
+    processes attach to them with the picklable `handle` and read the
+    arrays without copying them.
+    """
+    def __init__(self, blocks, arrays, owner):
+        """
+        Initializes a shared graph. Use `publish` or `attach` instead.
+        """
+        self.__blocks = blocks
+        self.__arrays = arrays
+        self.__owner = owner
+
+    @staticmethod
+    def __to_block(array):
+        """
+        Copies `array` into a new shared memory block.
+        :param array: numpy array
+        :return: 2-tuple (block, shared array)
+        """
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        shared_array = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        shared_array[...] = array
+        return block, shared_array
+
+    @classmethod
+    def publish(cls, graph, node_metrics=None):
+        """
+        Copies a networkx graph, and the given per-node metrics, into
+        shared memory. Node labels must be numeric.
+        :param graph: networkx graph
+        :param node_metrics: dictionary of metric name to a dictionary of node to value
+        :return: SharedGraph
+        """
+        nodes = list(graph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum([len(graph.adj[node]) for node in nodes], out=indptr[1:])
+        indices = np.fromiter((index[neighbor] for node in nodes for neighbor in graph.adj[node]),
+                              dtype=np.int64, count=indptr[-1])
+
+        arrays = {'nodes': np.asarray(nodes), 'indptr': indptr, 'indices': indices}
+        for name, metrics in (node_metrics or {}).items():
+            arrays[f"metric:{name}"] = np.array([metrics[node] for node in nodes], dtype=np.float64)
+
+        if arrays['nodes'].dtype == object:
+            raise ValueError("Only graphs with numeric node labels can be shared")
+
+        blocks = {}
+        shared_arrays = {}
+        for name, array in arrays.items():
+            blocks[name], shared_arrays[name] = SharedGraph.__to_block(array)
+
+        return cls(blocks, shared_arrays, owner=True)
+
+    @property
+    def handle(self):
+        """
+        A picklable description of the shared blocks to pass to workers.
+        :return: dictionary of array name to (block name, shape, dtype)
+        """
+        return {name: (self.__blocks[name].name, array.shape, array.dtype.str)
+                for name, array in self.__arrays.items()}
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Attaches to the blocks of a shared graph published by another process.
+        :param handle: the `handle` of the published SharedGraph
+        :return: SharedGraph
+        """
+        blocks = {}
+        arrays = {}
+        for name, (block_name, shape, dtype) in handle.items():
+            blocks[name] = shared_memory.SharedMemory(name=block_name)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+
+        return cls(blocks, arrays, owner=False)
+
+    def csr_arrays(self):
+        """
+        Returns the shared arrays of the graph without copying them.
+        :return: 3-tuple (nodes, indptr, indices)
+        """
+        return self.__arrays['nodes'], self.__arrays['indptr'], self.__arrays['indices']
+
+    def node_metrics(self, name):
+        """
+        Returns a shared per-node metric as a dictionary of node to value.
+        The dictionary is a copy with a Python object per node, workers
+        should build it once, not once per job.
+        :param name: metric name given when publishing
+        :return: dictionary
+        """
+        return dict(zip(self.__arrays['nodes'].tolist(), self.__arrays[f"metric:{name}"].tolist()))
+
+    def metric_names(self):
+        return [name.split(':', 1)[1] for name in self.__arrays if name.startswith('metric:')]
+
+    def graph_view(self):
+        """
+        Returns a read-only view with the `nodes`, `neighbors` and `degree`
+        interface `NoisyGraph.construct_graph` reads from networkx graphs.
+        The view indexes every node label, workers should build it once,
+        not once per job.
+        :return: CSRGraphView
+        """
+        return CSRGraphView(*self.csr_arrays())
+
+    def close(self):
+        """
+        Releases the blocks. The owner also frees the shared memory, so it
+        must only close after every worker is done.
+        """
+        self.__arrays = {}
+        for block in self.__blocks.values():
+            block.close()
+            if self.__owner:
+                block.unlink()
+        self.__blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CSRGraphView:
+    """
+    A read-only undirected graph over CSR arrays exposing the subset of
+    the networkx interface used to construct noisy graphs.
+    """
+    def __init__(self, nodes, indptr, indices):
+        self.__labels = nodes
+        self.__indptr = indptr
+        self.__indices = indices
+        self.__index = {node: i for i, node in enumerate(nodes.tolist())}
+        self.nodes = list(self.__index)
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def neighbors(self, node):
+        row = self.__index[node]
+        return iter(self.__labels[self.__indices[self.__indptr[row]:self.__indptr[row + 1]]].tolist())
+
+    def degree(self, node):
+        """
+        Returns the degree of a node, as `nx.Graph.degree(node)`. Seeded
+        constructions read it to draw the budgets of all nodes at once.
+        :param node: node label
+        :return: integer
+        """
+        row = self.__index[node]
+        return int(self.__indptr[row + 1] - self.__indptr[row])
+
+    def remove_node(self, node):
+        raise TypeError("CSRGraphView is read-only, remove isolated nodes before sharing the graph")
@@ -0,0 +1,168 @@
+import json
+import os
+import numpy as np
+from noisy_graphs.csr import noisy_graph_to_csr
+from noisy_graphs.noisy_graph import NoisyGraph
+
+
+FORMAT_VERSION = 1
+ARRAY_NAMES = ('nodes', 'indptr', 'indices', 'real', 'sigmas')
+
+
+def save_noisy_graph(noisy_graph, path):
+    """
+    Saves a noisy graph as a snapshot directory with one `.npy` file per
+    array: node labels, CSR offsets, neighbor indices, real/fake flags
+    and node sigmas, plus a `meta.json` file with the ftrp.
+    :param noisy_graph: NoisyGraph
+    :param path: snapshot directory, created if it does not exist
+    """
+    nodes, indptr, indices, real = noisy_graph_to_csr(noisy_graph)
+    labels = np.asarray(nodes)
+    if labels.dtype == object:
+        raise ValueError("Only noisy graphs with numeric or string node labels can be saved")
+
+    sigmas = np.array([noisy_graph.get_node_sigma(node) for node in nodes], dtype=np.float64)
+
+    os.makedirs(path, exist_ok=True)
+    for name, array in zip(ARRAY_NAMES, (labels, indptr, indices, real, sigmas)):
+        np.save(os.path.join(path, f"{name}.npy"), array)
+
+    f = open(os.path.join(path, "meta.json"), "w")
+    json.dump({'format_version': FORMAT_VERSION, 'ftrp': noisy_graph.get_ftrp()}, f)
+    f.close()
+
+
+def load_noisy_graph(path, mmap=True):
+    """
+    Opens a snapshot saved with `save_noisy_graph`. By default the arrays
+    are memory-mapped read-only, so opening is immediate regardless of the
+    graph size and the pages are shared between processes opening the
+    same snapshot.
+    :param path: snapshot directory
+    :param mmap: boolean
+    :return: NoisyGraphSnapshot
+    """
+    f = open(os.path.join(path, "meta.json"), "r")
+    meta = json.load(f)
+    f.close()
+
+    if meta['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {meta['format_version']}")
+
+    mmap_mode = 'r' if mmap else None
+    arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES]
+    return NoisyGraphSnapshot(meta['ftrp'], *arrays)
+
+
+class NoisyGraphSnapshot:
+    """
+    A read-only noisy graph backed by CSR arrays, usually memory-mapped
+    from a snapshot directory.
+    """
+    def __init__(self, ftrp, nodes, indptr, indices, real, sigmas):
+        """
+        Initializes a snapshot from its arrays.
+        """
+        self.__ftrp = ftrp
+        self.__nodes = nodes
+        self.__indptr = indptr
+        self.__indices = indices
+        self.__real = real
+        self.__sigmas = sigmas
+        self.__index = None
+
+    def __node_index(self, node):
+        """
+        Returns the row of `node`. The label to row dictionary is only
+        built the first time a label lookup is needed.
+        :param node: hashable
+        :return: integer
+        """
+        if self.__index is None:
+            self.__index = {label: i for i, label in enumerate(self.__nodes.tolist())}
+        return self.__index[node]
+
+    def get_ftrp(self):
+        return self.__ftrp
+
+    def csr_arrays(self):
+        """
+        Returns the arrays of the snapshot without copying them.
+        :return: 4-tuple (nodes, indptr, indices, real)
+        """
+        return self.__nodes, self.__indptr, self.__indices, self.__real
+
+    # MARK: Node methods
+    def nodes(self):
+        return self.__nodes.tolist()
+
+    def number_of_nodes(self):
+        return len(self.__nodes)
+
+    def node_neighbors_if(self, node, real):
+        """
+        Returns a set of all nodes that are neighbors of the passed one.
+        The 'real' parameter determines if fake neighbors are returned
+        or the real ones.
+        :param node: hashable
+        :param real: boolean
+        :return: set of nodes
+        """
+        row = self.__node_index(node)
+        start, stop = self.__indptr[row], self.__indptr[row + 1]
+        mask = self.__real[start:stop] if real else ~self.__real[start:stop]
+        return set(self.__nodes[self.__indices[start:stop][mask]].tolist())
+
+    def node_neighbors(self, node):
+        row = self.__node_index(node)
+        start, stop = self.__indptr[row], self.__indptr[row + 1]
+        return set(self.__nodes[self.__indices[start:stop]].tolist())
+
+    # MARK: Edges methods
+    def edges_if(self, real):
+        """
+        Returns a set of all edges that satisfy the `real` condition.
+        :param real: boolean
+        :return: a set of two-tuples
+        """
+        rows = np.repeat(np.arange(len(self.__nodes)), np.diff(self.__indptr))
+        mask = (rows < self.__indices) & (self.__real if real else ~self.__real)
+        node1 = self.__nodes[rows[mask]].tolist()
+        node2 = self.__nodes[self.__indices[mask]].tolist()
+        return {(a, b) if a < b else (b, a) for a, b in zip(node1, node2)}
+
+    def edges(self):
+        return self.edges_if(real=True).union(self.edges_if(real=False))
+
+    def number_of_edges(self):
+        """
+        Obtain the number of real, fake and total edges in the graph.
+        :return: 3-tuple (no_real_edges, no_fake_edges, total_edges)
+        """
+        total = len(self.__indices) // 2
+        no_real_edges = int(np.count_nonzero(self.__real)) // 2
+        return no_real_edges, total - no_real_edges, total
+
+    def number_of_edges_for_node(self, node):
+        row = self.__node_index(node)
+        start, stop = self.__indptr[row], self.__indptr[row + 1]
+        no_real_edges = int(np.count_nonzero(self.__real[start:stop]))
+        return no_real_edges, int(stop - start) - no_real_edges, int(stop - start)
+
+    # MARK: Sigma methods
+    def get_node_sigma(self, node):
+        return float(self.__sigmas[self.__node_index(node)])
+
+    def get_graph_sigmas(self):
+        return self.__sigmas.tolist()
+
+    def to_noisy_graph(self):
+        """
+        Loads the snapshot into a regular, mutable NoisyGraph.
+        :return: NoisyGraph
+        """
+        noisy_graph = NoisyGraph(ftrp=self.__ftrp)
+        noisy_graph.add_edges_from(self.edges_if(real=True), real=True)
+        noisy_graph.add_edges_from(self.edges_if(real=False), real=False)
+        return noisy_graph
@@ -0,0 +1,236 @@
+from math import ceil, isfinite, log, sqrt
+
+
+class RunningStats:
+    """
+    Running count, mean and variance of a stream of values using
+    Welford's algorithm. Summaries of disjoint streams can be merged.
+    Non-finite values (nan, inf) are not summarized, only counted in
+    `skipped`.
+    """
+    def __init__(self):
+        self.count = 0
+        self.skipped = 0
+        self.mean = 0.0
+        self.__m2 = 0.0
+
+    def add(self, value):
+        """
+        Adds a value to the summary.
+        :param value: float
+        """
+        if not isfinite(value):
+            self.skipped += 1
+            return
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.__m2 += delta * (value - self.mean)
+
+    def remove(self, value):
+        """
+        Removes a previously added value from the summary, undoing its
+        Welford update.
+        :param value: float
+        """
+        if not isfinite(value):
+            self.skipped -= 1
+            return
+
+        if self.count <= 1:
+            self.count = 0
+            self.mean = 0.0
+            self.__m2 = 0.0
+            return
+
+        count = self.count - 1
+        mean = (self.count * self.mean - value) / count
+        self.__m2 -= (value - mean) * (value - self.mean)
+        self.mean = mean
+        self.count = count
+
+    def merge(self, other):
+        """
+        Adds all the values summarized by `other` to this summary.
+        :param other: RunningStats
+        """
+        self.skipped += other.skipped
+        if other.count == 0:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.__m2 += other.__m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    def variance(self, ddof=0):
+        """
+        Returns the variance of the values, the population one by default.
+        :param ddof: delta degrees of freedom
+        :return: float
+        """
+        if self.count - ddof <= 0:
+            return float('nan')
+        return max(self.__m2, 0.0) / (self.count - ddof)
+
+    def confidence_half_width(self, z=1.959964):
+        """
+        Returns the half width of the normal confidence interval of the mean.
+        :param z: standard normal quantile, 95% by default
+        :return: float
+        """
+        if self.count < 2:
+            return float('inf')
+        return z * sqrt(self.variance(ddof=1) / self.count)
+
+
+class QuantileSketch:
+    """
+    A mergeable quantile sketch with relative accuracy guarantees. Values
+    are counted in logarithmically sized buckets, so every quantile is
+    returned within `relative_accuracy` of a value of the stream and the
+    memory only grows with the logarithm of the range of the values.
+    Non-finite values (nan, inf) are not sketched, only counted in
+    `skipped`.
+    """
+    def __init__(self, relative_accuracy=0.01, min_value=1e-12):
+        """
+        Initializes an empty sketch. Values whose magnitude is below
+        `min_value` are counted as zero.
+        :param relative_accuracy: float in (0, 1)
+        :param min_value: positive float
+        """
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = log(self.__gamma)
+        self.__positive = {}
+        self.__negative = {}
+        self.__zeros = 0
+        self.count = 0
+        self.skipped = 0
+
+    def __bucket(self, value):
+        """
+        Returns the store and the bucket index of `value`.
+        """
+        if abs(value) < self.min_value:
+            return None, None
+
+        store = self.__positive if value > 0 else self.__negative
+        return store, ceil(log(abs(value)) / self.__log_gamma)
+
+    def add(self, value, count=1):
+        """
+        Adds `count` occurrences of a value to the sketch. A negative
+        `count` removes previously added occurrences.
+        :param value: float
+        :param count: integer
+        """
+        if not isfinite(value):
+            self.skipped += count
+            return
+
+        self.count += count
+        store, index = self.__bucket(value)
+        if store is None:
+            self.__zeros += count
+            return
+
+        store[index] = store.get(index, 0) + count
+        if store[index] == 0:
+            del store[index]
+
+    def remove(self, value):
+        """
+        Removes one occurrence of a previously added value.
+        :param value: float
+        """
+        self.add(value, count=-1)
+
+    def merge(self, other):
+        """
+        Adds all the values summarized by `other` to this sketch. Both
+        sketches must have the same accuracy.
+        :param other: QuantileSketch
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+
+        for store, other_store in ((self.__positive, other.__positive), (self.__negative, other.__negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.__zeros += other.__zeros
+        self.count += other.count
+        self.skipped += other.skipped
+
+    def __value(self, index):
+        return 2 * self.__gamma ** index / (self.__gamma + 1)
+
+    def quantile(self, q):
+        """
+        Returns an estimation of the `q` quantile of the values.
+        :param q: float in [0, 1]
+        :return: float, nan if the sketch is empty
+        """
+        if self.count <= 0:
+            return float('nan')
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.__negative, reverse=True):
+            seen += self.__negative[index]
+            if seen > rank:
+                return -self.__value(index)
+
+        seen += self.__zeros
+        if seen > rank:
+            return 0.0
+
+        for index in sorted(self.__positive):
+            seen += self.__positive[index]
+            if seen > rank:
+                return self.__value(index)
+
+        return self.__value(max(self.__positive)) if self.__positive else 0.0
+
+
+class StreamSummary:
+    """
+    The distribution of a stream of values that can change: running mean
+    and variance plus a quantile sketch, both supporting removals, so a
+    value is updated by removing the old one and adding the new one.
+    Summaries of disjoint streams, e.g. shards or replicates, can be merged.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value):
+        self.stats.add(value)
+        self.sketch.add(value)
+
+    def remove(self, value):
+        self.stats.remove(value)
+        self.sketch.remove(value)
+
+    def merge(self, other):
+        """
+        Adds all the values summarized by `other` to this summary.
+        :param other: StreamSummary
+        """
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+
+    def report(self, quantiles):
+        """
+        :param quantiles: list of floats in [0, 1]
+        :return: dictionary with the 'count', 'mean', 'variance' and a
+                 'p<100 q>' entry per quantile, e.g. 'p5' for 0.05
+        """
+        report = {'count': self.stats.count, 'mean': self.stats.mean, 'variance': self.stats.variance()}
+        for q in quantiles:
+            report[f"p{round(q * 100)}"] = self.sketch.quantile(q)
+        return report
@@ -0,0 +1,935 @@
+import asyncio
+import csv
+import os
+import random
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+from adaptive_sweep import AdaptiveSweep
+from experiment_utils import create_aggregated_data_path_file, create_data_path_file, perform_replicated_experiment, \
+    run_experiment
+from sweep import load_config, plan_jobs
+from legacy.negative_graphs.noisy_graph import NoisyGraph as LegacyNoisyGraph
+from noisy_graphs.attacks import auc, link_inference_attack, noisy_edge_scores, precision_at_k
+from noisy_graphs.collector import NeighborListCollector, collect_graph
+from noisy_graphs.contact_tracing import contact_tracing_trials
+from noisy_graphs.counter_rng import node_uniforms, rng_key
+from noisy_graphs.csr import adjacency_matrices
+from noisy_graphs.dynamic_centrality import DynamicCentrality
+from noisy_graphs.epidemics import frontier_bfs, quarantine_cost_curve, quarantine_trials, sir_spread
+from noisy_graphs.edge_list import edges_to_noisy_graph, load_edge_list
+from noisy_graphs.igraph_centrality import IGraphCentrality, igraph
+from noisy_graphs.nested import NoisyGraphFamily
+from noisy_graphs.noisy_graph import NoisyGraph
+from noisy_graphs.out_of_core import DiskNoisyGraph
+from noisy_graphs.sharded import construct_graph_sharded
+from noisy_graphs.shared_graph import SharedGraph
+from noisy_graphs.snapshot import load_noisy_graph, save_noisy_graph
+from noisy_graphs.streaming import QuantileSketch, RunningStats
+
+
+class NoisyGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.empty_graph = NoisyGraph(ftrp=1.0)
+
+        self.noisy_hexagon = NoisyGraph(ftrp=1.0)
+        self.noisy_hexagon.add_edges_from([(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (0, 5)], True)
+        self.noisy_hexagon.add_edges_from([(0, 2), (2, 4), (0, 4), (1, 3), (3, 5), (1, 5)], False)
+
+    def test_multiple_edge_addition(self):
+        real, fake, total = self.noisy_hexagon.number_of_edges()
+        assert real == 6
+        assert fake == 6
+        assert total == 12
+        self.assertTrue((0, 1) in self.noisy_hexagon.edges_if(True))
+        self.assertTrue((0, 2) in self.noisy_hexagon.edges_if(False))
+
+    def test_multiple_edge_addition_from_array(self):
+        self.empty_graph.add_edges_from(np.array([[0, 1], [1, 2], [2, 0]]), real=True)
+        assert self.empty_graph.number_of_nodes() == 3
+        assert self.empty_graph.number_of_edges() == (3, 0, 3)
+        for node in self.empty_graph.nodes():
+            self.assertTrue(isinstance(node, int))
+
+    def test_multiple_edge_addition_updates_opposite(self):
+        self.noisy_hexagon.add_edges_from([(0, 2), (1, 3)], real=True)
+        assert self.noisy_hexagon.number_of_edges() == (8, 4, 12)
+        self.assertFalse((0, 2) in self.noisy_hexagon.edges_if(False))
+
+    def test_edge_counters_follow_transitions(self):
+        self.noisy_hexagon.add_edge(0, 2, real=True)
+        self.noisy_hexagon.add_edge(0, 1, real=False)
+        self.noisy_hexagon.add_edge(0, 1, real=False)
+        self.noisy_hexagon.add_edges_from([(0, 2), (3, 0)], real=True)
+        assert self.noisy_hexagon.number_of_edges() == (7, 6, 13)
+        self.assertEqual(len(self.noisy_hexagon.edges_if(True)), 7)
+        self.assertEqual(len(self.noisy_hexagon.edges()), 13)
+
+    def test_edge_iterators(self):
+        self.assertEqual(sorted(self.noisy_hexagon.iter_edges_if(False)), sorted(self.noisy_hexagon.edges_if(False)))
+        self.assertEqual(sorted(self.noisy_hexagon.iter_edges()), sorted(self.noisy_hexagon.edges()))
+
+    def test_multiple_edge_addition_sigmas(self):
+        for node in self.noisy_hexagon.nodes():
+            self.assertEqual(self.noisy_hexagon.get_node_sigma(node), 1.0)
+
+    def test_bulk_and_single_addition_match(self):
+        edges = list(nx.barabasi_albert_graph(50, 3, seed=1).edges)
+        single_graph = NoisyGraph(ftrp=0.5)
+        for node1, node2 in edges:
+            single_graph.add_edge(node1, node2, real=True)
+        self.empty_graph.add_edges_from(edges, real=True)
+
+        self.assertEqual(single_graph.edges(), self.empty_graph.edges())
+        self.assertEqual(sorted(single_graph.get_graph_sigmas()), sorted(self.empty_graph.get_graph_sigmas()))
+
+    def test_construct_graph_sigmas(self):
+        np.random.seed(200494)
+        noisy_graph = NoisyGraph(ftrp=0.5)
+        noisy_graph.construct_graph(nx.barabasi_albert_graph(100, 5, seed=200494))
+        real, fake, _ = noisy_graph.number_of_edges()
+        assert real == nx.barabasi_albert_graph(100, 5, seed=200494).number_of_edges()
+        self.assertTrue(0 < fake <= real)
+
+    def test_limited_candidates_match_full_ranking(self):
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=3)
+        noisy_graph.construct_graph(nx.barabasi_albert_graph(300, 3, seed=1))
+        noisy_graph.add_edges_from([(0, 299), (5, 7), (10, 250)], real=False)
+        for node in noisy_graph.nodes()[::10]:
+            missing_neighbors = [entry for entry in noisy_graph.missing_neighbors_for_node(node) if entry[0] < 1.0]
+            for limit in (1, 5, 50, 1000):
+                self.assertEqual(noisy_graph.missing_neighbors_for_node(node, limit=limit), missing_neighbors[:limit])
+
+    def test_construction_matches_full_ranking(self):
+        class FullRankingNoisyGraph(NoisyGraph):
+            def fake_edge_candidates(self, node, no_fake_edges):
+                return self.missing_neighbors_for_node(node)
+
+        for seed in (None, 5):
+            noisy_graphs = []
+            for graph_class in (NoisyGraph, FullRankingNoisyGraph):
+                np.random.seed(200494)
+                noisy_graph = graph_class(ftrp=0.7, seed=seed)
+                noisy_graph.construct_graph(nx.barabasi_albert_graph(300, 4, seed=2))
+                noisy_graphs.append(noisy_graph)
+
+            self.assertEqual(noisy_graphs[0].edges_if(False), noisy_graphs[1].edges_if(False))
+
+
+class CounterBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(200, 4, seed=200494)
+
+    def test_budgets_distribution(self):
+        budgets = NoisyGraph(ftrp=0.3, seed=1).fake_edge_budgets(list(range(20000)), [10] * 20000)
+        self.assertAlmostEqual(np.mean(budgets), 3.0, delta=0.05)
+        self.assertAlmostEqual(np.var(budgets), 2.1, delta=0.1)
+        self.assertEqual(budgets.min(), 0)
+        self.assertTrue(budgets.max() <= 10)
+
+    def test_budgets_do_not_depend_on_order(self):
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=7)
+        budgets = noisy_graph.fake_edge_budgets([0, 1, 2, 3], [5, 6, 7, 8])
+        self.assertEqual(noisy_graph.fake_edge_budgets([3, 1], [8, 6]).tolist(), [budgets[3], budgets[1]])
+        self.assertEqual(noisy_graph.number_of_fake_edges_to_add(7, 2), budgets[2])
+
+    def test_string_labels_do_not_collide(self):
+        labels = [f"node {i}" for i in range(200000)]
+        uniforms = node_uniforms(rng_key(200494), labels)
+        self.assertEqual(len(np.unique(uniforms)), len(labels))
+        self.assertEqual(node_uniforms(rng_key(200494), labels[:3]).tolist(), uniforms[:3].tolist())
+
+    def test_seeded_construction_ignores_global_state(self):
+        noisy_graphs = []
+        for global_seed in (1, 2):
+            np.random.seed(global_seed)
+            noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+            noisy_graph.construct_graph(self.graph.copy())
+            noisy_graphs.append(noisy_graph)
+        self.assertEqual(noisy_graphs[0].edges_if(False), noisy_graphs[1].edges_if(False))
+
+    def test_seeded_sharded_construction(self):
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        noisy_graph.construct_graph(self.graph.copy())
+        sharded_graph = construct_graph_sharded(self.graph.copy(), 0.5, shards=2, batch_size=1, seed=200494)
+        self.assertEqual(sharded_graph.edges_if(False), noisy_graph.edges_if(False))
+
+
+class EigenvectorCentralityTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.watts_strogatz_graph(200, 6, 0.1, seed=200494)
+        self.expected = nx.eigenvector_centrality(self.graph, max_iter=10000)
+
+    def test_matches_networkx(self):
+        centralities, telemetry = NoisyGraph.eigenvector_centrality(self.graph)
+        for node in self.graph.nodes:
+            self.assertAlmostEqual(centralities[node], self.expected[node], places=12)
+        self.assertTrue(0 < telemetry['iterations'] < 1000)
+
+    def test_warm_start(self):
+        _, cold = NoisyGraph.eigenvector_centrality(self.graph)
+        _, warm = NoisyGraph.eigenvector_centrality(self.graph, nstart=self.expected)
+        self.assertTrue(warm['iterations'] < cold['iterations'])
+
+    def test_fallback(self):
+        centralities, telemetry = NoisyGraph.eigenvector_centrality(self.graph, max_iter=2)
+        self.assertEqual(telemetry['iterations'], 2)
+        self.assertTrue(telemetry['residual'] < 1e-8)
+        for node in self.graph.nodes:
+            self.assertAlmostEqual(centralities[node], self.expected[node], delta=1e-4)
+
+    def test_profile_telemetry(self):
+        np.random.seed(200494)
+        noisy_graph = NoisyGraph(ftrp=0.5)
+        noisy_graph.construct_graph(self.graph.copy())
+        self.assertTrue(noisy_graph.get_eigenvector_telemetry() is None)
+        noisy_graph.eigenvector_centrality_profile(self.graph, self.expected)
+        self.assertTrue(noisy_graph.get_eigenvector_telemetry()['iterations'] > 0)
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(200494)
+        self.noisy_graph = NoisyGraph(ftrp=0.5)
+        self.noisy_graph.construct_graph(nx.barabasi_albert_graph(100, 5, seed=200494))
+        self.directory = tempfile.TemporaryDirectory()
+        save_noisy_graph(self.noisy_graph, self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_snapshot_edges(self):
+        snapshot = load_noisy_graph(self.directory.name)
+        self.assertEqual(snapshot.edges_if(True), self.noisy_graph.edges_if(True))
+        self.assertEqual(snapshot.edges_if(False), self.noisy_graph.edges_if(False))
+        self.assertEqual(snapshot.number_of_edges(), self.noisy_graph.number_of_edges())
+
+    def test_snapshot_nodes(self):
+        snapshot = load_noisy_graph(self.directory.name)
+        self.assertEqual(snapshot.nodes(), self.noisy_graph.nodes())
+        for node in self.noisy_graph.nodes():
+            self.assertEqual(snapshot.node_neighbors_if(node, False), self.noisy_graph.node_neighbors_if(node, False))
+            self.assertEqual(snapshot.number_of_edges_for_node(node), self.noisy_graph.number_of_edges_for_node(node))
+            self.assertEqual(snapshot.get_node_sigma(node), self.noisy_graph.get_node_sigma(node))
+
+    def test_snapshot_to_noisy_graph(self):
+        noisy_graph = load_noisy_graph(self.directory.name).to_noisy_graph()
+        self.assertEqual(noisy_graph.edges(), self.noisy_graph.edges())
+        self.assertEqual(noisy_graph.get_ftrp(), 0.5)
+        self.assertEqual(sorted(noisy_graph.get_graph_sigmas()), sorted(self.noisy_graph.get_graph_sigmas()))
+
+
+class LegacyEquivalenceTest(unittest.TestCase):
+    def setUp(self):
+        real_edges = list(nx.barabasi_albert_graph(60, 3, seed=200494).edges)
+        fake_edges = [edge for edge in nx.complement(nx.Graph(real_edges)).edges][::40]
+        self.edges = [(node1, node2, True) for node1, node2 in real_edges]
+        self.edges += [(node1, node2, False) for node1, node2 in fake_edges]
+        self.edges += [(node1, node2, True) for node1, node2 in fake_edges[::5]]
+
+        self.legacy_graph = LegacyNoisyGraph()
+        self.noisy_graph = NoisyGraph(ftrp=0.5)
+        for node1, node2, real in self.edges:
+            self.legacy_graph.add_edge(node1, node2, real)
+            self.noisy_graph.add_edge(node1, node2, real)
+
+    def test_edges(self):
+        self.assertEqual(self.noisy_graph.edges_if(True), self.legacy_graph.edges_if(True))
+        self.assertEqual(self.noisy_graph.edges_if(False), self.legacy_graph.edges_if(False))
+        self.assertEqual(self.noisy_graph.edges(), self.legacy_graph.edges())
+
+    def test_number_of_edges(self):
+        self.assertEqual(self.noisy_graph.number_of_edges(), self.legacy_graph.number_of_edges())
+        for node in self.legacy_graph.nodes():
+            self.assertEqual(self.noisy_graph.number_of_edges_for_node(node),
+                             self.legacy_graph.number_of_edges_for_node(node))
+
+    def test_uncertainty(self):
+        self.assertEqual(self.noisy_graph.uncertainty(), self.legacy_graph.uncertainty())
+        self.assertEqual(self.noisy_graph.uncertainty(exact=False), self.legacy_graph.uncertainty(exact=False))
+        for node in self.legacy_graph.nodes():
+            self.assertEqual(self.noisy_graph.node_uncertainty(node), self.legacy_graph.node_uncertainty(node))
+
+    def test_bulk_addition(self):
+        noisy_graph = NoisyGraph(ftrp=0.5)
+        for real in (True, False, True):
+            noisy_graph.add_edges_from([(node1, node2) for node1, node2, edge_real in self.edges
+                                        if edge_real == real], real)
+        self.assertEqual(noisy_graph.edges_if(True), self.legacy_graph.edges_if(True))
+        self.assertEqual(noisy_graph.edges_if(False), self.legacy_graph.edges_if(False))
+
+
+class CollectorTest(unittest.TestCase):
+    def test_collected_graph_matches_construction(self):
+        graph = nx.barabasi_albert_graph(200, 4, seed=200494)
+        np.random.seed(200494)
+        noisy_graph, report = collect_graph(graph, 0.5, concurrency=50, batch_size=16)
+        np.random.seed(200494)
+        expected_graph = NoisyGraph(ftrp=0.5)
+        expected_graph.construct_graph(graph)
+
+        self.assertEqual(noisy_graph.edges_if(True), expected_graph.edges_if(True))
+        self.assertEqual(noisy_graph.edges_if(False), expected_graph.edges_if(False))
+        self.assertEqual(report['submissions'], 200)
+        self.assertTrue(report['batches'] >= 200 / 16)
+        self.assertTrue(report['latency_p50'] <= report['latency_p99'])
+
+    def test_cancelled_submission(self):
+        async def main():
+            collector = NeighborListCollector(0.5, seed=200494)
+            cancelled = asyncio.create_task(collector.submit(0, [1, 2]))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await collector.start()
+            sigma = await asyncio.wait_for(collector.submit(1, [0]), timeout=5)
+            await asyncio.wait_for(collector.stop(), timeout=5)
+            return collector, cancelled, sigma
+
+        collector, cancelled, sigma = asyncio.run(main())
+        self.assertTrue(cancelled.cancelled())
+        self.assertEqual(sigma, collector.noisy_graph.get_node_sigma(1))
+        self.assertEqual(collector.report()['submissions'], 2)
+        self.assertIn(2, collector.noisy_graph.node_neighbors(0))
+
+
+class ShardedConstructionTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(200, 4, seed=200494)
+        np.random.seed(200494)
+        self.noisy_graph = NoisyGraph(ftrp=0.5)
+        self.noisy_graph.construct_graph(self.graph.copy())
+
+    def test_single_node_rounds_match_construction(self):
+        for shards in (1, 2):
+            np.random.seed(200494)
+            noisy_graph = construct_graph_sharded(self.graph.copy(), 0.5, shards=shards, batch_size=1)
+            self.assertEqual(noisy_graph.edges_if(False), self.noisy_graph.edges_if(False))
+            self.assertEqual(noisy_graph.get_graph_sigmas(), self.noisy_graph.get_graph_sigmas())
+
+    def test_batched_rounds(self):
+        np.random.seed(200494)
+        noisy_graph = construct_graph_sharded(self.graph.copy(), 0.5, shards=2, batch_size=16)
+        self.assertEqual(noisy_graph.edges_if(True), self.noisy_graph.edges_if(True))
+        self.assertTrue(0 < noisy_graph.number_of_edges()[1] <= noisy_graph.number_of_edges()[0])
+
+
+class SharedGraphTest(unittest.TestCase):
+    def test_publish_attach_round_trip(self):
+        graph = nx.barabasi_albert_graph(50, 2, seed=200494)
+        degrees = nx.degree_centrality(graph)
+        shared = SharedGraph.publish(graph, {'degree': degrees})
+        handle = shared.handle
+
+        attached = SharedGraph.attach(handle)
+        self.assertEqual(attached.metric_names(), ['degree'])
+        self.assertEqual(attached.node_metrics('degree'), degrees)
+        view = attached.graph_view()
+        self.assertEqual(view.nodes, list(graph.nodes))
+        for node in graph.nodes:
+            self.assertEqual(sorted(view.neighbors(node)), sorted(graph.neighbors(node)))
+        attached.close()
+
+        # the owner frees the segments
+        shared.close()
+        self.assertRaises(FileNotFoundError, SharedGraph.attach, handle)
+
+    def test_seeded_construction_from_view(self):
+        graph = nx.barabasi_albert_graph(100, 3, seed=200494)
+        with SharedGraph.publish(graph) as shared:
+            view = shared.graph_view()
+            for node in graph.nodes:
+                self.assertEqual(view.degree(node), graph.degree(node))
+
+            noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+            noisy_graph.construct_graph(view)
+
+        expected = NoisyGraph(ftrp=0.5, seed=200494)
+        expected.construct_graph(graph.copy())
+        self.assertEqual(noisy_graph.edges_if(True), expected.edges_if(True))
+        self.assertEqual(noisy_graph.edges_if(False), expected.edges_if(False))
+
+
+class DynamicCentralityTest(unittest.TestCase):
+    def assert_centralities_match(self, graph, dynamic_centrality):
+        for name in ('degree_centrality', 'closeness_centrality', 'betweenness_centrality'):
+            expected = getattr(nx, name)(graph)
+            result = getattr(dynamic_centrality, name)()
+            for node in graph.nodes:
+                self.assertAlmostEqual(result[node], expected[node], places=12)
+
+        expected = nx.eigenvector_centrality(graph, max_iter=10000)
+        result = dynamic_centrality.eigenvector_centrality()
+        for node in graph.nodes:
+            self.assertAlmostEqual(result[node], expected[node], delta=1e-4)
+
+    def test_edge_insertions(self):
+        for graph in (nx.barabasi_albert_graph(60, 2, seed=200494), nx.erdos_renyi_graph(60, 0.03, seed=200494)):
+            graph.remove_nodes_from(list(nx.isolates(graph)))
+            dynamic_centrality = DynamicCentrality(graph)
+            self.assert_centralities_match(graph, dynamic_centrality)
+
+            missing_edges = list(nx.complement(graph).edges)[::97]
+            for start in range(0, len(missing_edges), 5):
+                graph.add_edges_from(missing_edges[start:start + 5])
+                dynamic_centrality.add_edges_from(missing_edges[start:start + 5])
+                self.assert_centralities_match(graph, dynamic_centrality)
+
+    def test_only_original_nodes(self):
+        dynamic_centrality = DynamicCentrality(nx.path_graph(4))
+        self.assertRaises(ValueError, dynamic_centrality.add_edge, 0, 10)
+
+
+class NoisyGraphFamilyTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(200, 4, seed=200494)
+        self.family = NoisyGraphFamily([0.1, 0.5, 1.0, 0.3], seed=200494)
+        self.family.construct_graph(self.graph.copy())
+
+    def test_members_are_nested(self):
+        members = self.family.members()
+        self.assertEqual([member.get_ftrp() for member in members], [0.1, 0.3, 0.5, 1.0])
+        for smaller, larger in zip(members, members[1:]):
+            self.assertTrue(smaller.edges_if(False) <= larger.edges_if(False))
+            self.assertEqual(smaller.edges_if(True), larger.edges_if(True))
+            self.assertTrue(smaller.number_of_edges()[1] <= larger.number_of_edges()[1])
+
+    def test_member_counts(self):
+        for member in self.family.members():
+            self.assertEqual(member.number_of_edges()[0], self.graph.number_of_edges())
+            self.assertEqual(member.number_of_edges()[1], len(member.edges_if(False)))
+            for node in member.nodes():
+                real, fake, _ = member.number_of_edges_for_node(node)
+                self.assertEqual(member.get_node_sigma(node), fake / real / member.get_ftrp())
+
+    def test_single_ftrp_matches_construction(self):
+        family = NoisyGraphFamily([0.5], seed=200494)
+        family.construct_graph(self.graph.copy())
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        noisy_graph.construct_graph(self.graph.copy())
+        self.assertEqual(family.member(0.5).edges_if(False), noisy_graph.edges_if(False))
+        self.assertEqual(family.member(0.5).uncertainty(), noisy_graph.uncertainty())
+
+    def test_member_counts_match_independent_construction(self):
+        graph = nx.barabasi_albert_graph(400, 3, seed=5)
+        family = NoisyGraphFamily([0.1, 0.2, 0.5, 1.0], seed=5)
+        family.construct_graph(graph.copy())
+        for level, member in enumerate(family.members()):
+            noisy_graph = NoisyGraph(ftrp=member.get_ftrp(), seed=5)
+            noisy_graph.construct_graph(graph.copy())
+            no_fake_edges = noisy_graph.number_of_edges()[1]
+            if level == 0:
+                self.assertEqual(member.edges_if(False), noisy_graph.edges_if(False))
+            self.assertTrue(0.95 * no_fake_edges <= member.number_of_edges()[1] <= 1.05 * no_fake_edges)
+
+    def test_fake_edges_respect_saturation_in_every_member(self):
+        # a fake edge is only added while both endpoints have sigma below 1
+        for member in self.family.members():
+            for node in member.nodes():
+                real, fake, _ = member.number_of_edges_for_node(node)
+                self.assertTrue(fake == 0 or fake - 1 < real * member.get_ftrp())
+
+    def test_members_are_read_only(self):
+        self.assertRaises(TypeError, self.family.member(0.5).add_edge, 0, 1, False)
+
+
+class LinkInferenceAttackTest(unittest.TestCase):
+    def setUp(self):
+        self.noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        self.noisy_graph.construct_graph(nx.barabasi_albert_graph(100, 3, seed=200494))
+
+    def test_scores_match_networkx(self):
+        scores, real = noisy_edge_scores(self.noisy_graph)
+        graph = nx.Graph(list(self.noisy_graph.edges()))
+        real_edges = self.noisy_graph.edges_if(True)
+        nodes, real_adjacency, fake_adjacency = adjacency_matrices(self.noisy_graph)
+        adjacency = (real_adjacency + fake_adjacency).tocoo()
+        edges = [(nodes[i], nodes[j]) for i, j in zip(adjacency.row, adjacency.col) if i < j]
+        self.assertEqual(len(edges), len(real))
+
+        expected = {
+            'cn': [len(list(nx.common_neighbors(graph, u, v))) for u, v in edges],
+            'aa': [score for _, _, score in nx.adamic_adar_index(graph, edges)],
+            'jaccard': [score for _, _, score in nx.jaccard_coefficient(graph, edges)],
+        }
+        for name, values in expected.items():
+            np.testing.assert_allclose(scores[name], values)
+        self.assertEqual(real.tolist(), [(min(edge), max(edge)) in real_edges for edge in edges])
+
+    def test_auc_and_precision(self):
+        scores = np.array([0.9, 0.8, 0.5, 0.5, 0.1])
+        positive = np.array([True, False, True, False, False])
+        self.assertAlmostEqual(auc(scores, positive), 4.5 / 6)
+        self.assertAlmostEqual(precision_at_k(scores, positive, 1), 1.0)
+        self.assertAlmostEqual(precision_at_k(scores, positive, 3), 1.5 / 3)
+        self.assertTrue(np.isnan(auc(scores, np.ones(5, dtype=bool))))
+
+    def test_report(self):
+        results = link_inference_attack(self.noisy_graph)
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(0 <= value <= 1 for value in results.values()))
+
+
+class StreamSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(300, 3, seed=200494)
+        self.noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        self.noisy_graph.construct_graph(self.graph.copy())
+
+    def assertSummarizes(self, summary, values):
+        self.assertEqual(summary.stats.count, len(values))
+        self.assertAlmostEqual(summary.stats.mean, np.mean(values))
+        self.assertAlmostEqual(summary.stats.variance(), np.var(values))
+        for q in (0.01, 0.05, 0.5):
+            expected = np.quantile(values, q, method='lower')
+            self.assertLessEqual(abs(summary.sketch.quantile(q) - expected), 0.01 * abs(expected) + 1e-9)
+
+    def test_summaries_follow_construction(self):
+        self.assertSummarizes(self.noisy_graph.sigma_summary(), self.noisy_graph.get_graph_sigmas())
+        self.assertSummarizes(self.noisy_graph.uncertainty_summary(), self.noisy_graph.node_uncertainties())
+
+    def test_summaries_follow_transitions(self):
+        self.noisy_graph.sigma_summary()
+        node1, node2 = sorted(self.noisy_graph.edges_if(False))[0]
+        self.noisy_graph.add_edge(node1, node2, True)
+        self.noisy_graph.add_node('new node')
+        self.assertSummarizes(self.noisy_graph.sigma_summary(), self.noisy_graph.get_graph_sigmas())
+        self.assertSummarizes(self.noisy_graph.uncertainty_summary(), self.noisy_graph.node_uncertainties())
+
+        real_edges = sorted(self.noisy_graph.edges_if(True))
+        self.noisy_graph.add_edges_from(real_edges[:5], real=True)
+        self.noisy_graph.add_edges_from(real_edges[5:10], real=False)
+        self.assertSummarizes(self.noisy_graph.sigma_summary(), self.noisy_graph.get_graph_sigmas())
+        self.assertSummarizes(self.noisy_graph.uncertainty_summary(), self.noisy_graph.node_uncertainties())
+
+    def test_merge(self):
+        other = NoisyGraph(ftrp=1.0, seed=200494)
+        other.construct_graph(self.graph.copy())
+        summary = self.noisy_graph.sigma_summary()
+        summary.merge(other.sigma_summary())
+        self.assertSummarizes(summary, self.noisy_graph.get_graph_sigmas() + other.get_graph_sigmas())
+
+    def test_distribution(self):
+        distribution = self.noisy_graph.get_uncertainty_distribution()
+        self.assertEqual(list(distribution), ['count', 'mean', 'variance', 'p1', 'p5', 'p50'])
+        self.assertTrue(distribution['p1'] <= distribution['p5'] <= distribution['p50'])
+
+
+@unittest.skipIf(igraph is None, "python-igraph is not installed")
+class IGraphCentralityTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(150, 3, seed=200494)
+        self.noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        self.noisy_graph.construct_graph(self.graph.copy())
+
+    def test_matches_networkx(self):
+        translation = IGraphCentrality.from_networkx(self.graph)
+        for algorithm in (nx.degree_centrality, nx.closeness_centrality, nx.betweenness_centrality,
+                          nx.eigenvector_centrality):
+            expected = NoisyGraph.centrality_metrics(self.graph, algorithm)
+            metrics = translation.centrality_metrics(algorithm)
+            self.assertEqual(set(metrics), set(expected))
+            for node, value in expected.items():
+                self.assertAlmostEqual(metrics[node], value, places=4)
+
+    def test_profiles_match_networkx(self):
+        profiles = [self.noisy_graph.degree_centrality_profile, self.noisy_graph.betweenness_profile,
+                    self.noisy_graph.closeness_profile, self.noisy_graph.eigenvector_centrality_profile]
+        for profile in profiles:
+            np.testing.assert_allclose(profile(self.graph, backend='igraph'), profile(self.graph), atol=1e-4)
+
+    def test_eigenvector_iterations_are_nan(self):
+        self.noisy_graph.eigenvector_centrality_profile(self.graph, backend='igraph')
+        self.assertTrue(np.isnan(self.noisy_graph.get_eigenvector_telemetry()['iterations']))
+
+        # replicate aggregation leaves them out and counts them
+        with tempfile.TemporaryDirectory() as directory:
+            data_path = os.path.join(directory, "replicates.csv")
+            create_aggregated_data_path_file(data_path, ['ec'])
+            perform_replicated_experiment(lambda: nx.barabasi_albert_graph(60, 3), 0.5, "exp", data_path,
+                                          seed=200494, replicates=2, metric_groups=['ec'], centrality_backend='igraph')
+            with open(data_path) as f:
+                row = next(csv.DictReader(f))
+
+        self.assertEqual(row['ec_iterations_nonfinite'], "2")
+        self.assertEqual(row['ec_iterations_mean'], "nan")
+        self.assertEqual(row['ec_residual_nonfinite'], "0")
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, self.noisy_graph.closeness_profile, self.graph, backend='graph-tool')
+
+
+class DiskNoisyGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(200, 4, seed=200494)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "noisy_graph.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_construction(self):
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        noisy_graph.construct_graph(self.graph.copy())
+
+        # a tiny neighbor cache forces reads from the database
+        with DiskNoisyGraph(self.path, ftrp=0.5, seed=200494, cache_size=2) as disk_graph:
+            disk_graph.construct_graph(self.graph.copy())
+            self.assertEqual(disk_graph.edges_if(True), noisy_graph.edges_if(True))
+            self.assertEqual(disk_graph.edges_if(False), noisy_graph.edges_if(False))
+            self.assertEqual(disk_graph.number_of_edges(), noisy_graph.number_of_edges())
+            self.assertAlmostEqual(disk_graph.uncertainty(), noisy_graph.uncertainty())
+            self.assertAlmostEqual(disk_graph.uncertainty(exact=False), noisy_graph.uncertainty(exact=False))
+            np.testing.assert_allclose(disk_graph.uncertainty_profile(), noisy_graph.uncertainty_profile())
+            np.testing.assert_allclose(disk_graph.get_sigmas_profile(), noisy_graph.get_sigmas_profile())
+            np.testing.assert_allclose(disk_graph.degree_centrality_profile(),
+                                       noisy_graph.degree_centrality_profile(self.graph))
+
+    def test_unknown_node_sigma(self):
+        with DiskNoisyGraph(self.path, ftrp=0.5) as disk_graph:
+            disk_graph.add_edge(0, 1, True)
+            self.assertEqual(disk_graph.get_node_sigma(0), 0.0)
+            self.assertRaises(KeyError, disk_graph.get_node_sigma, 2)
+        self.assertRaises(KeyError, NoisyGraph(ftrp=0.5).get_node_sigma, 2)
+
+    def test_edge_array_construction(self):
+        edges = np.array(self.graph.edges())
+        np.random.seed(200494)
+        noisy_graph = edges_to_noisy_graph(edges, ftrp=1.0)
+
+        np.random.seed(200494)
+        with DiskNoisyGraph(self.path, ftrp=1.0) as disk_graph:
+            disk_graph.construct_graph_from_edges(edges, chunk_size=64)
+        with DiskNoisyGraph(self.path) as disk_graph:
+            self.assertEqual(disk_graph.get_ftrp(), 1.0)
+            self.assertEqual(disk_graph.edges(), noisy_graph.edges())
+            self.assertEqual(disk_graph.number_of_edges(), noisy_graph.number_of_edges())
+            self.assertEqual(disk_graph.number_of_nodes(), noisy_graph.number_of_nodes())
+            for node in noisy_graph.nodes():
+                self.assertEqual(disk_graph.number_of_edges_for_node(node), noisy_graph.number_of_edges_for_node(node))
+                self.assertEqual(disk_graph.get_node_sigma(node), noisy_graph.get_node_sigma(node))
+
+    def test_edge_transitions(self):
+        with DiskNoisyGraph(self.path, ftrp=1.0) as disk_graph:
+            disk_graph.add_edges_from([(0, 1), (1, 2)], False)
+            disk_graph.add_edges_from([(0, 1), (0, 1), (2, 3)], True)
+            self.assertEqual(disk_graph.number_of_edges(), (2, 1, 3))
+            self.assertEqual(disk_graph.node_neighbors_if(1, True), {0})
+            self.assertEqual(disk_graph.number_of_edges_for_node(1), (1, 1, 2))
+            self.assertEqual(disk_graph.get_node_sigma(1), 1.0)
+
+
+class PlanJobsTest(unittest.TestCase):
+    def test_shared_graphs_and_runs(self):
+        config = {
+            'name': 'BA',
+            'model': 'barabasi_albert',
+            'seed': 200494,
+            'parameters': {'n': {'values': [100, 200]}, 'm_fraction': {'values': [0.02, 0.025]}},
+            'ftrp': {'max': 1.0, 'intervals': 2},
+        }
+        groups = plan_jobs(config)
+
+        # m = int(n * m_fraction) is 2 for both fractions when n is 100
+        self.assertEqual(sorted((dict(arguments)['n'], dict(arguments)['m']) for _, arguments, _ in groups),
+                         [(100, 2), (200, 4), (200, 5)])
+        shared_group = groups[('barabasi_albert_graph', (('m', 2), ('n', 100)), 200494)]
+        self.assertEqual(shared_group, {0.5: ['BA_100_0.02_0.5', 'BA_100_0.025_0.5'],
+                                        1.0: ['BA_100_0.02_1.0', 'BA_100_0.025_1.0']})
+        self.assertEqual(sum(len(group) for group in groups.values()), 6)
+        self.assertEqual(sum(len(names) for group in groups.values() for names in group.values()), 8)
+
+
+class AdaptiveSweepTest(unittest.TestCase):
+    @staticmethod
+    def run_sweep(metric, max_depth):
+        evaluated = []
+
+        def evaluate(point):
+            evaluated.append(point['x'])
+            return {'m': metric(point['x'])}
+
+        AdaptiveSweep({'x': (0.0, 1.0)}, evaluate, {'m': 0.5}, initial_intervals=2, max_depth=max_depth).run()
+        return sorted(evaluated)
+
+    def test_refines_cells_around_changes(self):
+        def step(x):
+            return float(x >= 0.3)
+
+        self.assertEqual(self.run_sweep(step, 0), [0.0, 0.5, 1.0])
+        self.assertEqual(self.run_sweep(step, 1), [0.0, 0.25, 0.5, 1.0])
+        self.assertEqual(self.run_sweep(step, 3), [0.0, 0.25, 0.312, 0.375, 0.5, 1.0])
+
+    def test_depth_limit(self):
+        evaluated = self.run_sweep(lambda x: x * 10, 4)
+        self.assertEqual(len(evaluated), 2 ** 4 * 2 + 1)
+        self.assertEqual(evaluated[1], 0.031)
+
+    def test_non_finite_metrics_refine(self):
+        def nan_above(x):
+            return float('nan') if x > 0.6 else 0.0
+
+        self.assertEqual(self.run_sweep(nan_above, 2), [0.0, 0.5, 0.625, 0.75, 0.875, 1.0])
+
+    def test_thresholds_are_validated(self):
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, "config.json")
+        f = open(path, "w")
+        f.write('{"model": "erdos_renyi", "scheduler": "adaptive", "metrics": ["sigma"], '
+                '"thresholds": {"sigma_mean": 0.1, "dc_correlation": 0.1}}')
+        f.close()
+        self.assertRaisesRegex(ValueError, "dc_correlation", load_config, path)
+        directory.cleanup()
+
+
+class StreamingTest(unittest.TestCase):
+    def test_non_finite_values_are_skipped(self):
+        stats = RunningStats()
+        sketch = QuantileSketch()
+        for value in [1.0, float('nan'), 3.0, float('inf'), -float('inf')]:
+            stats.add(value)
+            sketch.add(value)
+
+        self.assertEqual((stats.count, stats.skipped), (2, 3))
+        self.assertEqual((sketch.count, sketch.skipped), (2, 3))
+        self.assertEqual(stats.mean, 2.0)
+        self.assertEqual(stats.variance(), 1.0)
+        self.assertAlmostEqual(sketch.quantile(1.0), 3.0, delta=0.03)
+
+    def test_merge_keeps_skipped(self):
+        stats = RunningStats()
+        other = RunningStats()
+        stats.add(1.0)
+        other.add(float('nan'))
+        other.add(2.0)
+        stats.merge(other)
+        self.assertEqual((stats.count, stats.skipped, stats.mean), (2, 1, 1.5))
+
+
+class ReplicatedExperimentTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.directory.name, "replicates.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def graph_factory():
+        return nx.barabasi_albert_graph(60, 3)
+
+    def run_replicates(self, ftrp, metric_groups, replicates=3, tolerance=None):
+        create_aggregated_data_path_file(self.data_path, metric_groups)
+        perform_replicated_experiment(self.graph_factory, ftrp, "exp", self.data_path, seed=200494,
+                                      replicates=replicates, tolerance=tolerance, metric_groups=metric_groups)
+        with open(self.data_path) as f:
+            header = f.readline().strip().split(",")
+            f.seek(0)
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(list(rows[0]), header)
+        return rows[0]
+
+    def test_default_metric_groups(self):
+        # distribution and attack metrics are only computed when selected
+        create_data_path_file(self.data_path)
+        with open(self.data_path) as f:
+            header = f.readline().strip().split(",")
+        metrics, _ = run_experiment(self.graph_factory(), 0.5, raw_data=False)
+
+        self.assertEqual(header, ["exp_name", "sigma_mean", "sigma_variance", "uncertainty_mean",
+                                  "uncertainty_variance", "dc_distance", "dc_correlation", "dc_mean_change",
+                                  "bc_distance", "bc_correlation", "bc_mean_change", "cc_distance", "cc_correlation",
+                                  "cc_mean_change", "ec_distance", "ec_correlation", "ec_mean_change", "ec_iterations",
+                                  "ec_residual"])
+        self.assertEqual(list(metrics), header[1:])
+
+    def test_aggregates(self):
+        row = self.run_replicates(0.5, ['sigma'])
+        self.assertEqual(list(row), ["exp_name", "replicates",
+                                     "sigma_mean_mean", "sigma_mean_variance", "sigma_mean_p05", "sigma_mean_p50",
+                                     "sigma_mean_p95", "sigma_mean_nonfinite",
+                                     "sigma_variance_mean", "sigma_variance_variance", "sigma_variance_p05",
+                                     "sigma_variance_p50", "sigma_variance_p95", "sigma_variance_nonfinite"])
+
+        values = []
+        for replicate in range(3):
+            random.seed(200494 + replicate)
+            np.random.seed(200494 + replicate)
+            graph = self.graph_factory()
+            values.append(run_experiment(graph, 0.5, metric_groups=['sigma'])[0]['sigma_mean'])
+
+        self.assertEqual(row['replicates'], "3")
+        self.assertAlmostEqual(float(row['sigma_mean_mean']), np.mean(values))
+        self.assertAlmostEqual(float(row['sigma_mean_variance']), np.var(values, ddof=1))
+        self.assertEqual(row['sigma_mean_nonfinite'], "0")
+
+    def test_raw_data_is_optional(self):
+        graph = self.graph_factory()
+        metrics, raw_data = run_experiment(graph, 0.5, metric_groups=['sigma'], raw_data=False)
+        self.assertIsNone(raw_data)
+        self.assertEqual(list(metrics), ['sigma_mean', 'sigma_variance'])
+        _, raw_data = run_experiment(graph, 0.5, metric_groups=['sigma'])
+        self.assertTrue(raw_data.startswith("Real edges: "))
+
+    def test_early_stop(self):
+        row = self.run_replicates(0.5, ['sigma'], replicates=10, tolerance=1e6)
+        self.assertEqual(row['replicates'], "3")
+        row = self.run_replicates(0.5, ['sigma'], replicates=4, tolerance=1e-12)
+        self.assertEqual(row['replicates'], "4")
+
+    def test_non_finite_metrics(self):
+        # without fake edges the attack aucs are nan
+        row = self.run_replicates(1e-9, ['sigma', 'attack'], replicates=5, tolerance=1e6)
+        self.assertEqual(row['replicates'], "3")
+        self.assertEqual(row['attack_cn_auc_nonfinite'], "3")
+        self.assertEqual(row['attack_cn_auc_mean'], "nan")
+        self.assertEqual(row['sigma_mean_nonfinite'], "0")
+
+
+class ContactTracingTest(unittest.TestCase):
+    def setUp(self):
+        self.noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        self.noisy_graph.construct_graph(nx.barabasi_albert_graph(120, 2, seed=200494))
+        self.nodes = self.noisy_graph.nodes()
+        self.real_graph = nx.Graph(list(self.noisy_graph.edges_if(True)))
+        self.full_graph = nx.Graph(list(self.noisy_graph.edges()))
+
+    def sampled_infected(self, no_infected, no_trials, seed):
+        keys = np.random.default_rng(seed).random((no_trials, len(self.nodes)))
+        return [[self.nodes[i] for i in row] for row in np.argpartition(keys, no_infected - 1, axis=1)[:, :no_infected]]
+
+    @staticmethod
+    def traced(graph, infected, hops):
+        reached = nx.multi_source_dijkstra_path_length(graph, set(infected), cutoff=hops)
+        return set(reached) - set(infected)
+
+    def test_trials_match_networkx(self):
+        for hops in (1, 2, 3):
+            trials = contact_tracing_trials(self.noisy_graph, 4, 12, hops=hops, seed=200494, batch_size=12)
+            for i, infected in enumerate(self.sampled_infected(4, 12, 200494)):
+                real_traced = self.traced(self.real_graph, infected, hops)
+                traced = self.traced(self.full_graph, infected, hops)
+                self.assertEqual(trials['contacts'][i], len(traced))
+                self.assertEqual(trials['real_contacts'][i], len(real_traced))
+                self.assertEqual(trials['fake_contacts'][i], len(traced - real_traced))
+
+    def test_infected_contacts(self):
+        trials = contact_tracing_trials(self.noisy_graph, 30, 5, seed=200494, batch_size=5)
+        for i, infected in enumerate(self.sampled_infected(30, 5, 200494)):
+            neighbors = set().union(*(self.full_graph[node] for node in infected))
+            self.assertEqual(trials['contacts'][i] + trials['infected_contacts'][i], len(neighbors))
+
+    def test_batches(self):
+        trials = contact_tracing_trials(self.noisy_graph, 4, 10, hops=2, seed=200494, batch_size=3)
+        self.assertEqual(len(trials['contacts']), 10)
+        self.assertTrue(np.array_equal(trials['contacts'], trials['real_contacts'] + trials['fake_contacts']))
+
+
+class EdgeListTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        f = open(path, "w")
+        f.write(text)
+        f.close()
+        return path
+
+    def test_relabeling(self):
+        path = self.write("graph.txt", "# comment\n30 10 0.5\n10 20 1.5\n\n% comment\n20 40 2.5\n")
+        edges, labels = load_edge_list(path, cache=False)
+        self.assertEqual(labels.tolist(), [30, 10, 20, 40])
+        self.assertEqual(edges.tolist(), [[0, 1], [1, 2], [2, 3]])
+
+        path = self.write("names.txt", "bob alice\nalice carol\n")
+        edges, labels = load_edge_list(path, cache=False, chunk_size=1)
+        self.assertEqual(labels.tolist(), ['bob', 'alice', 'carol'])
+        self.assertEqual(edges.tolist(), [[0, 1], [1, 2]])
+
+    def test_duplicates_and_self_loops(self):
+        path = self.write("graph.txt", "1 2\n2 1\n3 3\n2 3\n1 2\n3 2\n")
+        edges, labels = load_edge_list(path, cache=False)
+        self.assertEqual(labels.tolist(), [1, 2, 3])
+        self.assertEqual(edges.tolist(), [[0, 1], [1, 2]])
+
+    def test_cache(self):
+        path = self.write("graph.txt", "1 2\n2 3\n3 1\n")
+        edges, labels = load_edge_list(path)
+        self.assertTrue(os.path.exists(f"{path}.edges.npy") and os.path.exists(f"{path}.labels.npy"))
+
+        cached_edges, cached_labels = load_edge_list(path)
+        self.assertIsInstance(cached_edges, np.memmap)
+        self.assertIsInstance(cached_labels, np.memmap)
+        self.assertEqual(cached_edges.tolist(), edges.tolist())
+        self.assertEqual(cached_labels.tolist(), labels.tolist())
+
+
+class EpidemicsTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(150, 2, seed=200494)
+        self.graph.add_edges_from([(150, 151), (151, 152)])
+        adjacency = nx.to_scipy_sparse_array(self.graph, nodelist=range(153), format='csr')
+        self.indptr, self.indices = adjacency.indptr, adjacency.indices
+
+    def within_hops(self, graph, sources, hops):
+        return {node for node, distance in nx.multi_source_dijkstra_path_length(graph, set(sources)).items()
+                if distance <= hops}
+
+    def test_frontier_bfs_matches_networkx(self):
+        for sources, hops in (([0], 1), ([3, 40, 150], 2), ([7, 8], 0), ([150], 5)):
+            reached = frontier_bfs(self.indptr, self.indices, np.array(sources), hops)
+            self.assertEqual(set(np.flatnonzero(reached)), self.within_hops(self.graph, sources, hops))
+
+    def test_sir_spread(self):
+        rng = np.random.default_rng(200494)
+        sources = np.array([150])
+        infected = sir_spread(self.indptr, self.indices, sources, 0.0, 1.0, rng)
+        self.assertEqual(set(np.flatnonzero(infected)), {150})
+        infected = sir_spread(self.indptr, self.indices, sources, 1.0, 1.0, rng)
+        self.assertEqual(set(np.flatnonzero(infected)), {150, 151, 152})
+        infected = sir_spread(self.indptr, self.indices, np.array([0]), 0.3, 0.5, rng)
+        self.assertTrue(infected[0])
+        self.assertTrue(set(np.flatnonzero(infected)) <= nx.node_connected_component(self.graph, 0))
+
+    def test_quarantine_trials_match_networkx(self):
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        noisy_graph.construct_graph(self.graph.copy())
+        trials = quarantine_trials(noisy_graph, 20, 3, hops=2, seed=200494, workers=1)
+
+        nodes = noisy_graph.nodes()
+        real_graph = nx.Graph(list(noisy_graph.edges_if(True)))
+        full_graph = nx.Graph(list(noisy_graph.edges()))
+        for i, seed_sequence in enumerate(np.random.SeedSequence(200494).spawn(20)):
+            sources = [nodes[j] for j in np.random.default_rng(seed_sequence).choice(len(nodes), 3, replace=False)]
+            real_traced = self.within_hops(real_graph, sources, 2) - set(sources)
+            traced = self.within_hops(full_graph, sources, 2) - set(sources)
+            self.assertEqual(trials['infected'][i], 3)
+            self.assertEqual(trials['real_quarantines'][i], len(real_traced))
+            self.assertEqual(trials['fake_quarantines'][i], len(traced) - len(real_traced))
+
+        parallel_trials = quarantine_trials(noisy_graph, 20, 3, hops=2, seed=200494, workers=2)
+        for key in trials:
+            self.assertTrue(np.array_equal(trials[key], parallel_trials[key]))
+
+    def test_quarantine_trials_with_epidemic(self):
+        noisy_graph = NoisyGraph(ftrp=0.5, seed=200494)
+        noisy_graph.construct_graph(self.graph.copy())
+        trials = quarantine_trials(noisy_graph, 10, 2, hops=1, beta=1.0, gamma=1.0, seed=200494, workers=1)
+        # the epidemic reaches whole components, only fake edges leave them
+        self.assertTrue(np.all(trials['infected'] >= 2))
+        self.assertTrue(np.all(trials['real_quarantines'] == 0))
+
+    def test_cost_curve_rows(self):
+        curve = quarantine_cost_curve(self.graph.copy(), [0.2, 0.5], 5, 2, hops=[1, 2], seed=200494, workers=1)
+        self.assertEqual([(point['ftrp'], point['hops']) for point in curve], [(0.2, 1), (0.2, 2), (0.5, 1), (0.5, 2)])
+        for point in curve:
+            self.assertTrue(point['real_mean'] > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
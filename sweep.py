@@ -0,0 +1,233 @@
+import json
+import random
+import sys
+import networkx as nx
+import numpy
+from itertools import product
+from adaptive_sweep import AdaptiveSweep, experiment_evaluator
+from experiment_utils import create_aggregated_data_path_file, create_data_path_file, measure_noisy_graph, \
+    metric_columns, original_centralities, perform_replicated_experiment, run_experiment, \
+    run_experiments_in_parallel, selected_metric_groups, write_experiment
+from noisy_graphs.nested import NoisyGraphFamily
+
+
+# Sweep engine driven by a json configuration, see the files in configs/:
+#     - name: prefix of the experiment names and raw data file
+#     - model: key of MODELS
+#     - data_path: csv file with the results
+#     - seed: seed of every graph and noisy graph
+#     - parameters: model parameters, in experiment name order
+#     - ftrp: fake-to-real edge proportions
+#     - metrics: metric groups to compute, see METRIC_GROUPS, DEFAULT_METRIC_GROUPS by default
+#     - backend: "serial" or "parallel" (with "workers" processes)
+#     - centrality_backend: "networkx" or "igraph" for the centralities, networkx by default
+#     - raw_data: whether the edges of every noisy graph are written to raw_data/, true by default
+#     - construction: "independent" noisy graphs per ftrp or a single "nested"
+#       construction for all of them, see NoisyGraphFamily; nested members
+#       above the smallest ftrp are not the independent noisy graphs but
+#       have the same number of fake edges within a few percent
+#     - replicates, ci_tolerance: replicated mode, see perform_replicated_experiment
+#     - scheduler: "grid" or "adaptive" (with "thresholds", "initial_intervals", "max_depth")
+# A parameter is either {"values": [...]} or {"max": x, "intervals": k} for the
+# values i * x / k with i = 1...k, rounded to 3 decimals or to integers if
+# "integer" is true. Adaptive sweeps use {"min": x, "max": y} as bounds.
+
+
+def _barabasi_albert(n, m_fraction):
+    m = int(n * m_fraction)
+    m = (m - 1) if (m == n) else m
+    return nx.barabasi_albert_graph, {'n': n, 'm': m}
+
+
+def _erdos_renyi(n, p):
+    return nx.erdos_renyi_graph, {'n': n, 'p': p}
+
+
+def _watts_strogatz(n, k_fraction, p):
+    return nx.watts_strogatz_graph, {'n': n, 'k': int(n * k_fraction), 'p': p}
+
+
+# model name to a function mapping the sweep parameters to a
+# networkx generator and its arguments
+MODELS = {
+    'barabasi_albert': _barabasi_albert,
+    'erdos_renyi': _erdos_renyi,
+    'watts_strogatz': _watts_strogatz,
+}
+
+
+def load_config(path: str):
+    f = open(path, "r")
+    config = json.load(f)
+    f.close()
+
+    if config['model'] not in MODELS:
+        raise ValueError(f"Unknown model {config['model']}, expected one of {list(MODELS)}")
+    config['metrics'] = selected_metric_groups(config.get('metrics'))
+
+    if config.get('scheduler', 'grid') == 'adaptive':
+        unknown_metrics = set(config['thresholds']) - set(metric_columns(config['metrics']))
+        if unknown_metrics:
+            raise ValueError(f"Thresholds on metrics that are not computed {sorted(unknown_metrics)}, "
+                             f"expected some of {metric_columns(config['metrics'])}")
+
+    return config
+
+
+def parameter_values(specification: dict):
+    if 'values' in specification:
+        return list(specification['values'])
+
+    delta = specification['max'] / specification['intervals']
+    if specification.get('integer', False):
+        return [int(i * delta) for i in range(1, specification['intervals'] + 1)]
+    return [round(i * delta, 3) for i in range(1, specification['intervals'] + 1)]
+
+
+def plan_jobs(config: dict):
+    """
+    Plans every experiment of a grid sweep up front. Experiments are
+    grouped by original graph, identified by the generator, its actual
+    arguments and the seed, so parameter combinations that produce the
+    same graph share it. Inside a group, experiments with the same ftrp
+    produce the same noisy graph and are run once.
+    :return: dictionary of graph key to a dictionary of ftrp to experiment names
+    """
+    names = list(config['parameters'])
+    grids = [parameter_values(config['parameters'][name]) for name in names]
+    ftrps = parameter_values(config['ftrp'])
+
+    groups = {}
+    for values in product(*grids):
+        generator, arguments = MODELS[config['model']](*values)
+        graph_key = (generator.__name__, tuple(sorted(arguments.items())), config['seed'])
+        group = groups.setdefault(graph_key, {})
+        for ftrp in ftrps:
+            experiment_name = "_".join([config['name']] + [str(value) for value in values] + [str(ftrp)])
+            group.setdefault(ftrp, []).append(experiment_name)
+
+    return groups
+
+
+def _generate_graph(graph_key, seeded=True):
+    generator_name, arguments, seed = graph_key
+    generator = getattr(nx, generator_name)
+
+    # setting seeds for reproducibility
+    if seeded:
+        random.seed(seed)
+        numpy.random.seed(seed)
+    return generator(**dict(arguments))
+
+
+def _run_group_serially(original_graph, ftrps, seed, metric_groups, centrality_backend, raw_data):
+    # removing graph isolates
+    # NoisyGraph is not intended to deal with isolated nodes
+    original_graph.remove_nodes_from(list(nx.isolates(original_graph)))
+    original_metrics = original_centralities(original_graph, metric_groups, centrality_backend)
+
+    for ftrp in ftrps:
+        # setting seeds for reproducibility
+        random.seed(seed)
+        numpy.random.seed(seed)
+        yield run_experiment(original_graph, ftrp, original_metrics, metric_groups, centrality_backend, raw_data)
+
+
+def _run_group_nested(original_graph, ftrps, seed, metric_groups, centrality_backend, raw_data):
+    # removing graph isolates
+    # NoisyGraph is not intended to deal with isolated nodes
+    original_graph.remove_nodes_from(list(nx.isolates(original_graph)))
+    original_metrics = original_centralities(original_graph, metric_groups, centrality_backend)
+
+    family = NoisyGraphFamily(ftrps, seed=seed)
+    family.construct_graph(original_graph)
+    for ftrp in ftrps:
+        yield measure_noisy_graph(family.member(ftrp), original_graph, original_metrics, metric_groups,
+                                  centrality_backend, raw_data)
+
+
+def run_grid_sweep(config: dict):
+    groups = plan_jobs(config)
+    no_experiments = sum(len(names) for group in groups.values() for names in group.values())
+    no_runs = sum(len(group) for group in groups.values())
+    print(f"{no_experiments} experiments, {len(groups)} original graphs, {no_runs} noisy graphs")
+
+    centrality_backend = config.get('centrality_backend', 'networkx')
+    raw_data = config.get('raw_data', True)
+    for graph_key, group in groups.items():
+        ftrps = list(group)
+        seed = graph_key[2]
+
+        if config.get('replicates', 1) > 1:
+            for ftrp in ftrps:
+                for exp_name in group[ftrp]:
+                    perform_replicated_experiment(graph_factory=lambda: _generate_graph(graph_key, seeded=False),
+                                                  ftrp=ftrp, exp_name=exp_name, data_path=config['data_path'],
+                                                  seed=seed, replicates=config['replicates'],
+                                                  tolerance=config.get('ci_tolerance'),
+                                                  metric_groups=config.get('metrics'),
+                                                  centrality_backend=centrality_backend)
+            continue
+
+        original_graph = _generate_graph(graph_key)
+        if config.get('construction', 'independent') == 'nested':
+            results = _run_group_nested(original_graph, ftrps, seed, config.get('metrics'), centrality_backend,
+                                        raw_data)
+        elif config.get('backend', 'serial') == 'parallel':
+            results = run_experiments_in_parallel(original_graph, ftrps, seed, config.get('workers'),
+                                                  config.get('metrics'), centrality_backend, raw_data)
+        else:
+            results = _run_group_serially(original_graph, ftrps, seed, config.get('metrics'), centrality_backend,
+                                          raw_data)
+
+        for ftrp, (metrics, raw_record) in zip(ftrps, results):
+            for exp_name in group[ftrp]:
+                print(exp_name)
+                write_experiment(exp_name, config['data_path'], metrics, raw_record)
+
+
+def run_adaptive_sweep(config: dict):
+    names = list(config['parameters'])
+    bounds = {name: (config['parameters'][name]['min'], config['parameters'][name]['max']) for name in names}
+    bounds['ftrp'] = (config['ftrp']['min'], config['ftrp']['max'])
+    integers = [config['parameters'][name].get('integer', False) for name in names] + [False]
+
+    def round_point(point):
+        return tuple(int(round(value)) if integer else round(value, 3) for value, integer in zip(point, integers))
+
+    def graph_factory(point):
+        generator, arguments = MODELS[config['model']](*[point[name] for name in names])
+        return generator(**arguments)
+
+    def exp_name(point):
+        return "_".join([config['name']] + [str(point[name]) for name in names] + [str(point['ftrp'])])
+
+    sweep = AdaptiveSweep(bounds=bounds,
+                          evaluate=experiment_evaluator(graph_factory, exp_name, 'ftrp', config['data_path'],
+                                                        config['seed'], config.get('metrics'),
+                                                        config.get('centrality_backend', 'networkx'),
+                                                        config.get('raw_data', True)),
+                          thresholds=config['thresholds'],
+                          initial_intervals=config.get('initial_intervals', 2),
+                          max_depth=config.get('max_depth', 3),
+                          round_point=round_point)
+    results = sweep.run()
+    print(f"{len(results)} experiments")
+
+
+def run_sweep(config: dict):
+    # creating path
+    if config.get('replicates', 1) > 1:
+        create_aggregated_data_path_file(config['data_path'], config.get('metrics'))
+    else:
+        create_data_path_file(config['data_path'], config.get('metrics'))
+
+    if config.get('scheduler', 'grid') == 'adaptive':
+        run_adaptive_sweep(config)
+    else:
+        run_grid_sweep(config)
+
+
+if __name__ == '__main__':
+    for config_path in sys.argv[1:]:
+        run_sweep(load_config(config_path))